@@ -4,95 +4,416 @@ American Express 信用卡爬蟲
 從 https://www.americanexpress.com/us/credit-cards/ 抓取資料並存入資料庫
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
-import sqlite3
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from functools import lru_cache
+from itertools import chain
+from typing import TYPE_CHECKING, Iterator, List, Dict, Optional, Tuple, Union
 import re
+from urllib.parse import urljoin, urlsplit
+
+from card_store import DEFAULT_BUSY_TIMEOUT, CardStore, display_cards
+from catalog_io import DEFAULT_IMPORT_BATCH_SIZE, import_ndjson
+from checkpoint import DEFAULT_CHECKPOINT_PATH, CheckpointStore, finish_checkpoint
+from crawl_frontier import (
+    DEFAULT_CRAWL_WORKERS, DEFAULT_MAX_DEPTH, BloomFilter, CrawlFrontier, normalize_url
+)
+from embedded_json import extract_cards, iter_cards, to_benefit
+from http_cache import ResponseCache
+from http_client import HttpClient, configure_default_client, get_default_client
+from metrics import add_cli_arguments, metrics, run_instrumented
+from models import Benefit, Card, merge_benefits, to_cards, to_dicts
+from pipeline import DEFAULT_PIPELINE_BATCH_SIZE, DEFAULT_QUEUE_SIZE, Pipeline
+from response_archive import ReplayMissError, ResponseArchive
+from sample_data import amex_sample_cards
+from sync_state import SyncState, load_state
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+# 卡片容器的選擇器（預先編譯，只建構符合的 div 及其子節點）
+CARD_CLASS_RE = re.compile(r'card|product')
+CARD_TITLE_TAGS = ['h2', 'h3', 'h4']
+
+# 卡片詳細頁：福利區塊與連結
+BENEFIT_CLASS_RE = re.compile(r'benefit|feature|offer|perk|credit', re.I)
+
+
+class HtmlTools:
+    """
+    BeautifulSoup、解析器與預先建立的 SoupStrainer
+    只有實際解析網頁時才載入 bs4（顯示示例資料、匯入 NDJSON 等路徑不需要）
+    """
+
+    def __init__(self):
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        self.BeautifulSoup = BeautifulSoup
+        # 有安裝 lxml 時使用較快的 C 解析器，否則退回內建的 html.parser
+        try:
+            import lxml  # noqa: F401
+            self.parser = 'lxml'
+        except ImportError:
+            self.parser = 'html.parser'
+        self.card_containers = SoupStrainer('div', class_=CARD_CLASS_RE)
+        self.benefit_sections = SoupStrainer(['section', 'div', 'ul'], class_=BENEFIT_CLASS_RE)
+        self.links = SoupStrainer('a', href=True)
+
+    def soup(self, html: Union[str, bytes], parse_only) -> 'BeautifulSoup':
+        return self.BeautifulSoup(html, self.parser, parse_only=parse_only)
+
+
+@lru_cache(maxsize=None)
+def html_tools() -> HtmlTools:
+    """程序內共用的 HtmlTools，第一次呼叫時建立"""
+    return HtmlTools()
+
+
+def _detail_prefix(card_url: str) -> str:
+    """
+    卡片詳細頁之下子頁面的網址前綴
+    /cards/gold/ 與 /cards/gold.html 的子頁面都在 /cards/gold/ 之下
+    """
+    parts = urlsplit(normalize_url(card_url))
+    path = os.path.splitext(parts.path)[0].rstrip('/') + '/'
+    return f"{parts.scheme}://{parts.netloc}{path}"
+
+
+# 重播時每個工作程序各自保留一個只用來解析的爬蟲實例
+_parser_instance = None
+
+
+def parse_page(kind: str, content: bytes) -> List[Union[Card, Benefit]]:
+    """
+    解析一個網頁（供 ParseExecutor 在工作程序中呼叫）
+    列表頁回傳 Card 清單，詳細頁回傳 Benefit 清單
+    """
+    global _parser_instance
+    if _parser_instance is None:
+        _parser_instance = AmexScraper(db_path=':memory:')
+    if kind == 'listing':
+        return to_cards(_parser_instance._extract_cards(content))
+    return [Benefit.from_dict(benefit) for benefit in _parser_instance._parse_detail_page(content)]
 
 
 class AmexScraper:
     """American Express 信用卡爬蟲"""
 
-    def __init__(self, db_path: str = None):
-        if db_path is None:
-            # 預設使用專案的資料庫路徑
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            self.db_path = os.path.join(script_dir, '..', 'apps', 'backend', 'prisma', 'dev.db')
-        else:
-            self.db_path = db_path
-
-        self.cards = []
+    # 解析邏輯變更時遞增，讓快取中的舊解析結果失效
+    PARSER_VERSION = 4
+
+    def __init__(self, db_path: str = None, cache: Optional[ResponseCache] = None,
+                 client: Optional[HttpClient] = None,
+                 checkpoint: Optional[CheckpointStore] = None,
+                 archive: Optional[ResponseArchive] = None, replay: bool = False,
+                 store: Optional[CardStore] = None, sample_fallback: bool = True):
+        # 與其他資料來源共用的資料庫寫入路徑
+        self.store = store or CardStore(db_path)
+        self.db_path = self.store.db_path
+
+        self.cards: List[Card] = []
+        self.cache = cache
+        self.client = client or get_default_client()
+        # 檢查點：記錄已抓取的網頁、已解析與已寫入的卡片，中斷後可接續
+        self.checkpoint = checkpoint
+        # 回應封存檔：一般模式下錄製每個回應；replay=True 時只從封存檔讀取，不連網
+        if replay and archive is None:
+            raise ValueError("重播模式需要封存檔")
+        self.archive = archive
+        self.replay = replay
+        # 網頁無法取得時是否改用示例資料；常駐模式關閉，讓失敗如實回報
+        self.sample_fallback = sample_fallback
+        self._persisted_names = None
+        self.last_save_stats: Dict[str, int] = {}
         self.base_url = "https://www.americanexpress.com"
         self.cards_url = "https://www.americanexpress.com/us/credit-cards/"
 
+    @metrics.timed('amex.fetch')
     def fetch_amex_cards(self) -> List[Dict]:
         """
         從 American Express 網站抓取信用卡資料
         注意：由於 AMEX 網站使用 JavaScript 動態載入，這裡提供兩種方法：
         1. 使用 Selenium (較可靠但需要瀏覽器驅動)
         2. 使用 requests + BeautifulSoup (較快但可能無法抓到動態內容)
+
+        目前採用方法 2：動態內容通常以 JSON 內嵌在網頁中，
+        會先擷取內嵌 JSON，找不到時才解析 HTML
         """
         print(f"\n{'='*60}")
         print(f"開始抓取 American Express 信用卡資訊")
         print(f"網址: {self.cards_url}")
         print(f"{'='*60}\n")
 
-        try:
-            # 方法 1: 使用 requests (如果網站有靜態內容)
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-
-            response = requests.get(self.cards_url, headers=headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
+        if self.checkpoint is not None:
+            saved_cards = self.checkpoint.load_cards()
+            if saved_cards:
+                print(f"♻️  從檢查點恢復 {len(saved_cards)} 張卡片，略過列表頁")
+                self.cards = to_cards(saved_cards)
+                return self.cards
 
-            # 由於 AMEX 網站結構複雜，這裡使用示例資料
-            # 實際使用時需要根據網站結構調整選擇器
-            self.cards = self._parse_amex_page(soup)
+        try:
+            saved_page = self.checkpoint.get_page(self.cards_url) if self.checkpoint is not None else None
+            if saved_page is not None:
+                self.cards = to_cards(self._extract_cards(saved_page))
+            else:
+                # 方法 1: 使用 requests (如果網站有靜態內容)
+                response = self._fetch_response(self.cards_url, 'listing')
+                if self.checkpoint is not None:
+                    self.checkpoint.save_page(self.cards_url, response.content)
+
+                derived_key = f"amex_cards:v{self.PARSER_VERSION}"
+                cached_cards = None
+                if self.cache is not None and getattr(response, 'not_modified', False):
+                    # 網頁未變更：沿用上次的解析結果，省去下載與解析
+                    cached_cards = self.cache.load_derived(self.cards_url, derived_key)
+
+                if cached_cards is not None:
+                    print("♻️  網頁未變更，使用快取的解析結果")
+                    self.cards = to_cards(cached_cards)
+                else:
+                    self.cards = to_cards(self._extract_cards(response.content))
+                    if self.cache is not None:
+                        self.cache.store_derived(self.cards_url, derived_key, to_dicts(self.cards))
 
             if not self.cards:
-                print("⚠️  無法從網頁抓取資料，使用示例資料")
-                self.cards = self._get_amex_sample_data()
+                print("⚠️  無法從網頁抓取資料")
+                if not self.sample_fallback:
+                    raise RuntimeError("網頁中找不到卡片資料")
+                self._use_sample_data()
 
         except Exception as e:
             print(f"❌ 抓取失敗: {e}")
-            print("⚠️  使用示例資料代替")
-            self.cards = self._get_amex_sample_data()
+            if not self.sample_fallback:
+                raise
+            self._use_sample_data()
+
+        if self.checkpoint is not None and self.cards:
+            self.checkpoint.save_cards(self.cards)
 
         print(f"✅ 成功抓取 {len(self.cards)} 張 American Express 信用卡\n")
         return self.cards
 
-    def _parse_amex_page(self, soup: BeautifulSoup) -> List[Dict]:
+    def _use_sample_data(self):
+        """
+        網頁無法取得時的處理：一般模式改用示例資料；
+        檢查點模式不使用示例資料，避免以假資料覆蓋，進度保留給 --resume
+        """
+        if self.checkpoint is not None:
+            print("❌ 檢查點模式不使用示例資料，進度已保留，修正問題後以 --resume 繼續")
+            self.cards = []
+            return
+        print("⚠️  使用示例資料代替")
+        self.cards = self._get_amex_sample_data()
+
+    def _fetch_page(self, url: str, kind: str = 'detail') -> bytes:
+        """取得網頁內容；檢查點中已有的網頁不再下載"""
+        if self.checkpoint is not None:
+            content = self.checkpoint.get_page(url)
+            if content is not None:
+                return content
+        content = self._fetch_response(url, kind).content
+        if self.checkpoint is not None:
+            self.checkpoint.save_page(url, content)
+        return content
+
+    def _persist_batch(self, batch: List[Dict]) -> bool:
+        """寫入一批卡片（管線與串流匯入）；檢查點中已寫入的卡片會略過"""
+        if self.checkpoint is not None:
+            if self._persisted_names is None:
+                self._persisted_names = self.checkpoint.persisted_names()
+            batch = [card for card in batch if card['nameEn'] not in self._persisted_names]
+            if not batch:
+                return True
+
+        ok = self.save_to_database(cards=batch)
+        if ok and self.checkpoint is not None:
+            names = [card['nameEn'] for card in batch]
+            self.checkpoint.mark_persisted(names)
+            self._persisted_names.update(names)
+        return ok
+
+    def _fetch_response(self, url: str, kind: str = 'listing'):
+        """
+        經由快取或共用 HttpClient（連線池、限速與暫時性錯誤的重試）取得網頁
+        有封存檔時錄製回應；重播模式只從封存檔讀取
+        """
+        if self.replay:
+            response = self.archive.get(url)
+            if response is None:
+                raise ReplayMissError(f"封存檔中沒有 {url}")
+            return response
+
+        if self.cache is not None:
+            response = self.cache.get(url)
+        else:
+            response = self.client.get(url)
+            response.raise_for_status()
+        if self.archive is not None:
+            self.archive.record(url, response, kind)
+        return response
+
+    def replay_archive(self, workers: Optional[int] = None) -> List[Card]:
+        """
+        以封存檔重建目錄，不連網：列表頁與詳細頁在多個程序中平行解析，
+        詳細頁的福利依網址合併進對應的卡片（與 crawl_details 相同）
+        """
+        counts = self.archive.summary()
+        print(f"📼 重播封存檔: 列表頁 {counts.get('listing', 0)}，詳細頁 {counts.get('detail', 0)}")
+
+        # 逐筆解壓後直接送入 ParseExecutor，同時存在的頁面內容受 max_pending 限制；
+        # 列表頁全部排在詳細頁之前，第一個詳細頁的結果出現時卡片清單已完整
+        pages = (
+            ((response.kind, response.url), response.kind, response.content)
+            for response in chain(self.archive.iter_responses('listing'),
+                                  self.archive.iter_responses('detail'))
+        )
+        from parse_executor import ParseExecutor
+
+        self.cards = []
+        seen_names = set()
+        prefixes = None
+        added = 0
+        failed = 0
+        with metrics.stage('amex.replay_parse'):
+            with ParseExecutor(parse_page, workers=workers) as executor:
+                for result in executor.map(pages):
+                    kind, url = result.key
+                    if not result.ok:
+                        failed += 1
+                        print(f"⚠️  解析失敗 {url}: {result.error.splitlines()[0]}")
+                        continue
+
+                    if kind == 'listing':
+                        for card in result.value or []:
+                            if card['nameEn'] not in seen_names:
+                                seen_names.add(card['nameEn'])
+                                self.cards.append(card)
+                        continue
+
+                    if prefixes is None:
+                        prefixes = self._detail_prefixes()
+                    # 詳細頁對應到網址前綴最長的卡片（子頁面歸屬於其卡片詳細頁）
+                    url = normalize_url(url)
+                    for prefix, card_url, index in prefixes:
+                        if url == card_url or url.startswith(prefix):
+                            added += merge_benefits(self.cards[index], result.value)
+                            break
+
+        print(f"✅ 重播完成: {len(self.cards)} 張卡片，新增 {added} 個福利"
+              f"（解析失敗 {failed} 頁）\n")
+        return self.cards
+
+    def _detail_prefixes(self) -> List[Tuple[str, str, int]]:
+        """(詳細頁網址前綴, 卡片網址, 索引)，依前綴長度由長到短排序"""
+        prefixes = []
+        for index, card in enumerate(self.cards):
+            if card.get('url'):
+                prefixes.append((_detail_prefix(card['url']), normalize_url(card['url']), index))
+        prefixes.sort(key=lambda item: -len(item[0]))
+        return prefixes
+
+    def run_pipeline(self, batch_size: int = DEFAULT_PIPELINE_BATCH_SIZE,
+                     queue_size: int = DEFAULT_QUEUE_SIZE) -> Dict[str, int]:
+        """
+        管線模式：抓取、解析與寫入資料庫在不同執行緒同時進行，
+        卡片一解析出來就經由有界佇列分批寫入，不會先把整份目錄存在 self.cards
+        網頁無法取得或沒有任何卡片時，與 fetch_amex_cards 相同改用示例資料（檢查點模式除外）
+        """
+        print(f"\n{'='*60}")
+        print(f"管線模式抓取 American Express 信用卡資訊")
+        print(f"網址: {self.cards_url}")
+        print(f"{'='*60}\n")
+
+        pipeline = Pipeline(
+            fetch=lambda url: self._fetch_page(url, 'listing'),
+            parse=lambda url, html: self._iter_page_cards(html),
+            persist=self._persist_batch,
+            queue_size=queue_size,
+            batch_size=batch_size,
+        )
+        # 整次管線共用一個連線與名稱索引，每批只查詢該批卡片的既有資料，
+        # 寫入端的記憶體用量取決於佇列與批次大小，而不是資料表大小
+        with self.store.warm():
+            stats = pipeline.run([self.cards_url])
+
+            if stats['cards'] == 0 and self.checkpoint is None:
+                print("⚠️  無法從網頁抓取資料，使用示例資料")
+                sample = self._get_amex_sample_data()
+                ok = self.save_to_database(cards=sample)
+                stats['batches'] += 1
+                stats['cards'] += len(sample)
+                if not ok:
+                    stats['failed_batches'] += 1
+
+        print(f"✅ 管線完成: {stats['cards']} 張卡片，{stats['batches']} 批"
+              f"（失敗 {stats['failed_batches']} 批，抓取錯誤 {stats['fetch_errors']}，"
+              f"解析錯誤 {stats['parse_errors']}）")
+        return stats
+
+    def _iter_page_cards(self, html: bytes) -> Iterator[Card]:
+        """_extract_cards 的串流版本：內嵌 JSON 優先，沒有時退回 HTML 選擇器"""
+        found = False
+        for card in iter_cards(html, issuer='American Express'):
+            found = True
+            yield Card.from_dict(card)
+        if not found:
+            for card in self._iter_amex_page(html):
+                yield Card.from_dict(card)
+
+    @metrics.timed('amex.parse')
+    def _extract_cards(self, html: bytes) -> List[Dict]:
+        """
+        從網頁擷取卡片：優先使用內嵌 JSON（JSON-LD、__NEXT_DATA__、狀態物件），
+        沒有內嵌資料時才退回 HTML 選擇器解析
+        """
+        cards = extract_cards(html, issuer='American Express')
+        if cards:
+            print(f"🧩 從內嵌 JSON 擷取到 {len(cards)} 張卡片")
+            return cards
+
+        # 由於 AMEX 網站結構複雜，這裡使用示例資料
+        # 實際使用時需要根據網站結構調整選擇器
+        return self._parse_amex_page(html)
+
+    def _parse_amex_page(self, page: Union['BeautifulSoup', str, bytes]) -> List[Dict]:
         """
         解析 AMEX 網頁內容
         實際使用時需要根據網站的 HTML 結構調整
+
+        傳入原始 HTML 時只建構卡片容器（SoupStrainer），並優先使用 lxml 解析器；
+        已解析好的 BeautifulSoup 也可直接傳入
         """
-        cards = []
+        return list(self._iter_amex_page(page))
+
+    def _iter_amex_page(self, page: Union['BeautifulSoup', str, bytes]) -> Iterator[Dict]:
+        """_parse_amex_page 的串流版本：每解析出一張卡片就產生"""
+        tools = html_tools()
+        if isinstance(page, tools.BeautifulSoup):
+            soup = page
+        else:
+            soup = tools.soup(page, tools.card_containers)
+
+        seen_names = set()
 
         # 嘗試找到卡片容器
         # 注意：這需要根據實際網站結構調整選擇器
-        card_elements = soup.find_all('div', class_=re.compile(r'card|product'))
-
-        for element in card_elements[:5]:  # 限制數量避免過多
+        for element in soup.find_all('div', class_=CARD_CLASS_RE):
             try:
                 # 提取卡片資訊（需要根據實際結構調整）
-                title_element = element.find(['h2', 'h3', 'h4'])
+                title_element = element.find(CARD_TITLE_TAGS)
                 if not title_element:
                     continue
 
                 card_name = title_element.get_text(strip=True)
 
-                # 跳過無效的卡片名稱
-                if not card_name or len(card_name) < 3:
+                # 跳過無效的卡片名稱，以及巢狀容器造成的重複
+                if not card_name or len(card_name) < 3 or card_name in seen_names:
                     continue
+                seen_names.add(card_name)
 
-                cards.append({
+                card = {
                     'name': card_name,
                     'nameEn': card_name,
                     'bank': 'American Express',
@@ -100,360 +421,118 @@ class AmexScraper:
                     'issuer': 'American Express',
                     'description': f'American Express {card_name}',
                     'descriptionEn': f'American Express {card_name}',
-                })
+                }
+                # 卡片詳細頁連結，供 crawl_details 抓取完整福利
+                link = element.find('a', href=True)
+                if link is not None:
+                    card['url'] = normalize_url(urljoin(self.cards_url, link['href']))
+                yield card
             except Exception as e:
                 print(f"⚠️  解析卡片時出錯: {e}")
                 continue
 
-        return cards
-
-    def _get_amex_sample_data(self) -> List[Dict]:
-        """返回 American Express 示例資料"""
-        return [
-            {
-                'name': 'American Express 白金卡',
-                'nameEn': 'The Platinum Card® from American Express',
-                'bank': 'American Express',
-                'bankEn': 'American Express',
-                'issuer': 'American Express',
-                'region': 'america',
-                'description': '高端旅行信用卡，提供全球機場貴賓室、飯店禮遇和旅行回饋',
-                'descriptionEn': 'Premium travel card with global lounge access, hotel benefits, and travel rewards',
-                'photo': '/images/cards/amex-platinum.jpg',
-                'benefits': [
-                    {
-                        'category': '機場貴賓室',
-                        'categoryEn': 'Airport Lounge',
-                        'title': '全球機場貴賓室通行證',
-                        'titleEn': 'Global Lounge Access',
-                        'description': '免費使用全球1,400+機場貴賓室（包含美國運通Centurion、Priority Pass等）',
-                        'descriptionEn': 'Free access to 1,400+ airport lounges worldwide (including Amex Centurion, Priority Pass)',
-                        'amount': None,
-                        'currency': 'USD',
-                        'frequency': 'YEARLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 30
-                    },
-                    {
-                        'category': '旅行回饋',
-                        'categoryEn': 'Travel Credit',
-                        'title': '年度飯店回饋$200',
-                        'titleEn': '$200 Annual Hotel Credit',
-                        'description': '每年可獲得$200飯店預訂回饋',
-                        'descriptionEn': '$200 annual hotel credit through Amex Travel',
-                        'amount': 200,
-                        'currency': 'USD',
-                        'frequency': 'YEARLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 30
-                    },
-                    {
-                        'category': '旅行回饋',
-                        'categoryEn': 'Airline Credit',
-                        'title': '年度航空回饋$200',
-                        'titleEn': '$200 Annual Airline Fee Credit',
-                        'description': '每年$200航空雜費回饋（托運行李、機上餐飲等）',
-                        'descriptionEn': '$200 annual airline fee credit for baggage, in-flight purchases',
-                        'amount': 200,
-                        'currency': 'USD',
-                        'frequency': 'YEARLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 30
-                    },
-                    {
-                        'category': '串流服務',
-                        'categoryEn': 'Streaming Credit',
-                        'title': '串流服務每月$20回饋',
-                        'titleEn': '$20 Monthly Streaming Credit',
-                        'description': '符合條件的串流媒體服務每月$20回饋',
-                        'descriptionEn': '$20 monthly credit for eligible streaming services',
-                        'amount': 20,
-                        'currency': 'USD',
-                        'frequency': 'MONTHLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 7
-                    }
-                ]
-            },
-            {
-                'name': 'American Express 金卡',
-                'nameEn': 'American Express® Gold Card',
-                'bank': 'American Express',
-                'bankEn': 'American Express',
-                'issuer': 'American Express',
-                'region': 'america',
-                'description': '餐飲和超市消費最佳選擇，提供4倍積分回饋',
-                'descriptionEn': 'Best for dining and groceries with 4x points',
-                'photo': '/images/cards/amex-gold.jpg',
-                'benefits': [
-                    {
-                        'category': '餐飲回饋',
-                        'categoryEn': 'Dining Rewards',
-                        'title': '餐廳消費4倍積分',
-                        'titleEn': '4x Points on Restaurants',
-                        'description': '全球餐廳消費獲得4倍積分（每年最高$50,000）',
-                        'descriptionEn': '4x points at restaurants worldwide (up to $50,000 per year)',
-                        'amount': None,
-                        'currency': 'USD',
-                        'frequency': 'YEARLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 30
-                    },
-                    {
-                        'category': '超市回饋',
-                        'categoryEn': 'Grocery Rewards',
-                        'title': '超市消費4倍積分',
-                        'titleEn': '4x Points at Supermarkets',
-                        'description': '美國超市消費4倍積分（每年最高$25,000）',
-                        'descriptionEn': '4x points at U.S. supermarkets (up to $25,000 per year)',
-                        'amount': None,
-                        'currency': 'USD',
-                        'frequency': 'YEARLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 30
-                    },
-                    {
-                        'category': '餐飲回饋',
-                        'categoryEn': 'Dining Credit',
-                        'title': 'Uber Cash每月$10',
-                        'titleEn': '$10 Monthly Uber Cash',
-                        'description': '每月$10 Uber Cash用於搭車或Uber Eats',
-                        'descriptionEn': '$10 monthly Uber Cash for rides or Uber Eats',
-                        'amount': 10,
-                        'currency': 'USD',
-                        'frequency': 'MONTHLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 7
-                    },
-                    {
-                        'category': '餐飲回饋',
-                        'categoryEn': 'Dining Credit',
-                        'title': '餐廳回饋每月$10',
-                        'titleEn': '$10 Monthly Dining Credit',
-                        'description': '符合條件的餐廳每月$10回饋',
-                        'descriptionEn': '$10 monthly dining credit at select restaurants',
-                        'amount': 10,
-                        'currency': 'USD',
-                        'frequency': 'MONTHLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 7
-                    }
-                ]
-            },
-            {
-                'name': 'American Express 藍色現金天天卡',
-                'nameEn': 'Blue Cash Everyday® Card from American Express',
-                'bank': 'American Express',
-                'bankEn': 'American Express',
-                'issuer': 'American Express',
-                'region': 'america',
-                'description': '無年費現金回饋卡，超市3%回饋',
-                'descriptionEn': 'No annual fee cash back card with 3% at U.S. supermarkets',
-                'photo': '/images/cards/amex-blue-cash.jpg',
-                'benefits': [
-                    {
-                        'category': '超市回饋',
-                        'categoryEn': 'Grocery Cash Back',
-                        'title': '超市3%現金回饋',
-                        'titleEn': '3% Cash Back at U.S. Supermarkets',
-                        'description': '美國超市消費3%現金回饋（每年最高$6,000）',
-                        'descriptionEn': '3% cash back at U.S. supermarkets (up to $6,000 per year)',
-                        'amount': None,
-                        'currency': 'USD',
-                        'frequency': 'YEARLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 30
-                    },
-                    {
-                        'category': '加油回饋',
-                        'categoryEn': 'Gas Cash Back',
-                        'title': '加油站2%現金回饋',
-                        'titleEn': '2% Cash Back at Gas Stations',
-                        'description': '美國加油站消費2%現金回饋',
-                        'descriptionEn': '2% cash back at U.S. gas stations',
-                        'amount': None,
-                        'currency': 'USD',
-                        'frequency': 'YEARLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 30
-                    },
-                    {
-                        'category': '串流服務',
-                        'categoryEn': 'Streaming Cash Back',
-                        'title': '串流服務2%現金回饋',
-                        'titleEn': '2% Cash Back on Streaming',
-                        'description': '符合條件的串流媒體服務2%現金回饋',
-                        'descriptionEn': '2% cash back on eligible streaming subscriptions',
-                        'amount': None,
-                        'currency': 'USD',
-                        'frequency': 'YEARLY',
-                        'startMonth': 1,
-                        'startDay': 1,
-                        'endMonth': 12,
-                        'endDay': 31,
-                        'reminderDays': 30
-                    }
-                ]
-            }
+    def crawl_details(self, max_workers: int = DEFAULT_CRAWL_WORKERS,
+                      max_depth: int = DEFAULT_MAX_DEPTH, use_bloom: bool = False,
+                      max_pages: Optional[int] = None) -> Dict[str, int]:
+        """
+        並行抓取每張卡片的詳細頁，將頁面上的福利合併進卡片的 benefits
+        深度由列表頁起算：詳細頁為 1，max_depth > 1 時會繼續抓取詳細頁下的子頁面
+        """
+        seeds = [
+            (urljoin(self.cards_url, card['url']), index)
+            for index, card in enumerate(self.cards) if card.get('url')
         ]
+        if not seeds:
+            print("⚠️  卡片沒有詳細頁連結，略過詳細頁抓取")
+            return {'queued': 0, 'fetched': 0, 'errors': 0, 'duplicates': 0,
+                    'extract_errors': 0, 'parse_errors': 0, 'benefits_added': 0}
+
+        print(f"🕸️  抓取 {len(seeds)} 張卡片的詳細頁（{max_workers} 個工作執行緒，最大深度 {max_depth}）")
+        frontier = CrawlFrontier(
+            fetch=self._fetch_page,
+            extract_links=self._extract_detail_links,
+            max_workers=max_workers,
+            max_depth=max_depth,
+            max_pages=max_pages,
+            seen=BloomFilter() if use_bloom else None,
+        )
+        added = 0
+        for url, depth, index, html in frontier.crawl(seeds, start_depth=1):
+            try:
+                with metrics.stage('amex.parse_detail'):
+                    benefits = self._parse_detail_page(html)
+            except Exception as e:
+                frontier.record_failure(url, 'parse', e)
+                continue
+            added += merge_benefits(self.cards[index], benefits)
+
+        if self.checkpoint is not None:
+            self.checkpoint.save_cards(self.cards)
+        stats = dict(frontier.stats, benefits_added=added)
+        metrics.incr('crawl_pages_fetched', stats['fetched'])
+        print(f"✅ 詳細頁完成: 抓取 {stats['fetched']} 頁（失敗 {stats['errors']}，"
+              f"擷取連結失敗 {stats['extract_errors']}，解析失敗 {stats['parse_errors']}，"
+              f"重複略過 {stats['duplicates']}），新增 {added} 個福利")
+        return stats
+
+    def _parse_detail_page(self, html: bytes) -> List[Dict]:
+        """
+        解析卡片詳細頁的福利
+        優先使用內嵌 JSON 中第一張卡片的福利，沒有時解析福利區塊內的清單項目
+        """
+        for card in iter_cards(html, issuer='American Express'):
+            if card.get('benefits'):
+                return card['benefits']
+
+        tools = html_tools()
+        soup = tools.soup(html, tools.benefit_sections)
+        benefits = []
+        seen_titles = set()
+        for item in soup.find_all('li'):
+            benefit = to_benefit(item.get_text(' ', strip=True))
+            if benefit is None or len(benefit['titleEn']) < 3 or benefit['titleEn'] in seen_titles:
+                continue
+            seen_titles.add(benefit['titleEn'])
+            benefits.append(benefit)
+        return benefits
+
+    def _extract_detail_links(self, url: str, html: bytes, index: int) -> List[str]:
+        """詳細頁下的子頁面：同一主機、路徑位於卡片詳細頁之下的連結（其他卡片的頁面不跟隨）"""
+        prefix = _detail_prefix(urljoin(self.cards_url, self.cards[index]['url']))
+        links = []
+        tools = html_tools()
+        soup = tools.soup(html, tools.links)
+        for anchor in soup.find_all('a', href=True):
+            link = normalize_url(urljoin(url, anchor['href']))
+            if link.startswith(prefix):
+                links.append(link)
+        return links
+
+    def _get_amex_sample_data(self) -> List[Card]:
+        """返回 American Express 示例資料（scripts/data/amex_sample_cards.json）"""
+        return amex_sample_cards()
+
+    def save_to_database(self, sync_state: Optional[SyncState] = None,
+                         cards: Optional[List[Dict]] = None) -> bool:
+        """
+        將資料存入 SQLite 資料庫（經由共用的 CardStore 批次 upsert）
 
-    def save_to_database(self) -> bool:
-        """將資料存入 SQLite 資料庫"""
-        if not self.cards:
-            print("❌ 沒有資料可以儲存")
-            return False
+        傳入 sync_state 時為增量模式：只寫入與上次指紋不同的卡片/福利，
+        並將上次存在、這次消失的資料設為停用
 
-        try:
-            print(f"\n{'='*60}")
-            print(f"開始儲存資料到資料庫")
-            print(f"資料庫路徑: {self.db_path}")
-            print(f"{'='*60}\n")
-
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            for card in self.cards:
-                # 檢查卡片是否已存在
-                cursor.execute(
-                    "SELECT id FROM CreditCard WHERE nameEn = ?",
-                    (card['nameEn'],)
-                )
-                existing = cursor.fetchone()
-
-                if existing:
-                    print(f"⚠️  卡片已存在，跳過: {card['nameEn']}")
-                    card_id = existing[0]
-                else:
-                    # 插入信用卡
-                    cursor.execute(
-                        """
-                        INSERT INTO CreditCard (
-                            name, nameEn, bank, bankEn, issuer, region,
-                            description, descriptionEn, photo, isActive,
-                            createdAt, updatedAt
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
-                        """,
-                        (
-                            card['name'],
-                            card['nameEn'],
-                            card['bank'],
-                            card['bankEn'],
-                            card['issuer'],
-                            card.get('region', 'america'),
-                            card['description'],
-                            card['descriptionEn'],
-                            card.get('photo'),
-                            1
-                        )
-                    )
-                    card_id = cursor.lastrowid
-                    print(f"✅ 已新增卡片: {card['nameEn']} (ID: {card_id})")
-
-                # 插入福利
-                if 'benefits' in card:
-                    for benefit in card['benefits']:
-                        # 檢查福利是否已存在
-                        cursor.execute(
-                            "SELECT id FROM Benefit WHERE cardId = ? AND titleEn = ?",
-                            (card_id, benefit['titleEn'])
-                        )
-                        if cursor.fetchone():
-                            print(f"   ⚠️  福利已存在，跳過: {benefit['titleEn']}")
-                            continue
-
-                        cursor.execute(
-                            """
-                            INSERT INTO Benefit (
-                                cardId, category, categoryEn, title, titleEn,
-                                description, descriptionEn, amount, currency, frequency,
-                                startMonth, startDay, endMonth, endDay, reminderDays,
-                                isActive, createdAt, updatedAt
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
-                            """,
-                            (
-                                card_id,
-                                benefit['category'],
-                                benefit['categoryEn'],
-                                benefit['title'],
-                                benefit['titleEn'],
-                                benefit['description'],
-                                benefit['descriptionEn'],
-                                benefit.get('amount'),
-                                benefit['currency'],
-                                benefit['frequency'],
-                                benefit.get('startMonth', 1),
-                                benefit.get('startDay', 1),
-                                benefit.get('endMonth', 12),
-                                benefit.get('endDay', 31),
-                                benefit.get('reminderDays', 30),
-                                1
-                            )
-                        )
-                        print(f"   ✅ 已新增福利: {benefit['titleEn']}")
-
-            conn.commit()
-            conn.close()
-
-            print(f"\n{'='*60}")
-            print(f"✅ 成功儲存 {len(self.cards)} 張信用卡到資料庫")
-            print(f"{'='*60}\n")
-            return True
+        傳入 cards 時只寫入這一批（例如串流匯入），不使用 self.cards；
+        此時無法判斷哪些資料已移除，因此不能搭配 sync_state
+        """
+        if cards is not None and sync_state is not None:
+            raise ValueError("分批寫入時不支援增量同步")
 
-        except Exception as e:
-            print(f"❌ 儲存失敗: {e}")
-            if conn:
-                conn.rollback()
-                conn.close()
-            return False
+        ok = self.store.save(self.cards if cards is None else cards, sync_state=sync_state)
+        self.last_save_stats = self.store.last_save_stats
+        return ok
 
     def display_results(self):
         """顯示抓取結果"""
-        if not self.cards:
-            print("❌ 沒有找到任何信用卡資訊")
-            return
-
-        print(f"\n{'='*60}")
-        print(f"American Express 信用卡列表")
-        print(f"{'='*60}\n")
-
-        for i, card in enumerate(self.cards, 1):
-            print(f"{i}. {card['nameEn']}")
-            print(f"   中文名稱: {card['name']}")
-            print(f"   描述: {card['descriptionEn']}")
-            print(f"   福利數量: {len(card.get('benefits', []))}")
-            if card.get('photo'):
-                print(f"   圖片: {card['photo']}")
-            print()
+        display_cards("American Express 信用卡列表", self.cards)
 
 
 def main():
@@ -473,23 +552,250 @@ def main():
         action="store_true",
         help="只顯示結果，不儲存到資料庫"
     )
+    parser.add_argument(
+        "--fast-write",
+        action="store_true",
+        help="快速寫入：WAL、synchronous=NORMAL、較大的頁面快取，並建立缺少的查詢索引"
+    )
+    parser.add_argument(
+        "--busy-timeout",
+        type=float,
+        default=DEFAULT_BUSY_TIMEOUT,
+        help=f"資料庫被其他連線（例如後端）鎖定時的等待秒數 (預設: {DEFAULT_BUSY_TIMEOUT:g})"
+    )
+    parser.add_argument(
+        "--rejects-file",
+        type=str,
+        help="未通過檢查或寫入失敗的資料寫到這個 NDJSON 檔 (預設: scripts/.scraper_state/rejects.ndjson)"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=2.0,
+        help="每個主機每秒最多請求數 (預設: 2)"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="遇到 429/5xx 或連線錯誤時的最大重試次數 (預設: 3)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="啟用 HTTP 回應快取並指定快取目錄（例如 scripts/.http_cache）"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=3600,
+        help="快取有效秒數，過期後以條件式 GET 重新驗證 (預設: 3600)"
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=50,
+        help="快取大小上限 (MB)，超過時淘汰最久未使用的項目 (預設: 50)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="增量同步：只寫入與上次執行相比有變更的卡片與福利"
+    )
+    parser.add_argument(
+        "--import-ndjson",
+        type=str,
+        help="不抓取網頁，改為串流匯入 NDJSON 目錄檔（.ndjson / .jsonl，可加 .gz）"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help=f"串流匯入或管線模式時每批寫入的卡片數 "
+             f"(預設: 匯入 {DEFAULT_IMPORT_BATCH_SIZE}，管線 {DEFAULT_PIPELINE_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="管線模式：抓取、解析與寫入資料庫同時進行，卡片以有界佇列分批寫入"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"管線模式解析與寫入之間的佇列大小（張卡片） (預設: {DEFAULT_QUEUE_SIZE})"
+    )
+    parser.add_argument(
+        "--state-file",
+        type=str,
+        help="增量同步狀態檔路徑（預設: scripts/.scraper_state/amex.json）"
+    )
+    parser.add_argument(
+        "--crawl-details",
+        action="store_true",
+        help="並行抓取每張卡片的詳細頁，並將頁面上的福利合併進卡片"
+    )
+    parser.add_argument(
+        "--crawl-workers",
+        type=int,
+        default=DEFAULT_CRAWL_WORKERS,
+        help=f"詳細頁抓取的並行數 (預設: {DEFAULT_CRAWL_WORKERS})"
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=DEFAULT_MAX_DEPTH,
+        help=f"由列表頁起算的最大抓取深度，1 為卡片詳細頁 (預設: {DEFAULT_MAX_DEPTH})"
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        help="詳細頁抓取的網頁數上限"
+    )
+    parser.add_argument(
+        "--bloom-filter",
+        action="store_true",
+        help="以 Bloom filter 取代 set 做網址去重（大型爬取時固定記憶體用量）"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="記錄執行進度（已抓取網頁、已解析與已寫入的卡片），中斷後可用 --resume 接續"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="從上次中斷的執行接續（隱含 --checkpoint）"
+    )
+    parser.add_argument(
+        "--checkpoint-file",
+        type=str,
+        default=DEFAULT_CHECKPOINT_PATH,
+        help="檢查點資料庫路徑（預設: scripts/.scraper_state/checkpoints.db）"
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        metavar="ARCHIVE",
+        help="將抓取到的每個原始回應（網址、標頭、壓縮內容）錄製到封存檔"
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        metavar="ARCHIVE",
+        help="不連網，以封存檔中的網頁重新解析（平行解析，結果可重現）"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        help="重播時的解析程序數 (預設: CPU 核心數)"
+    )
+    add_cli_arguments(parser)
 
     args = parser.parse_args()
+    run_instrumented(args, 'amex', lambda: _run(args, parser))
+
+
+def _run(args, parser):
+    """依照命令列參數執行抓取與儲存"""
+    if args.rate_limit <= 0:
+        parser.error("--rate-limit 必須大於 0")
 
     # 建立爬蟲實例
-    scraper = AmexScraper(db_path=args.db_path)
+    client = configure_default_client(rate_per_host=args.rate_limit, max_retries=args.max_retries)
+
+    cache = None
+    if args.cache_dir:
+        cache = ResponseCache(
+            args.cache_dir, ttl=args.cache_ttl, max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            session=client
+        )
+
+    if args.batch_size is not None and args.batch_size < 1:
+        parser.error("--batch-size 必須大於 0")
+
+    checkpoint = None
+    if args.checkpoint or args.resume:
+        # 不同模式的進度分開記錄
+        scope = 'amex-import' if args.import_ndjson else 'amex-pipeline' if args.pipeline else 'amex'
+        checkpoint = CheckpointStore(scope, path=args.checkpoint_file, resume=args.resume)
+        if checkpoint.resumed:
+            print(f"♻️  從上次中斷處繼續（{checkpoint.describe()}）")
+        elif args.resume:
+            print("⚠️  沒有未完成的執行可接續，重新開始")
+
+    archive = None
+    if args.record and args.replay:
+        parser.error("--record 與 --replay 不能同時使用")
+    if args.replay:
+        if not os.path.exists(args.replay):
+            parser.error(f"找不到封存檔: {args.replay}")
+        if args.pipeline or args.import_ndjson:
+            parser.error("--replay 不能與 --pipeline 或 --import-ndjson 同時使用")
+        if args.parse_workers is not None and args.parse_workers < 1:
+            parser.error("--parse-workers 必須大於 0")
+    if args.record or args.replay:
+        archive = ResponseArchive(args.record or args.replay)
+
+    if args.busy_timeout < 0:
+        parser.error("--busy-timeout 不能為負數")
+    store = CardStore(args.db_path, fast_write=args.fast_write, busy_timeout=args.busy_timeout,
+                      rejects_path=args.rejects_file)
+    scraper = AmexScraper(cache=cache, client=client, checkpoint=checkpoint,
+                          archive=archive, replay=bool(args.replay), store=store)
+
+    if args.import_ndjson:
+        # 各批共用同一個連線與名稱索引，每批只查詢該批卡片的既有資料
+        with store.warm():
+            stats = import_ndjson(
+                args.import_ndjson,
+                scraper._persist_batch,
+                batch_size=args.batch_size or DEFAULT_IMPORT_BATCH_SIZE
+            )
+        print(f"✅ 匯入完成: {stats['cards']} 張卡片，{stats['batches']} 批"
+              f"（失敗 {stats['failed_batches']} 批）")
+        finish_checkpoint(checkpoint, stats['failed_batches'] == 0)
+        return
+
+    if args.pipeline:
+        if args.display_only or args.incremental or args.crawl_details:
+            parser.error("--pipeline 不能與 --display-only、--incremental 或 --crawl-details 同時使用")
+        if args.queue_size < 1:
+            parser.error("--queue-size 必須大於 0")
+        stats = scraper.run_pipeline(
+            batch_size=args.batch_size or DEFAULT_PIPELINE_BATCH_SIZE,
+            queue_size=args.queue_size
+        )
+        finish_checkpoint(checkpoint, stats['cards'] > 0 and not (
+            stats['failed_batches'] or stats['fetch_errors'] or stats['parse_errors']
+        ))
+        return
 
     # 抓取資料
-    scraper.fetch_amex_cards()
+    if args.replay:
+        # 封存檔已包含錄製時抓取的詳細頁，重播時一併解析與合併
+        scraper.replay_archive(workers=args.parse_workers)
+    else:
+        scraper.fetch_amex_cards()
+    if args.crawl_details and not args.replay:
+        if args.crawl_workers < 1 or args.max_depth < 1:
+            parser.error("--crawl-workers 與 --max-depth 必須大於 0")
+        scraper.crawl_details(
+            max_workers=args.crawl_workers, max_depth=args.max_depth,
+            use_bloom=args.bloom_filter, max_pages=args.max_pages
+        )
 
     # 顯示結果
     scraper.display_results()
 
     # 儲存到資料庫
     if not args.display_only:
-        scraper.save_to_database()
+        sync_state = load_state('amex', args.state_file) if args.incremental else None
+        saved = scraper.save_to_database(sync_state=sync_state)
     else:
         print("⚠️  僅顯示模式，未儲存到資料庫")
+        saved = True
+    finish_checkpoint(checkpoint, saved and bool(scraper.cards))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+卡片目錄分析效能測試
+以多地區合成目錄（每個地區 N 張卡片 × M 個福利，各地區不同幣別）比較：
+- 載入：目錄轉為 NumPy 欄式陣列
+- 計算：年化金額、地區/銀行/類別彙總與排名（NumPy）
+- 逐筆計算：以 dict 累加的 Python 迴圈，並確認兩者的排名與彙總金額相同
+
+用法:
+    python benchmarks/bench_analytics.py --cards 20000 --regions 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import synthetic  # noqa: E402
+from benefit_calendar import CYCLES_PER_YEAR  # noqa: E402
+from catalog_analytics import CatalogColumns, build_report  # noqa: E402
+
+REGIONS = (('america', 'USD'), ('canada', 'CAD'), ('taiwan', 'TWD'), ('japan', 'JPY'), ('singapore', 'SGD'))
+
+
+def make_catalog(cards_per_region: int, benefits: int, regions: int):
+    cards = []
+    for seed, (region, currency) in enumerate(REGIONS[:regions]):
+        batch = synthetic.make_cards(cards_per_region, benefits, region=region, seed=seed)
+        for card in batch:
+            card['name'] = f"{card['name']} ({region})"
+            for benefit in card['benefits']:
+                benefit['currency'] = currency
+        cards.extend(batch)
+    return cards
+
+
+def loop_report(cards, top: int):
+    """以 dict 逐筆累加的對照實作：各幣別前 top 名，以及地區與類別的總額"""
+    per_card = defaultdict(float)
+    regions = defaultdict(float)
+    categories = defaultdict(float)
+    for card in cards:
+        for benefit in card['benefits']:
+            value = (benefit['amount'] or 0) * CYCLES_PER_YEAR.get(benefit['frequency'], 0)
+            if not value:
+                continue
+            currency = benefit['currency']
+            per_card[(currency, card['name'])] += value
+            regions[(currency, card['region'])] += value
+            categories[(currency, benefit['categoryEn'])] += value
+    ranking = defaultdict(list)
+    for (currency, name), value in sorted(per_card.items(), key=lambda item: -item[1]):
+        if len(ranking[currency]) < top:
+            ranking[currency].append((name, round(value, 2)))
+    return ranking, regions, categories
+
+
+def main():
+    parser = argparse.ArgumentParser(description="卡片目錄分析效能測試")
+    parser.add_argument("--cards", type=int, default=20000, help="每個地區的卡片數 (預設: 20000)")
+    parser.add_argument("--benefits", type=int, default=10, help="每張卡片的福利數 (預設: 10)")
+    parser.add_argument("--regions", type=int, default=5, choices=range(1, len(REGIONS) + 1),
+                        help=f"地區數 (預設: {len(REGIONS)})")
+    parser.add_argument("--top", type=int, default=10, help="排名列出的卡片數 (預設: 10)")
+    parser.add_argument("--iterations", type=int, default=3, help="量測次數，取最佳值 (預設: 3)")
+    args = parser.parse_args()
+
+    cards = make_catalog(args.cards, args.benefits, args.regions)
+
+    load = compute = loop = float('inf')
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        columns = CatalogColumns.from_cards(cards)
+        load = min(load, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        report = build_report(columns, group_by=('region', 'bank', 'category'), top=args.top)
+        compute = min(compute, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ranking, regions, categories = loop_report(cards, args.top)
+        loop = min(loop, time.perf_counter() - start)
+
+    # 金額相同的卡片順序可能不同，只比較金額
+    same = all(
+        [row['annualValue'] for row in report['ranking'].get(currency, [])] == [value for _, value in rows]
+        for currency, rows in ranking.items()
+    )
+    for by, expected in (('region', regions), ('category', categories)):
+        actual = {(row['currency'], row['key']): row['annualValue'] for row in report['groups'][by]}
+        same = same and actual == {key: round(value, 2) for key, value in expected.items()}
+
+    print(f"\n📊 {columns.card_count} 張卡片、{columns.benefit_count} 個福利（{args.regions} 個地區/幣別）")
+    print(f"   載入欄式陣列: {load * 1000:10.1f} ms")
+    print(f"   NumPy 計算:   {compute * 1000:10.1f} ms  (年化、3 種彙總與排名)")
+    print(f"   逐筆計算:     {loop * 1000:10.1f} ms  (年化、2 種彙總與排名)")
+    print(f"   計算加速比:   {loop / compute:10.1f}x")
+    print(f"   結果一致:     {'是' if same else '否'}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+福利週期行事曆效能測試
+以合成目錄（N 張卡片 × M 個福利，混合各種 frequency）展開指定年度的週期，
+比較 NumPy 一次計算與逐列以 datetime 計算（提醒時逐一計算的做法）的耗時，並確認兩者結果相同
+
+用法:
+    python benchmarks/bench_calendar.py --cards 5000 --years 2026-2027
+"""
+
+import argparse
+import calendar
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import synthetic  # noqa: E402
+from benefit_calendar import (  # noqa: E402
+    CYCLES_PER_YEAR, DEFAULT_REMINDER_DAYS, calendar_from_cards, parse_years,
+)
+
+FREQUENCIES = ['MONTHLY', 'QUARTERLY', 'SEMI_ANNUALLY', 'YEARLY', 'YEARLY', 'ONE_TIME']
+
+
+def _day(year: int, month: int, day: int) -> date:
+    return date(year, month, min(max(day, 1), calendar.monthrange(year, month)[1]))
+
+
+def loop_calendar(cards, years):
+    """逐一福利、逐一週期計算（與 benefit_calendar 的規則相同）"""
+    rows = []
+    for card in cards:
+        for benefit in card['benefits']:
+            if benefit.get('isPersonalCycle'):
+                continue
+            cycles = CYCLES_PER_YEAR.get(benefit.get('cycleType') or benefit.get('frequency'), 0)
+            reminder_days = benefit.get('reminderDays')
+            if reminder_days is None:
+                reminder_days = DEFAULT_REMINDER_DAYS
+            for year in years:
+                for cycle in range(1, cycles + 1):
+                    if cycles == 1:
+                        start = _day(year, benefit.get('startMonth') or 1, benefit.get('startDay') or 1)
+                        end_month, end_day = benefit.get('endMonth') or 12, benefit.get('endDay') or 31
+                        end = _day(year, end_month, end_day)
+                        if end < start:
+                            end = _day(year + 1, end_month, end_day)
+                    else:
+                        months = 12 // cycles
+                        first = (cycle - 1) * months + 1
+                        last = first + months - 1
+                        start = date(year, first, 1)
+                        end = date(year, last, calendar.monthrange(year, last)[1])
+                    reminder = max(start, end - timedelta(days=reminder_days))
+                    rows.append((year, cycle, start, end, reminder))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="福利週期行事曆效能測試")
+    parser.add_argument("--cards", type=int, default=5000, help="合成目錄的卡片數 (預設: 5000)")
+    parser.add_argument("--benefits", type=int, default=10, help="每張卡片的福利數 (預設: 10)")
+    parser.add_argument("--years", type=parse_years, default='2026-2027', help="展開的年度 (預設: 2026-2027)")
+    parser.add_argument("--iterations", type=int, default=3, help="量測次數，取最佳值 (預設: 3)")
+    args = parser.parse_args()
+
+    cards = synthetic.make_cards(args.cards, args.benefits)
+    for i, benefit in enumerate(b for card in cards for b in card['benefits']):
+        benefit['frequency'] = FREQUENCIES[i % len(FREQUENCIES)]
+        benefit['endMonth'], benefit['endDay'] = (6, 30) if i % 7 == 0 else (12, 31)
+
+    vectorized = loop = float('inf')
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        result = calendar_from_cards(cards, args.years)
+        vectorized = min(vectorized, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        expected = loop_calendar(cards, args.years)
+        loop = min(loop, time.perf_counter() - start)
+
+    actual = list(zip(result.year.tolist(), result.cycle.tolist(), result.period_start.tolist(),
+                      result.period_end.tolist(), result.reminder_date.tolist()))
+    print(f"\n📅 {len(result.benefits)} 個福利 × {len(args.years)} 個年度 → {len(result)} 個週期")
+    print(f"   NumPy:      {vectorized * 1000:10.1f} ms  ({len(result) / vectorized:,.0f} 列/秒)")
+    print(f"   逐列計算:   {loop * 1000:10.1f} ms")
+    print(f"   加速比:     {loop / vectorized:10.1f}x")
+    print(f"   結果一致:   {'是' if actual == expected else '否'}")
+    if actual != expected:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
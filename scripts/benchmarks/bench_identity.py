@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+卡片名稱比對效能測試
+以 N 張既有卡片建立 CardIdentityIndex，再比對 N 個寫法略有不同的名稱，
+與逐一計算相似度的兩兩比較做對照（兩兩比較只抽樣部分查詢後換算）
+
+用法:
+    python benchmarks/bench_identity.py --cards 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card_identity import CardIdentityIndex, _signature  # noqa: E402
+
+
+WORDS = [
+    'Sapphire', 'Freedom', 'Venture', 'Quicksilver', 'Double', 'Cash', 'Gold', 'Platinum',
+    'Blue', 'Everyday', 'Preferred', 'Reserve', 'Unlimited', 'Rewards', 'Travel', 'Miles',
+    'Premier', 'Select', 'Signature', 'Infinite', 'Business', 'Bonvoy', 'Honors', 'SkyMiles',
+]
+BANKS = ['Chase', 'Citi', 'Capital One', 'American Express', 'Wells Fargo', 'Discover', 'TD', 'Scotiabank']
+
+
+def make_names(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        words = ' '.join(rng.sample(WORDS, 3))
+        names.add(f"{rng.choice(BANKS)} {words} {rng.randint(1, count)} Card")
+    return sorted(names)
+
+
+def variant(name: str, rng: random.Random) -> str:
+    """同一張卡片的另一種寫法：商標符號、大小寫、通用字或一個字元的錯字"""
+    choice = rng.randrange(4)
+    if choice == 0:
+        return name.replace(' Card', '® Card')
+    if choice == 1:
+        return name.upper().replace(' CARD', ' CREDIT CARD')
+    if choice == 2:
+        return name.replace(' Card', '')
+    words = name.split()
+    i = rng.randrange(1, len(words) - 2)
+    if len(words[i]) > 4:
+        words[i] = words[i][:-2] + words[i][-1] + words[i][-2]
+    return ' '.join(words)
+
+
+def pairwise_match(names, query, threshold):
+    _, grams, guard = _signature(query)
+    best = None
+    for name in names:
+        _, other, other_guard = _signature(name)
+        if other_guard != guard:
+            continue
+        shared = len(grams & other)
+        score = shared / (len(grams) + len(other) - shared)
+        if score >= threshold and (best is None or score > best[1]):
+            best = (name, score)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="卡片名稱比對效能測試")
+    parser.add_argument("--cards", type=int, default=5000, help="既有卡片數 (預設: 5000)")
+    parser.add_argument("--pairwise-sample", type=int, default=200, help="兩兩比較抽樣的查詢數 (預設: 200)")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    names = make_names(args.cards)
+    queries = [variant(name, rng) for name in names]
+
+    start = time.perf_counter()
+    index = CardIdentityIndex()
+    for name in names:
+        index.add(name)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matched = sum(1 for query, name in zip(queries, names) if index.resolve(query) == name)
+    lookup = time.perf_counter() - start
+
+    sample = queries[:args.pairwise_sample]
+    start = time.perf_counter()
+    for query in sample:
+        pairwise_match(names, query, index.threshold)
+    pairwise = (time.perf_counter() - start) / max(1, len(sample)) * len(queries)
+
+    print(f"\n🔎 {args.cards} 張卡片 × {len(queries)} 個查詢")
+    print(f"   建立索引:   {build * 1000:10.1f} ms")
+    print(f"   索引比對:   {lookup * 1000:10.1f} ms  ({len(queries) / lookup:,.0f} 次/秒，正確對應 {matched / len(queries):.1%})")
+    print(f"   兩兩比較:   {pairwise * 1000:10.1f} ms  (由 {len(sample)} 個查詢換算)")
+    print(f"   加速比:     {pairwise / lookup:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
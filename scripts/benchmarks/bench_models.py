@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+卡片模型記憶體測試
+比較從 JSON 載入的 dict 目錄與轉換為 Card / Benefit（__slots__ + intern）後的
+記憶體用量，以及兩個方向的轉換時間
+
+用法:
+    python benchmarks/bench_models.py
+    python benchmarks/bench_models.py --cards 20000 --benefits 10
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import to_cards, to_dicts  # noqa: E402
+from synthetic import make_cards  # noqa: E402
+
+
+def measure(build: Callable[[], object]) -> Tuple[object, float, float]:
+    """回傳 (結果, 秒數, 結果佔用的記憶體 MB)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, current / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="卡片模型記憶體測試")
+    parser.add_argument("--cards", type=int, default=5000, help="卡片數 (預設: 5000)")
+    parser.add_argument("--benefits", type=int, default=10, help="每張卡片的福利數 (預設: 10)")
+    args = parser.parse_args()
+
+    # 以 JSON 往返模擬實際從 API / 檔案載入的資料（每個字串值都是獨立物件）
+    payload = json.dumps(make_cards(args.cards, args.benefits), ensure_ascii=False)
+    rows = args.cards * args.benefits
+
+    dicts, dict_seconds, dict_mb = measure(lambda: json.loads(payload))
+    cards, card_seconds, card_mb = measure(lambda: to_cards(json.loads(payload)))
+    _, back_seconds, _ = measure(lambda: to_dicts(cards))
+
+    print(f"\n📦 {args.cards} 張卡片 × {args.benefits} 個福利")
+    print(f"{'格式':<20}{'記憶體 (MB)':>14}{'每個福利 (bytes)':>20}{'載入時間 (ms)':>16}")
+    print(f"{'dict':<20}{dict_mb:>14.1f}{dict_mb * 1024 * 1024 / rows:>20.0f}{dict_seconds * 1000:>16.1f}")
+    print(f"{'Card / Benefit':<20}{card_mb:>14.1f}{card_mb * 1024 * 1024 / rows:>20.0f}{card_seconds * 1000:>16.1f}")
+    print(f"\n記憶體減少 {(1 - card_mb / dict_mb) * 100:.0f}%，"
+          f"to_dicts 轉回 dict 需 {back_seconds * 1000:.1f} ms")
+    del dicts
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+_parse_amex_page 解析效能測試
+比較完整解析（舊做法）與 SoupStrainer 部分解析在 html.parser / lxml 下的
+解析時間與峰值記憶體
+
+用法:
+    python benchmarks/bench_parse.py                       # 使用合成的大型網頁
+    python benchmarks/bench_parse.py --pages saved/*.html  # 使用儲存下來的真實網頁
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from amex_scraper import AmexScraper, html_tools  # noqa: E402
+from synthetic import make_product_page  # noqa: E402
+
+
+def _available_parsers() -> List[str]:
+    parsers = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        parsers.append('lxml')
+    except ImportError:
+        pass
+    return parsers
+
+
+def _engines(scraper: AmexScraper) -> List[Tuple[str, Callable[[bytes], list]]]:
+    engines = []
+    for parser in _available_parsers():
+        engines.append((
+            f"full soup ({parser})",
+            lambda html, p=parser: scraper._parse_amex_page(BeautifulSoup(html, p)),
+        ))
+        engines.append((
+            f"strainer ({parser})",
+            lambda html, p=parser: scraper._parse_amex_page(
+                BeautifulSoup(html, p, parse_only=html_tools().card_containers)
+            ),
+        ))
+    return engines
+
+
+def measure(fn: Callable[[bytes], list], html: bytes, repeat: int) -> Tuple[float, float, int]:
+    """回傳 (中位數秒數, 峰值記憶體 MB, 卡片數)"""
+    timings = []
+    cards = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cards = fn(html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak / (1024 * 1024), len(cards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="_parse_amex_page 解析效能測試")
+    parser.add_argument("--pages", nargs="*", help="儲存下來的 HTML 檔案")
+    parser.add_argument("--cards", type=int, default=500, help="合成網頁的卡片數 (預設: 500)")
+    parser.add_argument("--noise", type=int, default=20, help="每張卡片的無關節點數 (預設: 20)")
+    parser.add_argument("--repeat", type=int, default=3, help="每個引擎重複次數 (預設: 3)")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = [(path, open(path, 'rb').read()) for path in args.pages]
+    else:
+        pages = [("synthetic", make_product_page(args.cards, args.noise).encode('utf-8'))]
+
+    scraper = AmexScraper(db_path=':memory:')
+
+    for name, html in pages:
+        print(f"\n📄 {name} ({len(html) / 1024:.0f} KB)")
+        print(f"{'引擎':<26}{'時間 (ms)':>12}{'峰值記憶體 (MB)':>18}{'卡片數':>8}")
+        for engine_name, fn in _engines(scraper):
+            seconds, peak_mb, count = measure(fn, html, args.repeat)
+            print(f"{engine_name:<26}{seconds * 1000:>12.1f}{peak_mb:>18.1f}{count:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+多程序解析擴展性測試
+以 ParseExecutor 解析一批合成的列表頁，比較不同工作程序數的總時間、吞吐量與加速比
+
+用法:
+    python benchmarks/bench_parse_scaling.py                    # 1、2、4… 到 CPU 核心數
+    python benchmarks/bench_parse_scaling.py --pages 200 --workers 1,2,4,8
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amex_scraper import parse_page  # noqa: E402
+from parse_executor import ParseExecutor  # noqa: E402
+from synthetic import make_product_page  # noqa: E402
+
+
+def _default_workers() -> List[int]:
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def run(pages: List[bytes], workers: int) -> float:
+    start = time.perf_counter()
+    with ParseExecutor(parse_page, workers=workers) as executor:
+        results = list(executor.map((i, 'listing', html) for i, html in enumerate(pages)))
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for result in results if not result.ok)
+    if failed:
+        raise RuntimeError(f"{failed} 頁解析失敗")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多程序解析擴展性測試")
+    parser.add_argument("--pages", type=int, default=64, help="網頁數 (預設: 64)")
+    parser.add_argument("--cards", type=int, default=100, help="每頁卡片數 (預設: 100)")
+    parser.add_argument("--noise", type=int, default=20, help="每張卡片的無關節點數 (預設: 20)")
+    parser.add_argument("--workers", type=str, help="以逗號分隔的工作程序數 (預設: 1、2、4… 到 CPU 核心數)")
+    args = parser.parse_args()
+
+    counts = [int(value) for value in args.workers.split(',')] if args.workers else _default_workers()
+    # 每頁內容略有不同，避免結果只反映單一網頁
+    pages = [
+        make_product_page(args.cards + i % 7, args.noise).encode('utf-8')
+        for i in range(args.pages)
+    ]
+    size_mb = sum(len(page) for page in pages) / (1024 * 1024)
+
+    print(f"\n📄 {args.pages} 頁 ({size_mb:.1f} MB)，CPU 核心數 {os.cpu_count()}")
+    print(f"{'工作程序':<10}{'時間 (s)':>12}{'頁/秒':>12}{'加速比':>10}")
+    baseline = None
+    for workers in counts:
+        elapsed = run(pages, workers)
+        baseline = baseline or elapsed
+        print(f"{workers:<10}{elapsed:>12.2f}{args.pages / elapsed:>12.1f}{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+啟動時間效能測試
+每次量測都啟動新的 Python 程序，測量匯入各爬蟲模組的時間（扣除直譯器本身的啟動時間），
+並列出匯入後已載入的重量級模組；requests、bs4 與 sqlite3 應只在實際用到時才載入。
+加上 --importtime 時另以 -X importtime 列出最耗時的匯入項目。
+
+用法:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --modules amex_scraper --runs 20 --importtime
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ['amex_scraper', 'credit_card_scraper', 'scrapers', 'card_store']
+HEAVY_MODULES = ['requests', 'bs4', 'lxml', 'sqlite3', 'concurrent.futures.process']
+
+
+def _run(code: str, extra: List[str] = None) -> subprocess.CompletedProcess:
+    cmd = [sys.executable] + (extra or []) + ['-c', code]
+    return subprocess.run(cmd, cwd=SCRIPTS_DIR, capture_output=True, text=True)
+
+
+def measure(code: str, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = _run(code)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
+    return timings
+
+
+def loaded_heavy_modules(module: str) -> List[str]:
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    return [name for name in _run(code).stdout.strip().split(',') if name]
+
+
+def top_imports(module: str, limit: int) -> List[Tuple[int, str]]:
+    """-X importtime 的輸出中，該模組直接匯入且累計時間最長的項目（微秒, 名稱）"""
+    result = _run(f"import {module}", ['-X', 'importtime'])
+    children: List[Tuple[int, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or line.count('|') != 2:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            # 子模組的輸出在父模組之前，遇到頂層模組即結算
+            if name.strip() == module:
+                return sorted(children, reverse=True)[:limit]
+            children = []
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="啟動時間效能測試")
+    parser.add_argument("--modules", type=str, default=','.join(DEFAULT_MODULES),
+                        help=f"要量測的模組，以逗號分隔 (預設: {','.join(DEFAULT_MODULES)})")
+    parser.add_argument("--runs", type=int, default=10, help="每個模組的量測次數 (預設: 10)")
+    parser.add_argument("--importtime", action="store_true", help="列出最耗時的匯入項目")
+    parser.add_argument("--top", type=int, default=8, help="--importtime 列出的項目數 (預設: 8)")
+    args = parser.parse_args()
+
+    modules = [name.strip() for name in args.modules.split(',') if name.strip()]
+    interpreter = statistics.median(measure('pass', args.runs))
+
+    print(f"\n🚀 啟動時間（{args.runs} 次中位數，直譯器本身 {interpreter * 1000:.1f} ms 已扣除）")
+    print(f"{'模組':<22}{'匯入 (ms)':>12}  已載入的重量級模組")
+    for module in modules:
+        elapsed = statistics.median(measure(f"import {module}", args.runs)) - interpreter
+        heavy = loaded_heavy_modules(module)
+        print(f"{module:<22}{elapsed * 1000:>12.1f}  {', '.join(heavy) or '-'}")
+
+        if args.importtime:
+            for cumulative, name in top_imports(module, args.top):
+                print(f"{'':<4}{name:<30}{cumulative / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
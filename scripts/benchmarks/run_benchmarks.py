@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+爬蟲熱路徑效能測試套件
+以合成資料測量 抓取 → 解析 → 儲存 的主要步驟：
+- parse:   AmexScraper._parse_amex_page（大型產品頁）
+- save:    AmexScraper.save_to_database（暫存 SQLite，Prisma 相同欄位）
+- sql:     CreditCardScraper.generate_sql
+- json:    CreditCardScraper.export_json（JSON 與 NDJSON）
+
+每項測試在獨立子程序中執行，回報吞吐量、p50/p99 延遲與峰值 RSS，
+並與 baseline.json 比較，超過容許範圍時以非零狀態碼結束。
+
+用法:
+    python benchmarks/run_benchmarks.py                     # 執行並與 baseline 比較
+    python benchmarks/run_benchmarks.py --update-baseline   # 更新 baseline
+    python benchmarks/run_benchmarks.py --only save,sql --cards 5000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import synthetic  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _peak_rss_mb() -> float:
+    """目前程序的峰值 RSS（MB）；不支援 resource 模組的平台回傳 0"""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 單位為 KB，macOS 為 bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+# 每個測試回傳 (準備函式, 執行函式, 每次處理的項目數, 項目單位)
+def bench_parse(args) -> Tuple[Callable, Callable, int, str]:
+    from amex_scraper import AmexScraper
+    html = synthetic.make_product_page(args.page_cards, args.page_noise).encode('utf-8')
+    scraper = AmexScraper(db_path=':memory:')
+
+    def run(_):
+        scraper._parse_amex_page(html)
+
+    return (lambda: None), run, args.page_cards, 'cards'
+
+
+def bench_save(args) -> Tuple[Callable, Callable, int, str]:
+    from amex_scraper import AmexScraper
+    cards = synthetic.make_cards(args.cards, args.benefits)
+    tmp_dir = tempfile.mkdtemp(prefix='bench-save-')
+    counter = [0]
+
+    def setup():
+        # 每次都寫入全新的資料庫，量測的是完整的初次匯入
+        counter[0] += 1
+        db_path = os.path.join(tmp_dir, f'bench-{counter[0]}.db')
+        synthetic.create_schema(db_path)
+        scraper = AmexScraper(db_path=db_path)
+        scraper.cards = cards
+        return scraper
+
+    def run(scraper):
+        if not scraper.save_to_database():
+            raise RuntimeError("save_to_database 失敗")
+        os.remove(scraper.db_path)
+
+    return setup, run, args.cards * (args.benefits + 1), 'rows'
+
+
+def bench_sql(args) -> Tuple[Callable, Callable, int, str]:
+    from credit_card_scraper import CreditCardScraper
+    scraper = CreditCardScraper(region='america')
+    scraper.cards = synthetic.make_cards(args.cards, args.benefits)
+    output = os.path.join(tempfile.mkdtemp(prefix='bench-sql-'), 'seed.sql')
+
+    def run(_):
+        scraper.generate_sql(output)
+
+    return (lambda: None), run, args.cards * (args.benefits + 1), 'rows'
+
+
+def _bench_export(args, filename: str) -> Tuple[Callable, Callable, int, str]:
+    from credit_card_scraper import CreditCardScraper
+    scraper = CreditCardScraper(region='america')
+    scraper.cards = synthetic.make_cards(args.cards, args.benefits)
+    output = os.path.join(tempfile.mkdtemp(prefix='bench-json-'), filename)
+
+    def run(_):
+        scraper.export_json(output)
+
+    return (lambda: None), run, args.cards, 'cards'
+
+
+def bench_json(args):
+    return _bench_export(args, 'cards.json')
+
+
+def bench_ndjson(args):
+    return _bench_export(args, 'cards.ndjson')
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    'parse': bench_parse,
+    'save': bench_save,
+    'sql': bench_sql,
+    'json': bench_json,
+    'ndjson': bench_ndjson,
+}
+
+
+def run_worker(name: str, args) -> Dict:
+    """在子程序中執行單一測試（爬蟲的狀態輸出會被隱藏）"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup, run, items, unit = BENCHMARKS[name](args)
+
+        for _ in range(args.warmup):
+            run(setup())
+
+        timings = []
+        for _ in range(args.iterations):
+            state = setup()
+            start = time.perf_counter()
+            run(state)
+            timings.append(time.perf_counter() - start)
+
+    p50 = _percentile(timings, 50)
+    return {
+        'name': name,
+        'iterations': len(timings),
+        'items': items,
+        'unit': unit,
+        'p50_ms': p50 * 1000,
+        'p99_ms': _percentile(timings, 99) * 1000,
+        'throughput': items / p50 if p50 > 0 else 0.0,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def run_isolated(name: str, argv: List[str]) -> Dict:
+    """以獨立子程序執行，讓峰值 RSS 只反映該項測試"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', name] + argv
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} 執行失敗:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """回傳退步的項目說明（p50 變慢或峰值 RSS 增加超過容許比例）"""
+    regressions = []
+    for result in results:
+        base = baseline.get('results', {}).get(result['name'])
+        if not base:
+            continue
+        for metric in ('p50_ms', 'peak_rss_mb'):
+            if base.get(metric) and result[metric] > base[metric] * (1 + tolerance):
+                change = (result[metric] / base[metric] - 1) * 100
+                regressions.append(
+                    f"{result['name']}.{metric}: {base[metric]:.1f} → {result[metric]:.1f} (+{change:.0f}%)"
+                )
+    return regressions
+
+
+def print_table(results: List[Dict], baseline: Dict):
+    base_results = baseline.get('results', {})
+    print(f"\n{'測試':<8}{'p50 (ms)':>12}{'p99 (ms)':>12}{'吞吐量':>18}{'峰值 RSS (MB)':>16}{'vs baseline':>14}")
+    for r in results:
+        base = base_results.get(r['name'])
+        delta = ''
+        if base and base.get('p50_ms'):
+            delta = f"{(r['p50_ms'] / base['p50_ms'] - 1) * 100:+.0f}%"
+        throughput = f"{r['throughput']:,.0f} {r['unit']}/s"
+        print(f"{r['name']:<8}{r['p50_ms']:>12.1f}{r['p99_ms']:>12.1f}{throughput:>18}"
+              f"{r['peak_rss_mb']:>16.1f}{delta:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬蟲熱路徑效能測試套件")
+    parser.add_argument("--only", type=str, help=f"只執行指定測試，以逗號分隔 ({','.join(BENCHMARKS)})")
+    parser.add_argument("--cards", type=int, default=1000, help="合成目錄的卡片數 (預設: 1000)")
+    parser.add_argument("--benefits", type=int, default=10, help="每張卡片的福利數 (預設: 10)")
+    parser.add_argument("--page-cards", type=int, default=300, help="合成產品頁的卡片數 (預設: 300)")
+    parser.add_argument("--page-noise", type=int, default=20, help="產品頁每張卡片的無關節點數 (預設: 20)")
+    parser.add_argument("--iterations", type=int, default=7, help="每項測試的量測次數 (預設: 7)")
+    parser.add_argument("--warmup", type=int, default=1, help="暖身次數 (預設: 1)")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE, help="baseline 檔案路徑")
+    parser.add_argument("--update-baseline", action="store_true", help="以本次結果覆寫 baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="允許比 baseline 慢/大的比例，超過視為退步 (預設: 0.25)")
+    parser.add_argument("--worker", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args)))
+        return
+
+    names = list(BENCHMARKS)
+    if args.only:
+        names = [name.strip() for name in args.only.split(',') if name.strip()]
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            parser.error(f"未知的測試: {', '.join(unknown)}")
+
+    worker_argv = [
+        '--cards', str(args.cards), '--benefits', str(args.benefits),
+        '--page-cards', str(args.page_cards), '--page-noise', str(args.page_noise),
+        '--iterations', str(args.iterations), '--warmup', str(args.warmup),
+    ]
+
+    print(f"🏁 執行效能測試: {', '.join(names)} "
+          f"({args.cards} 張卡片 × {args.benefits} 個福利，{args.iterations} 次)")
+    results = []
+    for name in names:
+        print(f"   ⏱  {name} ...")
+        results.append(run_isolated(name, worker_argv))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') and baseline['params'] != {
+            'cards': args.cards, 'benefits': args.benefits,
+            'page_cards': args.page_cards, 'page_noise': args.page_noise,
+        }:
+            print("⚠️  測試參數與 baseline 不同，比較結果僅供參考")
+
+    print_table(results, baseline)
+
+    if args.update_baseline:
+        data = {
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'params': {
+                'cards': args.cards, 'benefits': args.benefits,
+                'page_cards': args.page_cards, 'page_noise': args.page_noise,
+            },
+            'results': {r['name']: r for r in results},
+        }
+        # 只更新本次執行的項目，保留其他項目的 baseline
+        if baseline.get('results'):
+            data['results'] = dict(baseline['results'], **data['results'])
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"\n✅ baseline 已更新: {args.baseline}")
+        return
+
+    if not baseline:
+        print("\n⚠️  沒有 baseline，可使用 --update-baseline 建立")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ 效能退步（容許 {args.tolerance:.0%}）:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+
+    print(f"\n✅ 沒有超過 {args.tolerance:.0%} 的效能退步")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+效能測試用的合成資料
+- N 張卡片 × M 個福利的目錄（與爬蟲共用的 dict 格式相同）
+- 結構類似發卡機構產品頁的大型 HTML
+- 與 Prisma schema 相同欄位的 CreditCard / Benefit SQLite 表格
+"""
+
+import random
+import sqlite3
+from typing import Dict, List
+
+
+FREQUENCIES = ('MONTHLY', 'QUARTERLY', 'YEARLY', 'ONE_TIME')
+CATEGORIES = (
+    ('旅行回饋', 'Travel Credit'),
+    ('餐飲回饋', 'Dining Credit'),
+    ('串流服務', 'Streaming Credit'),
+    ('超市回饋', 'Grocery Rewards'),
+)
+BANKS = ('American Express', 'Chase', 'Citibank', 'Capital One')
+
+
+def make_cards(num_cards: int = 1000, benefits_per_card: int = 10,
+               region: str = 'america', seed: int = 42) -> List[Dict]:
+    """產生固定亂數種子的合成卡片目錄（結果可重現）"""
+    rng = random.Random(seed)
+    cards = []
+    for i in range(num_cards):
+        bank = BANKS[i % len(BANKS)]
+        benefits = []
+        for j in range(benefits_per_card):
+            category, category_en = CATEGORIES[j % len(CATEGORIES)]
+            frequency = FREQUENCIES[rng.randrange(len(FREQUENCIES))]
+            amount = rng.choice((None, 10, 20, 50, 100, 200, 300))
+            benefits.append({
+                'category': category,
+                'categoryEn': category_en,
+                'title': f'福利 {i}-{j}',
+                'titleEn': f"Benefit {i}-{j} ({category_en})",
+                'description': f'卡片 {i} 的第 {j} 項福利',
+                'descriptionEn': f"Benefit {j} of synthetic card {i} - it's a test",
+                'amount': amount,
+                'currency': 'USD',
+                'frequency': frequency,
+                'startMonth': 1,
+                'startDay': 1,
+                'endMonth': 12,
+                'endDay': 31,
+                'reminderDays': 7 if frequency == 'MONTHLY' else 30,
+            })
+        cards.append({
+            'name': f'合成卡片 {i}',
+            'nameEn': f'Synthetic Rewards Card {i}',
+            'bank': bank,
+            'bankEn': bank,
+            'issuer': bank,
+            'region': region,
+            'description': f'合成測試卡片 {i}',
+            'descriptionEn': f'Synthetic benchmark card {i}',
+            'photo': f'/images/cards/synthetic-{i}.png',
+            'benefits': benefits,
+        })
+    return cards
+
+
+def make_product_page(num_cards: int = 500, noise_per_card: int = 20) -> str:
+    """產生結構類似發卡機構產品頁的大型 HTML：卡片容器夾雜大量無關節點"""
+    parts = ['<html><head><title>Credit Cards</title></head><body>']
+    for i in range(num_cards):
+        for j in range(noise_per_card):
+            parts.append(
+                f'<div class="layout-{j}"><span>nav {i}-{j}</span>'
+                f'<a href="/link/{i}/{j}">Learn more</a><p>Lorem ipsum dolor sit amet.</p></div>'
+            )
+        parts.append(
+            f'<div class="card-tile product-{i}"><div class="card-art"><img src="/img/{i}.png"></div>'
+            f'<h3>Sample Rewards Card {i}</h3><ul><li>4x points</li><li>$100 credit</li></ul></div>'
+        )
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+# 與 apps/backend/prisma/schema.prisma 的 CreditCard / Benefit 相同欄位（SQLite 型別）
+PRISMA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS CreditCard (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    nameEn TEXT,
+    bank TEXT NOT NULL,
+    bankEn TEXT,
+    issuer TEXT,
+    region TEXT NOT NULL DEFAULT 'taiwan',
+    type TEXT NOT NULL DEFAULT 'personal',
+    description TEXT,
+    descriptionEn TEXT,
+    photo TEXT,
+    fee TEXT,
+    displayPriority INTEGER NOT NULL DEFAULT 999,
+    isActive BOOLEAN NOT NULL DEFAULT true,
+    createdAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updatedAt DATETIME NOT NULL
+);
+CREATE TABLE IF NOT EXISTS Benefit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cardId INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    categoryEn TEXT,
+    title TEXT NOT NULL,
+    titleEn TEXT,
+    description TEXT NOT NULL,
+    descriptionEn TEXT,
+    amount REAL,
+    currency TEXT NOT NULL DEFAULT 'TWD',
+    frequency TEXT NOT NULL DEFAULT 'YEARLY',
+    cycleType TEXT,
+    startMonth INTEGER,
+    startDay INTEGER,
+    endMonth INTEGER,
+    endDay INTEGER,
+    isPersonalCycle BOOLEAN NOT NULL DEFAULT false,
+    reminderDays INTEGER NOT NULL DEFAULT 30,
+    notifiable BOOLEAN NOT NULL DEFAULT true,
+    isActive BOOLEAN NOT NULL DEFAULT true,
+    createdAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updatedAt DATETIME NOT NULL,
+    FOREIGN KEY (cardId) REFERENCES CreditCard(id) ON DELETE CASCADE
+);
+"""
+
+
+def create_schema(db_path: str):
+    """建立 Prisma 對應的 CreditCard / Benefit 表格"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(PRISMA_SCHEMA)
+    conn.close()
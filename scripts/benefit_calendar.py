@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+福利週期行事曆
+將每個福利依 frequency 展開成各年度的週期區間與提醒日期（MONTHLY 12 列、QUARTERLY 4 列、
+SEMI_ANNUALLY 2 列、YEARLY 1 列，ONE_TIME 與依開卡日計算的個人化週期不展開），
+整份目錄以 NumPy 的日期陣列一次計算，輸出成檔案或資料庫的 BenefitCalendar 表格，
+提醒排程可直接以 (benefitId, year, cycleNumber) 對應 UserBenefit，不必在提醒時逐一計算。
+
+月/季/半年為日曆週期，結束於週期最後一天（與後端 benefitDeadline.ts 相同）；
+年度週期依 startMonth/startDay ~ endMonth/endDay（未填為 1/1 ~ 12/31），結束日早於開始日時跨年，
+結束日與後端 reminder.ts 的 endMonth/endDay 相同。benefitDeadline.ts 的 ANNUALLY 一律結束於 12/31，
+設有其他 endMonth/endDay 的年度福利兩者結果不同。
+提醒日期為週期結束日往前 reminderDays 天，但不早於週期開始日。
+
+用法:
+    python benefit_calendar.py --input catalog.json --output calendar.csv
+    python benefit_calendar.py --db-path ../apps/backend/prisma/dev.db --years 2026-2027 --write-table
+"""
+
+import argparse
+import csv
+import json
+import sys
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from card_store import DEFAULT_BUSY_TIMEOUT, DEFAULT_DB_PATH
+from catalog_io import is_ndjson_path, load_catalog, open_text
+from metrics import metrics
+
+
+# 每年的週期數；未列出的 frequency（例如 ONE_TIME）沒有週期
+CYCLES_PER_YEAR = {
+    'MONTHLY': 12,
+    'CALENDAR_MONTH': 12,
+    'QUARTERLY': 4,
+    'SEMI_ANNUALLY': 2,
+    'YEARLY': 1,
+    'ANNUALLY': 1,
+}
+ONE_TIME_FREQUENCIES = frozenset(('ONE_TIME', 'ONCE'))
+
+# 與 Prisma schema 的 Benefit.reminderDays 預設值相同
+DEFAULT_REMINDER_DAYS = 30
+
+CALENDAR_TABLE = 'BenefitCalendar'
+# 輸出欄位（前六欄為福利識別資訊，其餘為週期資料）
+CALENDAR_FIELDS = (
+    'benefitId', 'cardName', 'bank', 'region', 'title', 'titleEn',
+    'frequency', 'year', 'cycleNumber', 'periodStart', 'periodEnd', 'reminderDate', 'reminderDays',
+)
+
+# build_calendar 需要的欄位（順序同 _BENEFIT_QUERY 第 7 欄起）
+CYCLE_COLUMNS = (
+    'frequency', 'startMonth', 'startDay', 'endMonth', 'endDay', 'reminderDays', 'isPersonalCycle',
+)
+
+_BENEFIT_QUERY = """
+    SELECT b.id, c.name, c.bank, c.region, b.title, b.titleEn,
+           COALESCE(b.cycleType, b.frequency), b.startMonth, b.startDay, b.endMonth, b.endDay,
+           b.reminderDays, b.isPersonalCycle
+    FROM Benefit b JOIN CreditCard c ON c.id = b.cardId
+    WHERE b.isActive = 1 AND c.isActive = 1
+    ORDER BY b.id
+"""
+
+
+class BenefitCalendar:
+    """
+    展開後的週期表（欄式儲存）
+    benefits 為每個福利的識別資訊，其餘屬性為每列一個元素的 NumPy 陣列，
+    benefit_index 指向 benefits 中的位置
+    """
+
+    def __init__(self, benefits: List[Dict], benefit_index: np.ndarray, year: np.ndarray,
+                 cycle: np.ndarray, period_start: np.ndarray, period_end: np.ndarray,
+                 reminder_date: np.ndarray, reminder_days: np.ndarray,
+                 skipped: Optional[Dict[str, int]] = None):
+        self.benefits = benefits
+        self.benefit_index = benefit_index
+        self.year = year
+        self.cycle = cycle
+        self.period_start = period_start
+        self.period_end = period_end
+        self.reminder_date = reminder_date
+        self.reminder_days = reminder_days
+        # 未展開的福利數（one_time / personal / unknown）
+        self.skipped = skipped or {}
+
+    def __len__(self) -> int:
+        return len(self.cycle)
+
+    def rows(self) -> Iterator[Dict]:
+        """逐列產生 CALENDAR_FIELDS 對應的 dict（日期為 YYYY-MM-DD 字串）"""
+        columns = zip(
+            self.benefit_index.tolist(), self.year.tolist(), self.cycle.tolist(),
+            self.period_start.astype(str).tolist(), self.period_end.astype(str).tolist(),
+            self.reminder_date.astype(str).tolist(), self.reminder_days.tolist(),
+        )
+        for index, year, cycle, start, end, reminder, days in columns:
+            row = dict(self.benefits[index])
+            row.update(year=year, cycleNumber=cycle, periodStart=start, periodEnd=end,
+                       reminderDate=reminder, reminderDays=days)
+            yield row
+
+
+def _int_column(values: Sequence, default: int) -> np.ndarray:
+    return np.array([default if value is None else int(value) for value in values], dtype=np.int64)
+
+
+def _month_day(months: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """months 為 datetime64[M]；日期超過該月天數時取月底（例如 2/30 → 2/28）"""
+    first = months.astype('datetime64[D]')
+    month_days = ((months + 1).astype('datetime64[D]') - first).astype(np.int64)
+    return first + np.clip(days, 1, month_days) - 1
+
+
+def build_calendar(benefits: List[Dict], columns: Dict[str, list], years: Sequence[int]) -> BenefitCalendar:
+    """
+    依欄位陣列展開週期
+    columns 需包含 CYCLE_COLUMNS 的每個欄位，每個欄位的第 i 個值對應 benefits[i]
+    """
+    frequencies = [str(value or '').upper() for value in columns['frequency']]
+    personal = [bool(value) for value in columns['isPersonalCycle']]
+    skipped = {'one_time': 0, 'personal': 0, 'unknown': 0}
+    counts = []
+    for frequency, is_personal in zip(frequencies, personal):
+        cycles = CYCLES_PER_YEAR.get(frequency, 0)
+        if not cycles:
+            skipped['one_time' if not frequency or frequency in ONE_TIME_FREQUENCIES else 'unknown'] += 1
+        elif is_personal:
+            # 週期依各使用者的開卡日而定，無法預先計算
+            skipped['personal'] += 1
+            cycles = 0
+        counts.append(cycles)
+
+    years = np.asarray(years, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+
+    # (福利, 年度) 的組合，再依週期數展開成列
+    pair_benefit = np.repeat(np.arange(len(counts)), len(years))
+    pair_year = np.tile(years, len(counts))
+    pair_cycles = np.repeat(counts, len(years))
+    benefit_index = np.repeat(pair_benefit, pair_cycles)
+    year = np.repeat(pair_year, pair_cycles)
+    per_year = np.repeat(pair_cycles, pair_cycles)
+    offsets = np.cumsum(pair_cycles) - pair_cycles
+    cycle = np.arange(len(benefit_index), dtype=np.int64) - np.repeat(offsets, pair_cycles) + 1
+
+    year_start = (year - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+
+    # 月/季/半年：日曆週期
+    months_per_cycle = 12 // np.maximum(per_year, 1)
+    cycle_month = year_start + (cycle - 1) * months_per_cycle
+    period_start = cycle_month.astype('datetime64[D]')
+    period_end = (cycle_month + months_per_cycle).astype('datetime64[D]') - 1
+
+    # 年度：依福利的起訖月日
+    annual = per_year == 1
+    if annual.any():
+        index = benefit_index[annual]
+        start_month = np.clip(_int_column(columns['startMonth'], 1), 1, 12)[index]
+        start_day = _int_column(columns['startDay'], 1)[index]
+        end_month = np.clip(_int_column(columns['endMonth'], 12), 1, 12)[index]
+        end_day = _int_column(columns['endDay'], 31)[index]
+        base = year_start[annual]
+        start = _month_day(base + (start_month - 1), start_day)
+        end = _month_day(base + (end_month - 1), end_day)
+        wraps = end < start
+        end[wraps] = _month_day(base[wraps] + (end_month[wraps] + 11), end_day[wraps])
+        period_start[annual] = start
+        period_end[annual] = end
+
+    reminder_days = _int_column(columns['reminderDays'], DEFAULT_REMINDER_DAYS)[benefit_index]
+    reminder_date = np.maximum(period_start, period_end - reminder_days)
+
+    return BenefitCalendar(benefits, benefit_index, year, cycle, period_start, period_end,
+                           reminder_date, reminder_days, skipped)
+
+
+def calendar_from_cards(cards: List[Dict], years: Sequence[int]) -> BenefitCalendar:
+    """由爬蟲目錄（Card 或 dict）建立週期表；沒有資料庫 id，benefitId 為 None"""
+    benefits = []
+    columns: Dict[str, list] = {name: [] for name in CYCLE_COLUMNS}
+    with metrics.stage('calendar.build'):
+        for card in cards:
+            for benefit in card.get('benefits') or []:
+                benefits.append({
+                    'benefitId': None, 'cardName': card.get('name'), 'bank': card.get('bank'),
+                    'region': card.get('region'), 'title': benefit.get('title'),
+                    'titleEn': benefit.get('titleEn'),
+                    'frequency': benefit.get('cycleType') or benefit.get('frequency'),
+                })
+                columns['frequency'].append(benefits[-1]['frequency'])
+                for name in CYCLE_COLUMNS[1:]:
+                    columns[name].append(benefit.get(name))
+        return build_calendar(benefits, columns, years)
+
+
+def calendar_from_db(conn, years: Sequence[int]) -> BenefitCalendar:
+    """由資料庫中啟用的福利建立週期表"""
+    with metrics.stage('calendar.build'):
+        rows = conn.execute(_BENEFIT_QUERY).fetchall()
+        benefits = [
+            {'benefitId': row[0], 'cardName': row[1], 'bank': row[2], 'region': row[3],
+             'title': row[4], 'titleEn': row[5], 'frequency': row[6]}
+            for row in rows
+        ]
+        columns = {name: [row[i] for row in rows] for i, name in enumerate(CYCLE_COLUMNS, 6)}
+        return build_calendar(benefits, columns, years)
+
+
+def write_calendar(path: str, calendar: BenefitCalendar) -> int:
+    """寫入 CSV，或 NDJSON（.ndjson/.jsonl；.gz 會壓縮），回傳列數"""
+    with metrics.stage('calendar.write'), open_text(path, 'w') as f:
+        if is_ndjson_path(path):
+            for row in calendar.rows():
+                f.write(json.dumps(row, ensure_ascii=False, separators=(',', ':')))
+                f.write('\n')
+        else:
+            writer = csv.DictWriter(f, fieldnames=CALENDAR_FIELDS, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(calendar.rows())
+    return len(calendar)
+
+
+def write_calendar_table(conn, calendar: BenefitCalendar, years: Sequence[int]) -> int:
+    """
+    以單一交易重建 BenefitCalendar 中指定年度的資料，回傳寫入列數
+    只寫入有 benefitId 的列（calendar_from_db 建立的週期表）
+    表格與索引對應 schema.prisma 的 BenefitCalendar model；尚未 db push 的資料庫會以相同結構建立
+    """
+    ids = np.array([benefit['benefitId'] is not None for benefit in calendar.benefits], dtype=bool)
+    keep = ids[calendar.benefit_index] if len(ids) else np.zeros(0, dtype=bool)
+    benefit_ids = np.array([benefit['benefitId'] or 0 for benefit in calendar.benefits], dtype=np.int64)
+    rows = list(zip(
+        benefit_ids[calendar.benefit_index[keep]].tolist(), calendar.year[keep].tolist(),
+        calendar.cycle[keep].tolist(), calendar.period_start[keep].astype(str).tolist(),
+        calendar.period_end[keep].astype(str).tolist(), calendar.reminder_date[keep].astype(str).tolist(),
+        calendar.reminder_days[keep].tolist(),
+    ))
+
+    with metrics.stage('calendar.write'):
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CALENDAR_TABLE} (
+                benefitId INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                cycleNumber INTEGER NOT NULL,
+                periodStart DATETIME NOT NULL,
+                periodEnd DATETIME NOT NULL,
+                reminderDate DATETIME NOT NULL,
+                reminderDays INTEGER NOT NULL,
+                PRIMARY KEY (benefitId, year, cycleNumber),
+                FOREIGN KEY (benefitId) REFERENCES Benefit(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {CALENDAR_TABLE}_reminderDate_idx "
+                     f"ON {CALENDAR_TABLE} (reminderDate)")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            placeholders = ','.join('?' * len(years))
+            conn.execute(f"DELETE FROM {CALENDAR_TABLE} WHERE year IN ({placeholders})", list(years))
+            conn.executemany(f"INSERT INTO {CALENDAR_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return len(rows)
+
+
+def parse_years(value: str) -> List[int]:
+    """解析 --years：2026、2026,2027 或 2026-2028"""
+    years = set()
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        first, sep, last = item.partition('-')
+        try:
+            start = int(first)
+            end = int(last) if sep else start
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"年度格式錯誤: {item}")
+        if end < start:
+            raise argparse.ArgumentTypeError(f"年度範圍錯誤: {item}")
+        years.update(range(start, end + 1))
+    if not years:
+        raise argparse.ArgumentTypeError("至少需要一個年度")
+    return sorted(years)
+
+
+def print_summary(calendar: BenefitCalendar, years: Sequence[int]):
+    print(f"📅 {len(calendar.benefits)} 個福利 × {len(years)} 個年度 → {len(calendar)} 個週期")
+    skipped = {name: count for name, count in calendar.skipped.items() if count}
+    if skipped:
+        labels = {'one_time': '一次性', 'personal': '個人化週期', 'unknown': '未知頻率'}
+        print(f"   未展開: {', '.join(f'{labels[name]} {count}' for name, count in skipped.items())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="福利週期行事曆 - 預先計算每個福利各年度的週期與提醒日期")
+    parser.add_argument(
+        "--input",
+        type=str,
+        help="爬蟲匯出的目錄（.json 或 .ndjson/.jsonl，.gz 會解壓縮）；未指定時讀取資料庫"
+    )
+    parser.add_argument(
+        "--db-path",
+        type=str,
+        help="資料庫路徑（預設使用專案資料庫）"
+    )
+    parser.add_argument(
+        "--busy-timeout",
+        type=float,
+        default=DEFAULT_BUSY_TIMEOUT,
+        help=f"資料庫被其他連線鎖定時的等待秒數 (預設: {DEFAULT_BUSY_TIMEOUT:g})"
+    )
+    parser.add_argument(
+        "--years",
+        type=parse_years,
+        default=str(date.today().year),
+        help="要展開的年度：2026、2026,2027 或 2026-2028 (預設: 今年)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="輸出檔案（.csv，或 .ndjson/.jsonl；.gz 會壓縮）"
+    )
+    parser.add_argument(
+        "--write-table",
+        action="store_true",
+        help=f"將週期寫入資料庫的 {CALENDAR_TABLE} 表格（重建指定年度的資料，需讀取資料庫）"
+    )
+    args = parser.parse_args()
+
+    if args.input and args.write_table:
+        parser.error("--write-table 需要資料庫中的 benefitId，不能與 --input 同時使用")
+    if not args.output and not args.write_table:
+        parser.error("請指定 --output 或 --write-table")
+
+    conn = None
+    if args.input:
+        calendar = calendar_from_cards(load_catalog(args.input), args.years)
+    else:
+        import sqlite3
+
+        conn = sqlite3.connect(args.db_path or DEFAULT_DB_PATH, isolation_level=None,
+                               timeout=args.busy_timeout)
+        calendar = calendar_from_db(conn, args.years)
+    print_summary(calendar, args.years)
+
+    try:
+        if args.output:
+            count = write_calendar(args.output, calendar)
+            print(f"✅ 已匯出 {count} 個週期至: {args.output}")
+        if args.write_table:
+            count = write_calendar_table(conn, calendar, args.years)
+            print(f"✅ 已寫入 {count} 個週期至 {CALENDAR_TABLE}")
+    except Exception as e:
+        print(f"❌ 寫入失敗: {e}")
+        sys.exit(1)
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+卡片名稱的模糊比對索引
+不同來源對同一張卡片的寫法常有差異（"Citi® Double Cash Card" 與 "Citi Double Cash Card"、
+"Blue Cash Everyday® Card from American Express" 與 "American Express Blue Cash Everyday Card"）。
+名稱先正規化（去除商標符號、大小寫、標點與 card/credit 等通用字，字詞排序），
+完全相同時直接對應；否則以三字元組（trigram）倒排索引找出候選，
+再以 Jaccard 相似度確認，每次查詢只比對少數候選，不需要兩兩比較所有名稱。
+"""
+
+import math
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from metrics import metrics
+
+
+DEFAULT_MATCH_THRESHOLD = 0.85
+
+# 商標與註記符號
+TRADEMARK_CHARS = ('®', '™', '℠', '©', '*', '†', '‡')
+_TRADEMARK_RE = re.compile('[' + ''.join(re.escape(c) for c in TRADEMARK_CHARS) + ']')
+_TOKEN_SPLIT_RE = re.compile(r'[\W_]+')
+
+# SQL 比對時去除的字元（REPLACE 運算式，只包含常見的商標符號）
+SQL_STRIP_CHARS = ('®', '™', '℠', '*', ' ')
+
+# 不影響卡片身分的通用字（含 (R)、(TM) 等以文字表示的商標）
+GENERIC_TOKENS = frozenset(('card', 'credit', 'the', 'from', 'by', 'r', 'tm', 'sm'))
+
+# 只做 ASCII 大小寫轉換，與 SQLite 的 LOWER() 及 Postgres 方言的 TRANSLATE(A-Z → a-z) 結果一致
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def name_tokens(name: str) -> List[str]:
+    """正規化後的字詞（去除商標符號與通用字）"""
+    text = _TRADEMARK_RE.sub(' ', unicodedata.normalize('NFKC', name).casefold())
+    return [token for token in _TOKEN_SPLIT_RE.split(text) if token and token not in GENERIC_TOKENS]
+
+
+def identity_key(name: str) -> str:
+    """卡片身分鍵：字詞去重後排序，字詞順序不同的寫法得到相同的鍵"""
+    return ' '.join(sorted(set(name_tokens(name))))
+
+
+@lru_cache(maxsize=65536)
+def sql_name_key(name: str) -> str:
+    """
+    可在 SQL 中重現的簡化鍵：去除常見商標符號與空白、ASCII 轉小寫
+    對應 sql_writer 產生的 REPLACE/LOWER（Postgres 為 TRANSLATE）運算式；非 ASCII 字母不轉換
+    """
+    for char in SQL_STRIP_CHARS:
+        name = name.replace(char, '')
+    return name.translate(_ASCII_LOWER)
+
+
+@lru_cache(maxsize=65536)
+def _signature(name: str) -> Tuple[str, FrozenSet[str], FrozenSet[str]]:
+    """
+    名稱的 (身分鍵, trigram 集合, 必須完全相同的字詞)
+    必須相同的字詞為數字與一、兩個字元的型號（Venture 與 Venture X 是不同的卡片）
+    同一個名稱在 add 與 match、以及重複執行之間只計算一次
+    """
+    key = identity_key(name)
+    padded = f"  {key} "
+    grams = frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+    guard = frozenset(token for token in key.split() if token.isdigit() or len(token) <= 2)
+    return key, grams, guard
+
+
+class CardIdentityIndex:
+    """
+    卡片名稱索引：add() 登錄已知卡片，resolve() 將新名稱對應到已登錄的卡片
+    相似度 threshold 以 Jaccard（trigram 集合）計算，介於 0 與 1 之間
+    """
+
+    def __init__(self, threshold: float = DEFAULT_MATCH_THRESHOLD):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold 必須介於 0 與 1 之間")
+        self.threshold = threshold
+        self._by_key: Dict[str, int] = {}
+        # 每筆為 (trigram 集合, 必須相同的字詞, 對應值)
+        self._entries: List[Tuple[FrozenSet[str], FrozenSet[str], object]] = []
+        self._postings: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, name: str, value=None):
+        """登錄卡片名稱（value 預設為名稱本身）；相同身分鍵只保留第一個"""
+        key, grams, guard = _signature(name)
+        if not key or key in self._by_key:
+            return
+        entry_id = len(self._entries)
+        self._by_key[key] = entry_id
+        self._entries.append((grams, guard, name if value is None else value))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry_id)
+
+    def match(self, name: str) -> Optional[Tuple[object, float]]:
+        """回傳 (對應值, 相似度)；沒有相似度達門檻的卡片時回傳 None"""
+        key, grams, guard = _signature(name)
+        if not key:
+            return None
+        entry_id = self._by_key.get(key)
+        if entry_id is not None:
+            return self._entries[entry_id][2], 1.0
+
+        size = len(grams)
+        # 相似度達門檻的卡片至少共有 ceil(t * size) 個 trigram，
+        # 因此只需查詢最少見的 size - ceil(t * size) + 1 個 trigram 就不會漏掉候選
+        probe = size - math.ceil(self.threshold * size) + 1
+        postings = [self._postings[gram] for gram in grams if gram in self._postings]
+        # 索引中沒有的 trigram 也算在查詢的 trigram 內（沒有候選）
+        probe -= size - len(postings)
+        if probe <= 0:
+            return None
+        if len(postings) > probe:
+            postings.sort(key=len)
+            del postings[probe:]
+        candidates = set()
+        for posting in postings:
+            candidates.update(posting)
+
+        best = None
+        best_score = self.threshold
+        for entry_id in sorted(candidates):
+            other, other_guard, value = self._entries[entry_id]
+            if other_guard != guard:
+                continue
+            if not self.threshold * size <= len(other) <= size / self.threshold:
+                continue
+            shared = len(grams & other)
+            score = shared / (size + len(other) - shared)
+            if score >= best_score and (best is None or score > best[1]):
+                best = (value, score)
+        if best is not None:
+            metrics.incr('identity_fuzzy_matches')
+        return best
+
+    def resolve(self, name: str):
+        """回傳已登錄卡片的對應值，沒有相符的卡片時回傳 None"""
+        found = self.match(name)
+        return found[0] if found is not None else None
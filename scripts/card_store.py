@@ -0,0 +1,769 @@
+#!/usr/bin/env python3
+"""
+卡片目錄的資料庫寫入
+所有資料來源（American Express、各地區、各發卡銀行）共用同一個寫入路徑：
+將卡片與福利批次 upsert 到後端的 SQLite 資料庫（CreditCard / Benefit 表格，欄位同 Prisma schema）
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from operator import itemgetter, le
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from card_identity import DEFAULT_MATCH_THRESHOLD, CardIdentityIndex
+from metrics import metrics
+from models import Benefit, Card, json_default
+from sync_state import DEFAULT_STATE_DIR, SyncDiff, SyncState
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+# 預設使用專案的資料庫路徑
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'apps', 'backend', 'prisma', 'dev.db'
+)
+
+# 寫入/比對的欄位（順序即 SQL 欄位順序）
+CARD_COLUMNS = (
+    'name', 'nameEn', 'bank', 'bankEn', 'issuer', 'region',
+    'description', 'descriptionEn', 'photo',
+)
+BENEFIT_COLUMNS = (
+    'category', 'categoryEn', 'title', 'titleEn', 'description', 'descriptionEn',
+    'amount', 'currency', 'frequency',
+    'startMonth', 'startDay', 'endMonth', 'endDay', 'reminderDays',
+)
+
+# 寫入時查詢用到的索引（名稱同 Prisma 依 @@index 建立的索引）
+SUPPORTING_INDEXES: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ('CreditCard_nameEn_idx', 'CreditCard', ('nameEn',)),
+    ('Benefit_cardId_titleEn_idx', 'Benefit', ('cardId', 'titleEn')),
+)
+
+# 等待其他連線（例如後端）釋放寫入鎖的秒數，與 sqlite3 模組的預設值相同
+DEFAULT_BUSY_TIMEOUT = 5.0
+
+# 快速寫入模式的頁面快取大小（KiB）
+FAST_WRITE_CACHE_KIB = 64 * 1024
+
+# 卡片資料中未提供時使用的預設值
+CARD_DEFAULTS = {'region': 'america', 'photo': None}
+BENEFIT_DEFAULTS = {
+    'amount': None, 'startMonth': 1, 'startDay': 1,
+    'endMonth': 12, 'endDay': 31, 'reminderDays': 30,
+}
+
+# 必須是非空字串的欄位（資料庫中為 NOT NULL，或是用來比對的名稱）
+CARD_REQUIRED_TEXT = ('name', 'nameEn', 'bank')
+BENEFIT_REQUIRED_TEXT = ('category', 'title', 'titleEn', 'description', 'currency', 'frequency')
+
+# 福利日期欄位的合法範圍（None 表示未設定）
+BENEFIT_INT_RANGES = {
+    'startMonth': (1, 12), 'endMonth': (1, 12),
+    'startDay': (1, 31), 'endDay': (1, 31),
+    'reminderDays': (0, 366),
+}
+
+# _bulk_upsert 回傳的筆數統計
+UPSERT_STATS = (
+    'cards_inserted', 'cards_updated', 'cards_unchanged',
+    'benefits_inserted', 'benefits_updated', 'benefits_unchanged',
+)
+
+# 預載既有資料時 IN 清單的大小上限（低於 SQLite 的參數數量限制）
+PRELOAD_CHUNK_SIZE = 500
+
+# 未通過檢查或寫入失敗的資料（NDJSON，每次執行附加在檔尾）
+DEFAULT_REJECTS_PATH = os.path.join(DEFAULT_STATE_DIR, 'rejects.ndjson')
+
+
+def _card_row(card: Dict, current: Optional[tuple] = None, name_en: Optional[str] = None) -> tuple:
+    """
+    將卡片 dict 轉為 CARD_COLUMNS 順序的 tuple
+    更新既有卡片時，未提供的選填欄位沿用資料庫中的值；
+    name_en 為比對到的既有卡片名稱（資料庫中的名稱保持不變）
+    """
+    row = []
+    for i, col in enumerate(CARD_COLUMNS):
+        if col == 'nameEn' and name_en is not None:
+            row.append(name_en)
+        elif col in card:
+            row.append(card[col])
+        elif col in CARD_DEFAULTS:
+            row.append(current[i] if current is not None else CARD_DEFAULTS[col])
+        else:
+            row.append(card[col])
+    return tuple(row)
+
+
+def _benefit_row(benefit: Dict) -> tuple:
+    """將福利 dict 轉為 BENEFIT_COLUMNS 順序的 tuple"""
+    try:
+        # 欄位齊全時（大多數資料）一次取出
+        return _BENEFIT_VALUES(benefit)
+    except KeyError:
+        pass
+    return tuple(
+        benefit.get(col, BENEFIT_DEFAULTS[col]) if col in BENEFIT_DEFAULTS else benefit[col]
+        for col in BENEFIT_COLUMNS
+    )
+
+
+def _is_record(value) -> bool:
+    return isinstance(value, (dict, Card, Benefit))
+
+
+# 快速檢查：絕大多數資料都沒有問題，先以一次 itemgetter 取出所有欄位、
+# 再用 map 與型別集合檢查（不逐欄執行 Python 迴圈）；欄位不齊全或沒通過時才逐欄產生錯誤訊息
+_SQL_TYPES = frozenset((str, int, float, type(None)))
+_INT_TYPE = frozenset((int,))
+_AMOUNT_TYPES = frozenset((int, float, type(None)))
+_CARD_VALUES = itemgetter(*CARD_COLUMNS)
+_CARD_TEXT = itemgetter(*(CARD_COLUMNS.index(col) for col in CARD_REQUIRED_TEXT))
+_BENEFIT_VALUES = itemgetter(*BENEFIT_COLUMNS)
+_BENEFIT_TEXT = itemgetter(*(BENEFIT_COLUMNS.index(col) for col in BENEFIT_REQUIRED_TEXT))
+_BENEFIT_INTS = itemgetter(*(BENEFIT_COLUMNS.index(col) for col in BENEFIT_INT_RANGES))
+_BENEFIT_AMOUNT = BENEFIT_COLUMNS.index('amount')
+_INT_LOWS = tuple(low for low, _ in BENEFIT_INT_RANGES.values())
+_INT_HIGHS = tuple(high for _, high in BENEFIT_INT_RANGES.values())
+
+
+def _card_passes(card) -> bool:
+    try:
+        row = _CARD_VALUES(card)
+        return (
+            _SQL_TYPES.issuperset(map(type, row))
+            and all(map(str.strip, _CARD_TEXT(row)))
+            and type(card.get('benefits', [])) is list
+        )
+    except (KeyError, TypeError):
+        # 缺少欄位、不是 dict，或必填文字欄位不是字串
+        return False
+
+
+def _benefit_passes(benefit) -> bool:
+    try:
+        row = _BENEFIT_VALUES(benefit)
+        ints = _BENEFIT_INTS(row)
+        return (
+            _SQL_TYPES.issuperset(map(type, row))
+            and all(map(str.strip, _BENEFIT_TEXT(row)))
+            and type(row[_BENEFIT_AMOUNT]) in _AMOUNT_TYPES
+            and _INT_TYPE.issuperset(map(type, ints))
+            and all(map(le, _INT_LOWS, ints))
+            and all(map(le, ints, _INT_HIGHS))
+        )
+    except (KeyError, TypeError):
+        return False
+
+
+def _field_errors(record, columns: Tuple[str, ...], defaults: Dict,
+                  required_text: Tuple[str, ...]) -> List[str]:
+    """檢查欄位是否齊全、必填文字欄位非空，以及值可以直接寫入 SQLite"""
+    errors = []
+    for col in columns:
+        if col not in record:
+            if col not in defaults:
+                errors.append(f"缺少欄位 {col}")
+            continue
+        value = record[col]
+        if col in required_text:
+            if not isinstance(value, str) or not value.strip():
+                errors.append(f"{col} 必須是非空字串")
+        elif value is not None and not isinstance(value, (str, int, float)):
+            errors.append(f"{col} 的型別無法寫入資料庫: {type(value).__name__}")
+    return errors
+
+
+def validate_card(card) -> List[str]:
+    """卡片本身的問題（不含福利）；回傳錯誤訊息，沒有問題時為空清單"""
+    if _card_passes(card):
+        return []
+    if not _is_record(card):
+        return [f"卡片必須是 dict，而不是 {type(card).__name__}"]
+    errors = _field_errors(card, CARD_COLUMNS, CARD_DEFAULTS, CARD_REQUIRED_TEXT)
+    if not isinstance(card.get('benefits', []), list):
+        errors.append("benefits 必須是清單")
+    return errors
+
+
+def validate_benefit(benefit) -> List[str]:
+    """單一福利的問題；回傳錯誤訊息，沒有問題時為空清單"""
+    if _benefit_passes(benefit):
+        return []
+    if not _is_record(benefit):
+        return [f"福利必須是 dict，而不是 {type(benefit).__name__}"]
+    errors = _field_errors(benefit, BENEFIT_COLUMNS, BENEFIT_DEFAULTS, BENEFIT_REQUIRED_TEXT)
+    amount = benefit.get('amount')
+    if amount is not None and (isinstance(amount, bool) or not isinstance(amount, (int, float))):
+        errors.append("amount 必須是數字")
+    for col, (low, high) in BENEFIT_INT_RANGES.items():
+        value = benefit.get(col)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+            errors.append(f"{col} 必須是 {low} 到 {high} 的整數")
+    return errors
+
+
+def _reject(kind: str, record, reason: str, card_name: Optional[str], stage: str = 'validate') -> Dict:
+    return {'kind': kind, 'stage': stage, 'card': card_name, 'reason': reason, 'record': record}
+
+
+def validate_cards(cards: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    寫入前的批次檢查，回傳 (可寫入的卡片, 被拒絕的資料)
+    卡片本身有問題時整張拒絕；只有部分福利有問題時只拒絕那些福利，
+    卡片以剩下的福利照常寫入（傳入的卡片不會被修改）
+    """
+    valid = []
+    rejects = []
+    for card in cards:
+        errors = validate_card(card)
+        if errors:
+            card_name = card.get('nameEn') if _is_record(card) else None
+            rejects.append(_reject('card', card, '; '.join(errors), card_name))
+            continue
+
+        benefits = card.get('benefits', [])
+        kept = []
+        for benefit in benefits:
+            errors = validate_benefit(benefit)
+            if errors:
+                rejects.append(_reject('benefit', benefit, '; '.join(errors), card['nameEn']))
+            else:
+                kept.append(benefit)
+        if len(kept) != len(benefits):
+            card = dict(card)
+            card['benefits'] = kept
+        valid.append(card)
+    return valid, rejects
+
+
+def write_rejects(path: str, rejects: List[Dict]):
+    """將被拒絕的資料附加到 NDJSON 檔，每行一筆，附上原因與時間"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    rejected_at = datetime.now().isoformat()
+    with open(path, 'a', encoding='utf-8') as f:
+        for reject in rejects:
+            line = dict(reject, rejected_at=rejected_at)
+            f.write(json.dumps(line, ensure_ascii=False, default=json_default) + '\n')
+
+
+def _keep_rejected(diff: SyncDiff, rejects: List[Dict]):
+    """被拒絕的資料不在本次目錄中，但不代表已移除：不停用，維持資料庫現況"""
+    cards = {reject['card'] for reject in rejects if reject['kind'] == 'card'}
+    benefits = {
+        (reject['card'], reject['record'].get('titleEn'))
+        for reject in rejects if reject['kind'] == 'benefit' and _is_record(reject['record'])
+    }
+    diff.removed_cards = [name_en for name_en in diff.removed_cards if name_en not in cards]
+    diff.removed_benefits = [
+        key for key in diff.removed_benefits if key[0] not in cards and key not in benefits
+    ]
+
+
+class CardStore:
+    """後端 SQLite 資料庫中的卡片目錄"""
+
+    def __init__(self, db_path: Optional[str] = None,
+                 match_threshold: float = DEFAULT_MATCH_THRESHOLD,
+                 fast_write: bool = False, busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+                 rejects_path: Optional[str] = None, keep_open: bool = False):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        # 卡片名稱模糊比對的相似度門檻（同一張卡片的不同寫法視為同一列）
+        self.match_threshold = match_threshold
+        # 快速寫入模式：WAL、synchronous=NORMAL、較大的頁面快取，並建立缺少的索引
+        self.fast_write = fast_write
+        self.busy_timeout = busy_timeout
+        # 未通過檢查或寫入失敗的資料寫到這個檔案（NDJSON）
+        self.rejects_path = rejects_path or DEFAULT_REJECTS_PATH
+        self.last_save_stats: Dict[str, int] = {}
+        self.last_rejects: List[Dict] = []
+        # 寫入鎖的等待與持有時間（秒），跨多次 save 累計
+        self.lock_stats = {'saves': 0, 'wait_seconds': 0.0, 'held_seconds': 0.0, 'max_held_seconds': 0.0}
+        self._indexes_checked = False
+        # 常駐模式：多次 save 之間保留資料庫連線、資料庫中的卡片名稱與比對索引
+        self.keep_open = keep_open
+        self._conn: Optional['sqlite3.Connection'] = None
+        self._identity_index: Optional[CardIdentityIndex] = None
+        self._db_names: Optional[Set[str]] = None
+
+    def connect(self) -> 'sqlite3.Connection':
+        """
+        開啟資料庫連線（自行管理交易，避免 sqlite3 模組隱式開啟/提交）
+        寫入鎖被其他連線持有時最多等待 busy_timeout 秒
+        """
+        import sqlite3
+
+        conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=self.busy_timeout)
+        if self.fast_write:
+            # WAL 下讀取不會被寫入阻擋，synchronous=NORMAL 只在 checkpoint 時 fsync
+            mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if mode != 'wal':
+                print(f"⚠️  無法啟用 WAL（journal_mode={mode}）")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA cache_size=-{FAST_WRITE_CACHE_KIB}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+        if not self._indexes_checked:
+            self.ensure_indexes(conn, create=self.fast_write)
+            self._indexes_checked = True
+        return conn
+
+    def close(self):
+        """關閉保留的連線（keep_open 時使用）"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @contextmanager
+    def warm(self) -> Iterator['CardStore']:
+        """
+        在 with 區塊內的多次 save 之間保留連線與卡片名稱索引（分批匯入、管線寫入），
+        每批只查詢該批卡片的既有資料；離開區塊後回復原本的設定
+        """
+        keep_open = self.keep_open
+        self.keep_open = True
+        try:
+            yield self
+        finally:
+            self.keep_open = keep_open
+            if not keep_open:
+                self.close()
+                self._identity_index = None
+                self._db_names = None
+
+    def _acquire(self) -> 'sqlite3.Connection':
+        if self._conn is not None:
+            return self._conn
+        conn = self.connect()
+        if self.keep_open:
+            self._conn = conn
+        return conn
+
+    def _release(self, conn: 'sqlite3.Connection', failed: bool = False):
+        """一般模式每次 save 後關閉連線；keep_open 時保留，發生錯誤才關閉並於下次重新連線"""
+        if conn is self._conn and not failed:
+            return
+        if conn is self._conn:
+            self._conn = None
+        conn.close()
+
+    def ensure_indexes(self, conn: 'sqlite3.Connection', create: bool = False) -> List[str]:
+        """
+        檢查寫入查詢用到的索引（前導欄位相同的既有索引也算），回傳缺少的索引名稱
+        create=True 時建立缺少的索引；否則只提示
+        """
+        missing = []
+        for name, table, columns in SUPPORTING_INDEXES:
+            if not self._has_index(conn, table, columns):
+                missing.append(name)
+        if not missing:
+            return []
+        if not create:
+            print(f"⚠️  缺少索引 {', '.join(missing)}，可加上 --fast-write 自動建立")
+            return missing
+        for name, table, columns in SUPPORTING_INDEXES:
+            if name in missing:
+                cols = ', '.join(f'"{col}"' for col in columns)
+                with metrics.stage('db.create_index'):
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}"({cols})')
+                print(f"🗂️  已建立索引 {name}")
+        return []
+
+    @staticmethod
+    def _has_index(conn: 'sqlite3.Connection', table: str, columns: Tuple[str, ...]) -> bool:
+        for row in conn.execute(f'PRAGMA index_list("{table}")').fetchall():
+            indexed = [info[2] for info in conn.execute(f'PRAGMA index_info("{row[1]}")').fetchall()]
+            if tuple(indexed[:len(columns)]) == columns:
+                return True
+        return False
+
+    def _record_lock(self, wait: float, held: float):
+        stats = self.lock_stats
+        stats['saves'] += 1
+        stats['wait_seconds'] += wait
+        stats['held_seconds'] += held
+        stats['max_held_seconds'] = max(stats['max_held_seconds'], held)
+        metrics.incr('db_lock_wait_seconds', wait)
+        metrics.incr('db_lock_held_seconds', held)
+
+    @metrics.timed('db.save')
+    def save(self, cards: List[Dict], sync_state: Optional[SyncState] = None) -> bool:
+        """
+        將卡片存入資料庫（批次 upsert）
+        先以一次查詢預載既有卡片與福利，再用 executemany 批次新增/更新，
+        整個寫入在單一交易中完成，縮短寫入鎖的持有時間
+
+        寫入前先檢查所有卡片與福利，有問題的資料寫到 rejects 檔，其餘照常寫入；
+        寫入時資料庫拒絕的卡片只回復該張卡片（SAVEPOINT），不影響同一交易中的其他卡片
+
+        傳入 sync_state 時為增量模式：只寫入與上次指紋不同的卡片/福利，
+        並將上次存在、這次消失的資料設為停用（cards 必須是完整目錄）
+        """
+        if not cards:
+            print("❌ 沒有資料可以儲存")
+            return False
+
+        conn = None
+        locked_at = None
+        all_cards, rejects = validate_cards(cards)
+        self.last_rejects = rejects
+        try:
+            print(f"\n{'='*60}")
+            print(f"開始儲存資料到資料庫")
+            print(f"資料庫路徑: {self.db_path}")
+            print(f"{'='*60}\n")
+
+            if rejects:
+                print(f"⚠️  {len(rejects)} 筆資料未通過檢查，將略過並寫入 {self.rejects_path}")
+                for reject in rejects:
+                    print(f"   - {reject['kind']} {reject['card']}: {reject['reason']}")
+            if not all_cards:
+                print("❌ 沒有通過檢查的卡片可以儲存")
+                return False
+
+            diff = None
+            if sync_state is not None:
+                diff = sync_state.diff(all_cards)
+                _keep_rejected(diff, rejects)
+                print(f"🔁 增量同步: {diff.summary()}")
+                if not diff.has_changes:
+                    print("✅ 資料未變更，不需要寫入資料庫")
+                    self.last_save_stats = {'cards_skipped': len(all_cards)}
+                    return True
+                cards = diff.changed_cards()
+            else:
+                cards = all_cards
+
+            conn = self._acquire()
+            cursor = conn.cursor()
+            wait_start = time.perf_counter()
+            cursor.execute("BEGIN IMMEDIATE")
+            locked_at = time.perf_counter()
+
+            stats, failed_writes, db_names = self._bulk_upsert(cursor, cards)
+            rejects.extend(failed_writes)
+            if diff is not None:
+                stats.update(self._deactivate_removed(cursor, diff))
+                # 指紋相同而未送進資料庫的卡片
+                stats['cards_skipped'] = len(all_cards) - len(cards)
+            stats['cards_rejected'] = sum(1 for reject in rejects if reject['kind'] == 'card')
+            stats['benefits_rejected'] = len(rejects) - stats['cards_rejected']
+
+            cursor.execute("COMMIT")
+            failed = {reject['card'] for reject in failed_writes}
+            if self.keep_open and self._db_names is not None:
+                self._db_names.update(name for name_en, name in db_names.items() if name_en not in failed)
+            wait = locked_at - wait_start
+            held = time.perf_counter() - locked_at
+            self._record_lock(wait, held)
+            locked_at = None
+            self._release(conn)
+            self.last_save_stats = stats
+            for key, value in stats.items():
+                metrics.incr(f"db_{key}", value)
+
+            # 交易成功後才更新指紋，失敗時下次會重新寫入；
+            # 寫入失敗的卡片不記錄指紋，下次會再嘗試
+            written = [card for card in all_cards if card['nameEn'] not in failed]
+            if sync_state is not None:
+                sync_state.commit(written, db_names)
+
+            print(f"   卡片: 新增 {stats['cards_inserted']}，更新 {stats['cards_updated']}，"
+                  f"未變更 {stats['cards_unchanged']}")
+            print(f"   福利: 新增 {stats['benefits_inserted']}，更新 {stats['benefits_updated']}，"
+                  f"未變更 {stats['benefits_unchanged']}")
+            if diff is not None:
+                print(f"   略過未變更卡片 {stats['cards_skipped']}，"
+                      f"停用: 卡片 {stats['cards_deactivated']}，福利 {stats['benefits_deactivated']}")
+            if rejects:
+                print(f"   拒絕: 卡片 {stats['cards_rejected']}，福利 {stats['benefits_rejected']}")
+            print(f"   寫入鎖: 等待 {wait * 1000:.1f} ms，持有 {held * 1000:.1f} ms")
+            print(f"\n{'='*60}")
+            print(f"✅ 成功儲存 {len(written)} 張信用卡到資料庫")
+            print(f"{'='*60}\n")
+            return True
+
+        except Exception as e:
+            print(f"❌ 儲存失敗: {e}")
+            if conn:
+                if conn.in_transaction:
+                    conn.rollback()
+                if locked_at is not None:
+                    self._record_lock(0.0, time.perf_counter() - locked_at)
+                self._release(conn, failed=True)
+            return False
+
+        finally:
+            if rejects:
+                write_rejects(self.rejects_path, rejects)
+
+    def _bulk_upsert(self, cursor: 'sqlite3.Cursor',
+                     cards: List[Dict]) -> Tuple[Dict[str, int], List[Dict], Dict[str, str]]:
+        """
+        在已開啟的交易中批次寫入 cards，
+        回傳 (新增/更新/未變更的筆數統計, 寫入失敗的卡片, nameEn -> 資料庫中的名稱)
+        整批寫入包在一個 SAVEPOINT 中；資料庫拒絕這一批時回復該 SAVEPOINT，
+        改為每張卡片各自一個 SAVEPOINT 逐張寫入，只略過失敗的卡片
+        """
+        import sqlite3
+
+        # 名稱寫法不同的同一張卡片（商標符號、字詞順序等）對應到既有的卡片，
+        # 同一批資料中重複的卡片合併為一張（後者覆蓋前者）
+        existing_names, index = self._known_names(cursor, [card['nameEn'] for card in cards])
+        incoming, db_names = self._resolve_identities(cards, existing_names, index)
+
+        # 只預載本批卡片的既有資料：nameEn -> (id, 是否啟用, 欄位值)
+        card_cols = ', '.join(CARD_COLUMNS)
+        existing_cards = {
+            row[3]: (row[0], row[1], row[2:])
+            for row in self._select_in(
+                cursor, f"SELECT id, isActive, {card_cols} FROM CreditCard WHERE nameEn IN ({{}})",
+                list(incoming)
+            )
+        }
+
+        # (cardId, titleEn) -> (id, 是否啟用, 欄位值)
+        benefit_cols = ', '.join(BENEFIT_COLUMNS)
+        existing_benefits = {
+            (row[1], row[6]): (row[0], row[2], row[3:])
+            for row in self._select_in(
+                cursor,
+                f"SELECT id, cardId, isActive, {benefit_cols} FROM Benefit "
+                f"WHERE titleEn IS NOT NULL AND cardId IN ({{}})",
+                [entry[0] for entry in existing_cards.values()]
+            )
+        }
+
+        cursor.execute("SAVEPOINT bulk_upsert")
+        try:
+            stats = self._write_cards(cursor, incoming, existing_cards, existing_benefits)
+            cursor.execute("RELEASE bulk_upsert")
+            return stats, [], db_names
+        except sqlite3.Error as e:
+            cursor.execute("ROLLBACK TO bulk_upsert")
+            cursor.execute("RELEASE bulk_upsert")
+            print(f"⚠️  批次寫入失敗（{e}），改為逐張寫入")
+
+        stats = dict.fromkeys(UPSERT_STATS, 0)
+        rejects = []
+        for name_en, card in incoming.items():
+            cursor.execute("SAVEPOINT card_upsert")
+            try:
+                card_stats = self._write_cards(cursor, {name_en: card}, existing_cards, existing_benefits)
+            except sqlite3.Error as e:
+                cursor.execute("ROLLBACK TO card_upsert")
+                cursor.execute("RELEASE card_upsert")
+                print(f"❌ 寫入失敗，已略過: {card['nameEn']} ({e})")
+                rejects.append(_reject('card', card, str(e), card['nameEn'], stage='write'))
+                continue
+            cursor.execute("RELEASE card_upsert")
+            for key, value in card_stats.items():
+                stats[key] += value
+        return stats, rejects, db_names
+
+    def _write_cards(self, cursor: 'sqlite3.Cursor', incoming: Dict[str, Dict],
+                     existing_cards: Dict, existing_benefits: Dict) -> Dict[str, int]:
+        """以預載的既有資料比對 incoming（名稱 -> 卡片），批次新增/更新卡片與福利"""
+        stats = dict.fromkeys(UPSERT_STATS, 0)
+        card_cols = ', '.join(CARD_COLUMNS)
+        benefit_cols = ', '.join(BENEFIT_COLUMNS)
+
+        new_card_rows = []
+        card_updates = []
+        card_ids: Dict[str, int] = {}
+        for name_en, card in incoming.items():
+            if name_en in existing_cards:
+                card_id, is_active, current = existing_cards[name_en]
+                card_ids[name_en] = card_id
+                row = _card_row(card, current, name_en)
+                # 先前被停用的卡片再次出現時重新啟用
+                if row != tuple(current) or not is_active:
+                    card_updates.append(row + (card_id,))
+                else:
+                    stats['cards_unchanged'] += 1
+            else:
+                new_card_rows.append(_card_row(card, name_en=name_en))
+
+        if card_updates:
+            assignments = ', '.join(f"{col} = ?" for col in CARD_COLUMNS)
+            cursor.executemany(
+                f"UPDATE CreditCard SET {assignments}, isActive = 1, "
+                f"updatedAt = datetime('now') WHERE id = ?",
+                card_updates
+            )
+            stats['cards_updated'] = len(card_updates)
+
+        if new_card_rows:
+            # 交易內新卡片的 id 必定大於目前最大值，插入後一次查回
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM CreditCard")
+            max_id = cursor.fetchone()[0]
+            placeholders = ', '.join('?' for _ in CARD_COLUMNS)
+            cursor.executemany(
+                f"""
+                INSERT INTO CreditCard (
+                    {card_cols}, isActive, createdAt, updatedAt
+                ) VALUES ({placeholders}, 1, datetime('now'), datetime('now'))
+                """,
+                new_card_rows
+            )
+            cursor.execute("SELECT id, nameEn FROM CreditCard WHERE id > ?", (max_id,))
+            for card_id, name_en in cursor.fetchall():
+                card_ids[name_en] = card_id
+            stats['cards_inserted'] = len(new_card_rows)
+
+        pending_benefits: Dict[tuple, tuple] = {}
+        for name_en, card in incoming.items():
+            card_id = card_ids[name_en]
+            for benefit in card.get('benefits', []):
+                pending_benefits[(card_id, benefit['titleEn'])] = _benefit_row(benefit)
+
+        new_benefit_rows = []
+        benefit_updates = []
+        for (card_id, title_en), row in pending_benefits.items():
+            existing = existing_benefits.get((card_id, title_en))
+            if existing is None:
+                new_benefit_rows.append((card_id,) + row)
+            elif row != tuple(existing[2]) or not existing[1]:
+                benefit_updates.append(row + (existing[0],))
+            else:
+                stats['benefits_unchanged'] += 1
+
+        if benefit_updates:
+            assignments = ', '.join(f"{col} = ?" for col in BENEFIT_COLUMNS)
+            cursor.executemany(
+                f"UPDATE Benefit SET {assignments}, isActive = 1, "
+                f"updatedAt = datetime('now') WHERE id = ?",
+                benefit_updates
+            )
+            stats['benefits_updated'] = len(benefit_updates)
+
+        if new_benefit_rows:
+            placeholders = ', '.join('?' for _ in BENEFIT_COLUMNS)
+            cursor.executemany(
+                f"""
+                INSERT INTO Benefit (
+                    cardId, {benefit_cols}, isActive, createdAt, updatedAt
+                ) VALUES (?, {placeholders}, 1, datetime('now'), datetime('now'))
+                """,
+                new_benefit_rows
+            )
+            stats['benefits_inserted'] = len(new_benefit_rows)
+
+        # 整批寫入成功後才顯示，被回復的寫入不會顯示為已新增
+        for row in new_card_rows:
+            print(f"✅ 已新增卡片: {row[1]} (ID: {card_ids[row[1]]})")
+        return stats
+
+    def _resolve_identities(self, cards: List[Dict], existing_names: Set[str],
+                            index: CardIdentityIndex) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        """
+        將卡片對應到資料庫中的名稱：完全相同優先，其次為模糊比對；
+        回傳 (名稱 -> 卡片, 卡片的 nameEn -> 名稱)，名稱為既有卡片的 nameEn 或本批第一次出現的寫法
+        """
+        incoming: Dict[str, Dict] = {}
+        db_names: Dict[str, str] = {}
+        for card in cards:
+            name_en = card['nameEn']
+            if name_en not in existing_names and name_en not in incoming:
+                resolved = index.resolve(name_en)
+                # 保留的索引可能含有先前寫入失敗、資料庫中不存在的名稱
+                if resolved is not None and (resolved in existing_names or resolved in incoming):
+                    print(f"🔗 {name_en} → {resolved}")
+                    name_en = resolved
+                else:
+                    index.add(name_en)
+            incoming[name_en] = card
+            db_names[card['nameEn']] = name_en
+        return incoming, db_names
+
+    def _known_names(self, cursor: 'sqlite3.Cursor',
+                     names: Sequence[str]) -> Tuple[Set[str], CardIdentityIndex]:
+        """
+        資料庫中的卡片名稱與其比對索引（只讀取 nameEn 欄位）
+        keep_open 時只在第一次讀取全部名稱，之後只補查本批中尚未見過的名稱（例如其他連線新增的卡片）
+        """
+        if self.keep_open and self._db_names is not None:
+            known, index = self._db_names, self._identity_index
+            missing = list({name for name in names if name not in known})
+            found = [row[0] for row in self._select_in(
+                cursor, "SELECT nameEn FROM CreditCard WHERE nameEn IN ({})", missing
+            )]
+        else:
+            known, index = set(), CardIdentityIndex(self.match_threshold)
+            cursor.execute("SELECT nameEn FROM CreditCard WHERE nameEn IS NOT NULL")
+            found = [row[0] for row in cursor.fetchall()]
+            if self.keep_open:
+                self._db_names, self._identity_index = known, index
+        for name_en in found:
+            known.add(name_en)
+            index.add(name_en)
+        return known, index
+
+    @staticmethod
+    def _select_in(cursor: 'sqlite3.Cursor', sql: str, values: Sequence) -> Iterator[tuple]:
+        """以 IN 清單分段查詢（sql 中的 {} 會替換為佔位符）"""
+        for start in range(0, len(values), PRELOAD_CHUNK_SIZE):
+            chunk = values[start:start + PRELOAD_CHUNK_SIZE]
+            cursor.execute(sql.format(', '.join('?' * len(chunk))), chunk)
+            yield from cursor.fetchall()
+
+    def _deactivate_removed(self, cursor: 'sqlite3.Cursor', diff: SyncDiff) -> Dict[str, int]:
+        """
+        將上次存在、本次已消失的卡片與福利設為停用（不刪除，保留使用者資料）
+        以資料庫中的名稱比對，回傳實際停用的筆數
+        """
+        cards_deactivated = benefits_deactivated = 0
+        if diff.removed_cards:
+            cursor.executemany(
+                "UPDATE CreditCard SET isActive = 0, updatedAt = datetime('now') "
+                "WHERE nameEn = ? AND isActive = 1",
+                [(diff.db_name(name_en),) for name_en in diff.removed_cards]
+            )
+            cards_deactivated = cursor.rowcount
+        if diff.removed_benefits:
+            cursor.executemany(
+                """
+                UPDATE Benefit SET isActive = 0, updatedAt = datetime('now')
+                WHERE titleEn = ? AND isActive = 1
+                  AND cardId IN (SELECT id FROM CreditCard WHERE nameEn = ?)
+                """,
+                [(title_en, diff.db_name(name_en)) for name_en, title_en in diff.removed_benefits]
+            )
+            benefits_deactivated = cursor.rowcount
+        return {
+            'cards_deactivated': cards_deactivated,
+            'benefits_deactivated': benefits_deactivated,
+        }
+
+
+def display_cards(title: str, cards: List[Dict]):
+    """顯示抓取結果（各資料來源共用）"""
+    if not cards:
+        print("❌ 沒有找到任何信用卡資訊")
+        return
+
+    print(f"\n{'='*60}")
+    print(title)
+    print(f"{'='*60}\n")
+
+    for i, card in enumerate(cards, 1):
+        print(f"{i}. {card['nameEn']}")
+        if card.get('name') and card['name'] != card['nameEn']:
+            print(f"   中文名稱: {card['name']}")
+        if card.get('bank'):
+            print(f"   銀行: {card['bank']}")
+        if card.get('issuer'):
+            print(f"   發卡機構: {card['issuer']}")
+        print(f"   描述: {card.get('descriptionEn', '')}")
+        print(f"   福利數量: {len(card.get('benefits', []))}")
+        if card.get('photo'):
+            print(f"   圖片: {card['photo']}")
+        print()
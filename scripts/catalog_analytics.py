@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+卡片目錄分析
+將目錄（匯出的 JSON/NDJSON 或資料庫的 CreditCard/Benefit 表格）載入成 NumPy 欄式陣列：
+字串欄位編碼為整數代碼，福利以 card 索引指回卡片。年化回饋金額（amount × 每年週期數，
+MONTHLY × 12、QUARTERLY × 4；ONE_TIME 另計）、依地區/銀行/發卡機構/福利類別的彙總與卡片排名
+都以 bincount、lexsort 等陣列運算一次完成，不逐張卡片迴圈。
+不同幣別無法直接相加，所有金額都依幣別分開計算與排名。
+
+用法:
+    python catalog_analytics.py --input catalog.json --top 10
+    python catalog_analytics.py --db-path ../apps/backend/prisma/dev.db --group-by region,category --output-json report.json
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from benefit_calendar import CYCLES_PER_YEAR, ONE_TIME_FREQUENCIES
+from card_store import DEFAULT_BUSY_TIMEOUT, DEFAULT_DB_PATH
+from catalog_io import load_catalog
+from metrics import metrics
+
+
+# 卡片層級的分組欄位；category 為福利層級
+CARD_GROUPS = ('region', 'bank', 'issuer')
+GROUP_FIELDS = CARD_GROUPS + ('category',)
+DEFAULT_TOP = 10
+
+_CARD_QUERY = """
+    SELECT id, name, region, bank, issuer FROM CreditCard WHERE isActive = 1 ORDER BY id
+"""
+_BENEFIT_QUERY = """
+    SELECT b.cardId, COALESCE(b.categoryEn, b.category), b.amount, b.currency,
+           COALESCE(b.cycleType, b.frequency)
+    FROM Benefit b JOIN CreditCard c ON c.id = b.cardId
+    WHERE b.isActive = 1 AND c.isActive = 1
+"""
+
+
+def _encode(values: Sequence) -> Tuple[np.ndarray, List[str]]:
+    """字串欄位編碼為 (代碼陣列, 代碼對應的標籤)；空值編為空字串"""
+    labels: Dict[str, int] = {}
+    codes = [labels.setdefault(value or '', len(labels)) for value in values]
+    return np.array(codes, dtype=np.int64), list(labels)
+
+
+class CatalogColumns:
+    """
+    目錄的欄式表示
+    卡片層級：names 與 groups（region/bank/issuer 的代碼與標籤）
+    福利層級：benefit_card（卡片索引）、amount（缺少時為 NaN）、per_year（每年週期數，
+    一次性或未知頻率為 0）、annual（年化金額）、one_time、category 與 currency 代碼
+    """
+
+    def __init__(self, names: List[str], card_fields: Dict[str, Sequence], benefit_card: Sequence[int],
+                 amounts: Sequence, frequencies: Sequence, categories: Sequence, currencies: Sequence):
+        self.names = names
+        self.groups = {name: _encode(card_fields[name]) for name in CARD_GROUPS}
+        self.benefit_card = np.asarray(benefit_card, dtype=np.int64)
+        self.amount = np.fromiter((np.nan if value is None else value for value in amounts),
+                                  dtype=np.float64, count=len(amounts))
+        # frequency 只有少數幾種值：先編碼，再由標籤對應每年週期數
+        frequency, labels = _encode(frequencies)
+        labels = [label.upper() for label in labels]
+        self.per_year = np.array([CYCLES_PER_YEAR.get(label, 0) for label in labels], dtype=np.int64)[frequency]
+        self.one_time = np.array([label in ONE_TIME_FREQUENCIES for label in labels], dtype=bool)[frequency]
+        # 每個福利的年化金額（沒有金額或一次性為 0）
+        self.annual = np.nan_to_num(self.amount) * self.per_year
+        self.category, self.category_labels = _encode(categories)
+        self.currency, self.currency_labels = _encode(currencies)
+
+    @property
+    def card_count(self) -> int:
+        return len(self.names)
+
+    @property
+    def benefit_count(self) -> int:
+        return len(self.benefit_card)
+
+    @classmethod
+    def from_cards(cls, cards: List[Dict]) -> 'CatalogColumns':
+        """由爬蟲目錄（Card 或 dict）建立"""
+        names = []
+        card_fields: Dict[str, list] = {name: [] for name in CARD_GROUPS}
+        benefit_card, amounts, frequencies, categories, currencies = [], [], [], [], []
+        for index, card in enumerate(cards):
+            names.append(card.get('name'))
+            for name in CARD_GROUPS:
+                card_fields[name].append(card.get(name))
+            for benefit in card.get('benefits') or []:
+                benefit_card.append(index)
+                amounts.append(benefit.get('amount'))
+                frequencies.append(benefit.get('cycleType') or benefit.get('frequency'))
+                categories.append(benefit.get('categoryEn') or benefit.get('category'))
+                currencies.append(benefit.get('currency'))
+        return cls(names, card_fields, benefit_card, amounts, frequencies, categories, currencies)
+
+    @classmethod
+    def from_db(cls, conn) -> 'CatalogColumns':
+        """由資料庫中啟用的卡片與福利建立；福利的 cardId 以 searchsorted 轉為卡片索引"""
+        cards = conn.execute(_CARD_QUERY).fetchall()
+        card_ids, names, regions, banks, issuers = zip(*cards) if cards else ((),) * 5
+        benefits = conn.execute(_BENEFIT_QUERY).fetchall()
+        benefit_ids, categories, amounts, currencies, frequencies = zip(*benefits) if benefits else ((),) * 5
+        benefit_card = np.searchsorted(np.asarray(card_ids, dtype=np.int64),
+                                       np.asarray(benefit_ids, dtype=np.int64))
+        card_fields = {'region': regions, 'bank': banks, 'issuer': issuers}
+        return cls(list(names), card_fields, benefit_card, amounts, frequencies, categories, currencies)
+
+
+def card_values(columns: CatalogColumns) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    每張卡片各幣別的 (年化金額, 一次性金額)，形狀皆為 (卡片數, 幣別數)
+    沒有金額的福利不計入
+    """
+    n_currencies = max(1, len(columns.currency_labels))
+    size = columns.card_count * n_currencies
+    key = columns.benefit_card * n_currencies + columns.currency
+    annual = np.bincount(key, weights=columns.annual, minlength=size)
+    one_time = np.bincount(key[columns.one_time], weights=np.nan_to_num(columns.amount[columns.one_time]),
+                           minlength=size)
+    shape = (columns.card_count, n_currencies)
+    return annual.reshape(shape), one_time.reshape(shape)
+
+
+def _group_top(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """每個群組中 values 最大的項目索引（同額時取索引最小者；群組中沒有項目時為 -1）"""
+    best = np.full(n_groups, -np.inf)
+    np.maximum.at(best, codes, values)
+    hits = np.flatnonzero(values == best[codes])
+    top = np.full(n_groups, len(values), dtype=np.int64)
+    np.minimum.at(top, codes[hits], hits)
+    top[top == len(values)] = -1
+    return top
+
+
+def group_values(columns: CatalogColumns, values: np.ndarray, by: str) -> List[Dict]:
+    """
+    依 region/bank/issuer（卡片層級）或 category（福利層級）彙總各幣別的年化金額
+    兩者都先整理成有金額的 (群組, 卡片, 幣別)，再以 bincount 彙總並找出各群組最高的卡片
+    """
+    n_cards, n_currencies = values.shape
+    if by == 'category':
+        labels = columns.category_labels
+        n_groups = len(labels)
+        # 同一張卡片在同一類別、幣別的多個福利合併為一筆；福利依卡片順序排列時
+        # 以卡片為首的鍵值幾乎已排序，stable 排序（timsort）很快
+        valued = columns.annual > 0
+        key = ((columns.benefit_card[valued] * n_groups + columns.category[valued]) * n_currencies
+               + columns.currency[valued])
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        starts = np.flatnonzero(np.diff(key, prepend=key[:1] - 1))
+        annual = columns.annual[valued][order]
+        pair_value = np.add.reduceat(annual, starts) if len(key) else annual
+        unique_keys = key[starts]
+        pair_currency = unique_keys % n_currencies
+        pair_group = unique_keys // n_currencies % n_groups
+        pair_card = unique_keys // n_currencies // n_groups
+    else:
+        codes, labels = columns.groups[by]
+        # 只保留有金額的 (卡片, 幣別)；每張卡片通常只有一種幣別
+        pair_card, pair_currency = np.nonzero(values > 0)
+        pair_value = values[pair_card, pair_currency]
+        pair_group = codes[pair_card]
+
+    size = len(labels) * n_currencies
+    group_key = pair_group * n_currencies + pair_currency
+    totals = np.bincount(group_key, weights=pair_value, minlength=size)
+    cards = np.bincount(group_key, minlength=size)
+    top = _group_top(group_key, pair_value, size)
+
+    rows = []
+    for key in np.flatnonzero(totals > 0).tolist():
+        group, currency = divmod(key, n_currencies)
+        count = int(cards[key])
+        rows.append({
+            'key': labels[group],
+            'currency': columns.currency_labels[currency],
+            'annualValue': round(float(totals[key]), 2),
+            'cards': count,
+            'averagePerCard': round(float(totals[key]) / count, 2),
+            'topCard': columns.names[pair_card[top[key]]],
+        })
+    rows.sort(key=lambda row: (row['currency'], -row['annualValue']))
+    return rows
+
+
+def rank_cards(columns: CatalogColumns, values: np.ndarray, one_time: np.ndarray,
+               top: int = DEFAULT_TOP, currency: Optional[str] = None) -> Dict[str, List[Dict]]:
+    """各幣別年化金額最高的 top 張卡片；regionRank 為卡片在所屬地區中的名次（同額同名次）"""
+    region_codes, region_labels = columns.groups['region']
+    ranking = {}
+    for index, label in enumerate(columns.currency_labels):
+        if currency and label != currency:
+            continue
+        column = values[:, index]
+        if not column.any():
+            continue
+        candidates = np.flatnonzero(column > 0)
+        if len(candidates) > top:
+            # 只排序可能進入前 top 名的卡片（金額相同時依目錄順序）
+            kth = len(candidates) - top
+            threshold = np.partition(column[candidates], kth)[kth]
+            candidates = candidates[column[candidates] >= threshold]
+        best = candidates[np.argsort(-column[candidates], kind='stable')][:top]
+        # 地區內名次：同地區中金額較高的卡片數 + 1
+        region_rank = [
+            int(np.count_nonzero(column[region_codes == region_codes[card]] > column[card])) + 1
+            for card in best.tolist()
+        ]
+        ranking[label] = [
+            {
+                'rank': rank,
+                'regionRank': region_rank[rank - 1],
+                'name': columns.names[card],
+                'region': region_labels[region_codes[card]],
+                'bank': columns.groups['bank'][1][columns.groups['bank'][0][card]],
+                'annualValue': round(float(column[card]), 2),
+                'oneTimeValue': round(float(one_time[card, index]), 2),
+            }
+            for rank, card in enumerate(best.tolist(), 1)
+        ]
+    return ranking
+
+
+def build_report(columns: CatalogColumns, group_by: Sequence[str] = GROUP_FIELDS,
+                 top: int = DEFAULT_TOP, currency: Optional[str] = None) -> Dict:
+    with metrics.stage('analytics.compute'):
+        values, one_time = card_values(columns)
+        groups = {}
+        for by in group_by:
+            rows = group_values(columns, values, by)
+            groups[by] = [row for row in rows if not currency or row['currency'] == currency]
+        return {
+            'cards': columns.card_count,
+            'benefits': columns.benefit_count,
+            'benefitsWithAmount': int(np.count_nonzero(~np.isnan(columns.amount))),
+            'ranking': rank_cards(columns, values, one_time, top=top, currency=currency),
+            'groups': groups,
+        }
+
+
+def print_report(report: Dict):
+    print(f"\n📊 {report['cards']} 張卡片，{report['benefits']} 個福利"
+          f"（{report['benefitsWithAmount']} 個有金額）")
+    for currency, cards in report['ranking'].items():
+        print(f"\n🏆 年化回饋排名（{currency}）")
+        print(f"{'#':>4}  {'地區內':>6}  {'年化金額':>12}  {'一次性':>10}  卡片")
+        for row in cards:
+            print(f"{row['rank']:>4}  {row['regionRank']:>6}  {row['annualValue']:>12,.2f}  "
+                  f"{row['oneTimeValue']:>10,.2f}  {row['name']} ({row['region'] or '-'}, {row['bank'] or '-'})")
+    labels = {'region': '地區', 'bank': '銀行', 'issuer': '發卡機構', 'category': '福利類別'}
+    for by, rows in report['groups'].items():
+        print(f"\n📦 依{labels[by]}彙總")
+        print(f"{'幣別':<6}{'年化金額':>14}{'卡片數':>8}{'每卡平均':>12}  {labels[by]} / 最高卡片")
+        for row in rows:
+            print(f"{row['currency'] or '-':<6}{row['annualValue']:>14,.2f}{row['cards']:>8}"
+                  f"{row['averagePerCard']:>12,.2f}  {row['key'] or '-'} / {row['topCard']}")
+
+
+def parse_group_by(value: str) -> List[str]:
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in GROUP_FIELDS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"未知的分組欄位: {', '.join(unknown)}（可用: {', '.join(GROUP_FIELDS)}）")
+    return fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description="卡片目錄分析 - 年化回饋金額、分組彙總與卡片排名")
+    parser.add_argument(
+        "--input",
+        type=str,
+        help="爬蟲匯出的目錄（.json 或 .ndjson/.jsonl，.gz 會解壓縮）；未指定時讀取資料庫"
+    )
+    parser.add_argument(
+        "--db-path",
+        type=str,
+        help="資料庫路徑（預設使用專案資料庫）"
+    )
+    parser.add_argument(
+        "--busy-timeout",
+        type=float,
+        default=DEFAULT_BUSY_TIMEOUT,
+        help=f"資料庫被其他連線鎖定時的等待秒數 (預設: {DEFAULT_BUSY_TIMEOUT:g})"
+    )
+    parser.add_argument(
+        "--group-by",
+        type=parse_group_by,
+        default=','.join(GROUP_FIELDS),
+        help=f"彙總欄位，以逗號分隔 (預設: {','.join(GROUP_FIELDS)})"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=DEFAULT_TOP,
+        help=f"每個幣別列出的卡片數 (預設: {DEFAULT_TOP})"
+    )
+    parser.add_argument(
+        "--currency",
+        type=str,
+        help="只顯示指定幣別，例如 USD"
+    )
+    parser.add_argument(
+        "--output-json",
+        type=str,
+        help="另外將報表輸出為 JSON"
+    )
+    args = parser.parse_args()
+    if args.top < 1:
+        parser.error("--top 必須大於 0")
+
+    with metrics.stage('analytics.load'):
+        if args.input:
+            columns = CatalogColumns.from_cards(load_catalog(args.input))
+        else:
+            import sqlite3
+
+            conn = sqlite3.connect(args.db_path or DEFAULT_DB_PATH, timeout=args.busy_timeout)
+            try:
+                columns = CatalogColumns.from_db(conn)
+            except sqlite3.Error as e:
+                print(f"❌ 讀取資料庫失敗: {e}")
+                sys.exit(1)
+            finally:
+                conn.close()
+
+    currency = args.currency.upper() if args.currency else None
+    report = build_report(columns, group_by=args.group_by, top=args.top, currency=currency)
+    print_report(report)
+
+    if args.output_json:
+        with open(args.output_json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ 報表已匯出至: {args.output_json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+卡片目錄的串流匯出/匯入
+NDJSON 格式：每行一張卡片（含福利），可選擇 gzip 壓縮（副檔名 .gz）。
+匯出與匯入都逐行處理，記憶體用量與目錄大小無關，也方便以行為單位切分平行處理。
+"""
+
+import gzip
+import json
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from models import json_default
+
+
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl', '.ndjson.gz', '.jsonl.gz')
+DEFAULT_IMPORT_BATCH_SIZE = 500
+
+
+def is_ndjson_path(path: str) -> bool:
+    return path.lower().endswith(NDJSON_SUFFIXES)
+
+
+def open_text(path: str, mode: str = 'r') -> TextIO:
+    """開啟文字檔，副檔名為 .gz 時自動以 gzip 讀寫"""
+    if path.lower().endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def write_ndjson(path: str, cards: Iterable[Dict], region: Optional[str] = None) -> int:
+    """
+    將卡片逐行寫入 NDJSON，回傳寫入的卡片數
+    指定 region 時，未帶 region 欄位的卡片會補上，讓每行都能獨立匯入
+    """
+    count = 0
+    with open_text(path, 'w') as f:
+        for card in cards:
+            if region and 'region' not in card:
+                card = dict(card, region=region)
+            f.write(json.dumps(card, ensure_ascii=False, separators=(',', ':'), default=json_default))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def iter_ndjson(path: str) -> Iterator[Dict]:
+    """逐行讀取 NDJSON，不會一次載入整個檔案"""
+    with open_text(path, 'r') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: 無效的 JSON: {e}") from e
+
+
+def load_catalog(path: str) -> List[Dict]:
+    """讀取匯出的目錄：JSON（{"cards": [...]} 或清單）或 NDJSON"""
+    if is_ndjson_path(path):
+        return list(iter_ndjson(path))
+    with open_text(path, 'r') as f:
+        data = json.load(f)
+    return data.get('cards', []) if isinstance(data, dict) else data
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[List]:
+    """將序列切成固定大小的批次"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_ndjson(path: str, save_batch: Callable[[List[Dict]], bool],
+                  batch_size: int = DEFAULT_IMPORT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    串流匯入 NDJSON：每讀滿 batch_size 張卡片就交給 save_batch 寫入
+    save_batch 通常為 AmexScraper(...).save_to_database 的 cards 參數版本；
+    呼叫端應在 CardStore.warm() 中執行，各批才不會重新讀取整個資料表
+    """
+    stats = {'batches': 0, 'cards': 0, 'failed_batches': 0}
+    for batch in iter_batches(iter_ndjson(path), batch_size):
+        stats['batches'] += 1
+        stats['cards'] += len(batch)
+        if not save_batch(batch):
+            stats['failed_batches'] += 1
+    return stats
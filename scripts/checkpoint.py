@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+長時間爬取的檢查點
+以本機 SQLite 記錄一次執行的進度：已抓取的網頁（zlib 壓縮）、已解析的卡片、
+以及已寫入資料庫的卡片。執行中斷（逾時、OOM、部署）後以 --resume 重新執行時，
+已抓取的網頁不再下載、已寫入的批次不再重寫；整次執行成功後才清除檢查點。
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Set
+
+from metrics import metrics
+from models import json_default
+from sync_state import DEFAULT_STATE_DIR
+
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(DEFAULT_STATE_DIR, 'checkpoints.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    run_id INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    content BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (run_id, url)
+);
+CREATE TABLE IF NOT EXISTS cards (
+    run_id INTEGER NOT NULL,
+    region TEXT NOT NULL,
+    name_en TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    persisted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, region, name_en)
+);
+"""
+
+
+class CheckpointStore:
+    """
+    單一資料來源（scope，例如 amex、regions）的執行檢查點
+    resume=True 時沿用該 scope 最近一次未完成的執行；否則捨棄未完成的執行並重新開始
+    可在多個執行緒中共用
+    """
+
+    def __init__(self, scope: str, path: str = DEFAULT_CHECKPOINT_PATH, resume: bool = False):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.scope = scope
+        self.path = path
+        self._lock = threading.Lock()
+
+        import sqlite3
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+
+        self.resumed = False
+        self.run_id = None
+        if resume:
+            row = self._conn.execute(
+                "SELECT id FROM runs WHERE scope = ? AND status = 'running' ORDER BY id DESC LIMIT 1",
+                (scope,)
+            ).fetchone()
+            if row is not None:
+                self.run_id = row[0]
+                self.resumed = True
+                self._touch()
+        if self.run_id is None:
+            self._discard_unfinished()
+            now = time.time()
+            self.run_id = self._conn.execute(
+                "INSERT INTO runs (scope, status, started_at, updated_at) VALUES (?, 'running', ?, ?)",
+                (scope, now, now)
+            ).lastrowid
+
+    def describe(self) -> str:
+        with self._lock:
+            pages = self._conn.execute(
+                "SELECT COUNT(*) FROM pages WHERE run_id = ?", (self.run_id,)
+            ).fetchone()[0]
+            cards, persisted = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(persisted), 0) FROM cards WHERE run_id = ?",
+                (self.run_id,)
+            ).fetchone()
+        return f"網頁 {pages}，卡片 {cards}（已寫入 {persisted}）"
+
+    # 網頁
+    def get_page(self, url: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM pages WHERE run_id = ? AND url = ?", (self.run_id, url)
+            ).fetchone()
+        if row is None:
+            return None
+        metrics.incr('checkpoint_pages_reused')
+        return zlib.decompress(row[0])
+
+    def save_page(self, url: str, content: bytes):
+        blob = zlib.compress(content, 6)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (run_id, url, content, fetched_at) VALUES (?, ?, ?, ?)",
+                (self.run_id, url, blob, time.time())
+            )
+
+    # 卡片
+    def save_cards(self, cards: Iterable[Dict], region: str = ''):
+        """記錄已解析的卡片（同名卡片覆寫內容，保留已寫入標記）"""
+        rows = [
+            (self.run_id, region, card['nameEn'], position,
+             json.dumps(card, ensure_ascii=False, separators=(',', ':'), default=json_default))
+            for position, card in enumerate(cards)
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO cards (run_id, region, name_en, position, data) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (run_id, region, name_en) DO UPDATE SET "
+                "position = excluded.position, data = excluded.data",
+                rows
+            )
+            self._conn.execute("COMMIT")
+            self._touch()
+
+    def load_cards(self, region: str = '') -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM cards WHERE run_id = ? AND region = ? AND position >= 0 ORDER BY position",
+                (self.run_id, region)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def mark_persisted(self, names: Iterable[str], region: str = ''):
+        """記錄已寫入資料庫的卡片（尚未記錄過的卡片只保留名稱）"""
+        rows = [(self.run_id, region, name, -1, '{}') for name in names]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO cards (run_id, region, name_en, position, data, persisted) "
+                "VALUES (?, ?, ?, ?, ?, 1) "
+                "ON CONFLICT (run_id, region, name_en) DO UPDATE SET persisted = 1",
+                rows
+            )
+            self._conn.execute("COMMIT")
+            self._touch()
+
+    def persisted_names(self, region: str = '') -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name_en FROM cards WHERE run_id = ? AND region = ? AND persisted = 1",
+                (self.run_id, region)
+            ).fetchall()
+        return {name for (name,) in rows}
+
+    # 執行狀態
+    def complete(self):
+        """整次執行成功：清除這次的網頁與卡片，只保留執行紀錄"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM pages WHERE run_id = ?", (self.run_id,))
+            self._conn.execute("DELETE FROM cards WHERE run_id = ?", (self.run_id,))
+            self._conn.execute(
+                "UPDATE runs SET status = 'completed', updated_at = ? WHERE id = ?",
+                (time.time(), self.run_id)
+            )
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        self._conn.close()
+
+    def _touch(self):
+        self._conn.execute("UPDATE runs SET updated_at = ? WHERE id = ?", (time.time(), self.run_id))
+
+    def _discard_unfinished(self):
+        rows = self._conn.execute(
+            "SELECT id FROM runs WHERE scope = ? AND status = 'running'", (self.scope,)
+        ).fetchall()
+        if not rows:
+            return
+        self._conn.execute("BEGIN")
+        for (run_id,) in rows:
+            self._conn.execute("DELETE FROM pages WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM cards WHERE run_id = ?", (run_id,))
+            self._conn.execute("UPDATE runs SET status = 'abandoned' WHERE id = ?", (run_id,))
+        self._conn.execute("COMMIT")
+
+
+def finish_checkpoint(checkpoint: Optional[CheckpointStore], success: bool):
+    """
+    命令列執行結束時呼叫：成功時清除檢查點；
+    未完成時保留進度並以非零狀態碼結束，之後以 --resume 接續
+    """
+    if checkpoint is None:
+        return
+    if success:
+        checkpoint.complete()
+        checkpoint.close()
+        return
+    print(f"⚠️  執行未完成，檢查點已保留（{checkpoint.describe()}），以 --resume 接續")
+    checkpoint.close()
+    sys.exit(1)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+並行爬取佇列（crawl frontier）
+從種子網址出發，以固定數量的工作執行緒同時抓取網頁，並從每頁擷取後續連結：
+- 網址正規化後去重（一般爬取用 set，大型爬取可改用固定記憶體的 Bloom filter）
+- 深度限制：種子為深度 0，超過 max_depth 的連結不再加入
+- 每個網址帶有標記（例如所屬卡片），由它發現的連結沿用同一個標記
+"""
+
+import hashlib
+import math
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urldefrag, urlsplit, urlunsplit
+
+from metrics import metrics
+
+
+DEFAULT_CRAWL_WORKERS = 4
+DEFAULT_MAX_DEPTH = 1
+
+
+def normalize_url(url: str) -> str:
+    """去掉 #fragment，scheme 與主機名稱轉小寫，空路徑補 /"""
+    url, _ = urldefrag(url.strip())
+    parts = urlsplit(url)
+    return urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.query, ''
+    ))
+
+
+class SeenSet:
+    """以 set 記錄已排入的網址（精確，記憶體隨網址數成長）"""
+
+    def __init__(self):
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def add(self, url: str) -> bool:
+        """加入網址；已存在時回傳 False"""
+        with self._lock:
+            if url in self._seen:
+                return False
+            self._seen.add(url)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class BloomFilter:
+    """
+    固定記憶體的網址去重，適合數十萬以上網址的大型爬取
+    有 error_rate 的機率把新網址誤判為已看過（少抓一頁），不會重複抓取
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity 必須大於 0，error_rate 必須介於 0 與 1 之間")
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, url: str) -> List[int]:
+        # double hashing：以兩個 64-bit 雜湊組合出 k 個位置
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, url: str) -> bool:
+        """加入網址；可能已存在時回傳 False"""
+        positions = self._positions(url)
+        with self._lock:
+            if all(self._bits[p >> 3] & (1 << (p & 7)) for p in positions):
+                return False
+            for p in positions:
+                self._bits[p >> 3] |= 1 << (p & 7)
+            self._count += 1
+            return True
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class CrawlFrontier:
+    """
+    並行爬取佇列
+    fetch(url) -> 網頁內容；extract_links(url, content, tag) -> 後續連結
+    crawl() 依完成順序產生 (url, depth, tag, content)；抓取或擷取連結失敗的網址只記錄並略過，
+    呼叫端解析失敗時以 record_failure 記錄，失敗清單保存在 failures
+    """
+
+    def __init__(self, fetch: Callable[[str], bytes],
+                 extract_links: Optional[Callable[[str, bytes, object], Iterable[str]]] = None,
+                 max_workers: int = DEFAULT_CRAWL_WORKERS,
+                 max_depth: int = DEFAULT_MAX_DEPTH,
+                 max_pages: Optional[int] = None,
+                 seen=None):
+        if max_workers < 1 or max_depth < 0:
+            raise ValueError("max_workers 必須大於 0，max_depth 不能為負數")
+        self.fetch = fetch
+        self.extract_links = extract_links
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.seen = seen if seen is not None else SeenSet()
+        self.stats = {'queued': 0, 'fetched': 0, 'errors': 0, 'duplicates': 0,
+                      'extract_errors': 0, 'parse_errors': 0}
+        # (url, 階段, 錯誤訊息)，階段為 fetch / extract / parse
+        self.failures: List[Tuple[str, str, str]] = []
+
+    def crawl(self, seeds: Iterable[Tuple[str, object]],
+              start_depth: int = 0) -> Iterator[Tuple[str, int, object, bytes]]:
+        """
+        seeds 為 (url, tag)；tag 會傳給 extract_links 並隨結果回傳
+        種子是從已抓取的列表頁取得時，可用 start_depth=1 讓深度從列表頁起算
+        """
+        pending: deque = deque()
+        for url, tag in seeds:
+            self._enqueue(pending, url, start_depth, tag)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='crawl') as executor:
+            running = {}
+            while pending or running:
+                # 讓工作執行緒保持滿載，但不一次送出整個佇列
+                while pending and len(running) < self.max_workers * 2:
+                    url, depth, tag = pending.popleft()
+                    running[executor.submit(self._fetch, url)] = (url, depth, tag)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, depth, tag = running.pop(future)
+                    try:
+                        content = future.result()
+                    except Exception as e:
+                        self.record_failure(url, 'fetch', e)
+                        continue
+
+                    self.stats['fetched'] += 1
+                    if self.extract_links is not None and depth < self.max_depth:
+                        try:
+                            links = list(self.extract_links(url, content, tag))
+                        except Exception as e:
+                            # 擷取連結失敗只影響這一頁的後續連結，頁面內容照常交給呼叫端
+                            self.record_failure(url, 'extract', e)
+                            links = []
+                        for link in links:
+                            self._enqueue(pending, link, depth + 1, tag)
+                    yield url, depth, tag, content
+
+    def record_failure(self, url: str, stage: str, error: Exception):
+        """記錄單一網頁的失敗並計入統計與 metrics，爬取繼續進行"""
+        labels = {'fetch': '抓取', 'extract': '擷取連結', 'parse': '解析'}
+        print(f"⚠️  {labels.get(stage, stage)}失敗 {url}: {error}")
+        self.failures.append((url, stage, str(error)))
+        self.stats['errors' if stage == 'fetch' else f"{stage}_errors"] += 1
+        metrics.incr(f"crawl_{stage}_errors")
+
+    def _enqueue(self, pending: deque, url: str, depth: int, tag):
+        if depth > self.max_depth:
+            return
+        if self.max_pages is not None and self.stats['queued'] >= self.max_pages:
+            return
+        url = normalize_url(url)
+        if not self.seen.add(url):
+            self.stats['duplicates'] += 1
+            return
+        self.stats['queued'] += 1
+        pending.append((url, depth, tag))
+
+    def _fetch(self, url: str) -> bytes:
+        with metrics.stage('crawl.fetch'):
+            return self.fetch(url)
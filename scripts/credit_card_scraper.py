@@ -4,19 +4,49 @@
 抓取美國、加拿大等地區的信用卡資訊並生成 SQL 插入語句
 """
 
-import requests
+import io
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 import argparse
+from urllib.parse import quote_plus
+
+from card_store import display_cards
+from catalog_io import is_ndjson_path, open_text, write_ndjson
+from checkpoint import DEFAULT_CHECKPOINT_PATH, CheckpointStore, finish_checkpoint
+from http_cache import ResponseCache
+from http_client import HttpClient, configure_default_client, get_default_client
+from metrics import add_cli_arguments, metrics, run_instrumented
+from models import Card, json_default, to_cards
+from sample_data import region_sample_cards
+from sql_writer import DEFAULT_BATCH_SIZE, DIALECTS, SeedSqlWriter, header_lines
+from sync_state import SyncDiff, SyncState, load_state, pending_state_path, promote_pending
+
+
+# 支援的地區（--regions all 會依此順序抓取）
+SUPPORTED_REGIONS = ["america", "canada", "taiwan", "japan", "singapore"]
 
 
 class CreditCardScraper:
     """信用卡資訊爬蟲類別"""
 
-    def __init__(self, region: str = "america"):
+    def __init__(self, region: str = "america", search_url: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None, client: Optional[HttpClient] = None,
+                 checkpoint: Optional[CheckpointStore] = None, sample_fallback: bool = True):
         self.region = region
-        self.cards = []
+        self.cards: List[Card] = []
+        # 搜尋 API 網址樣板，{query} 會被替換為搜尋關鍵字；未設定時使用示例數據
+        self.search_url = search_url
+        self.cache = cache
+        self.client = client or get_default_client()
+        # 檢查點：已抓取的地區在 --resume 時不再重新搜尋
+        self.checkpoint = checkpoint
+        # 搜尋 API 失敗時是否改用示例數據；常駐模式關閉，讓失敗如實回報
+        self.sample_fallback = sample_fallback
+        # 抓取失敗的原因；抓取成功（即使沒有卡片）時為 None
+        self.fetch_error: Optional[str] = None
 
     def search_web(self, query: str) -> Dict:
         """
@@ -34,184 +64,51 @@ class CreditCardScraper:
         # url = f"https://api.duckduckgo.com/?q={query}&format=json"
         # response = requests.get(url)
         # return response.json()
+        if self.search_url:
+            url = self.search_url.replace("{query}", quote_plus(query))
+            try:
+                if self.cache is not None:
+                    response = self.cache.get(url)
+                else:
+                    response = self.client.get(url)
+                    response.raise_for_status()
+                data = response.json()
+                if isinstance(data, dict) and "cards" in data:
+                    return data
+                print("⚠️  搜尋結果格式不符")
+                error = RuntimeError("搜尋結果格式不符")
+            except Exception as e:
+                print(f"❌ 搜尋失敗: {e}")
+                error = e
+
+            if self.checkpoint is not None:
+                # 檢查點模式不以示例數據代替，此地區記為失敗，留待 --resume 重試
+                print("❌ 檢查點模式不使用示例數據")
+                raise error
+            if not self.sample_fallback:
+                raise error
+            print("⚠️  使用示例數據")
 
         return self._get_sample_data()
 
     def _get_sample_data(self) -> Dict:
-        """返回示例數據（實際使用時應該從網頁抓取）"""
-        if self.region == "america":
-            return {
-                "cards": [
-                    {
-                        "name": "Chase Sapphire Preferred",
-                        "nameEn": "Chase Sapphire Preferred® Card",
-                        "bank": "Chase",
-                        "bankEn": "Chase Bank",
-                        "issuer": "Visa",
-                        "description": "旅行回饋信用卡，享2-5倍積分",
-                        "descriptionEn": "Travel rewards card with 2-5x points",
-                        "benefits": [
-                            {
-                                "category": "旅行回饋",
-                                "categoryEn": "Travel Rewards",
-                                "title": "旅行預訂5倍積分",
-                                "titleEn": "5x Points on Travel",
-                                "description": "透過Chase旅行網站預訂獲得5倍積分",
-                                "descriptionEn": "5x points on travel purchased through Chase Travel",
-                                "amount": None,
-                                "currency": "USD",
-                                "frequency": "YEARLY"
-                            },
-                            {
-                                "category": "餐飲回饋",
-                                "categoryEn": "Dining Rewards",
-                                "title": "餐廳3倍積分",
-                                "titleEn": "3x Points on Dining",
-                                "description": "餐廳消費獲得3倍積分",
-                                "descriptionEn": "3x points on dining",
-                                "amount": None,
-                                "currency": "USD",
-                                "frequency": "YEARLY"
-                            },
-                            {
-                                "category": "新戶禮",
-                                "categoryEn": "Sign-up Bonus",
-                                "title": "開卡禮60,000積分",
-                                "titleEn": "60,000 Bonus Points",
-                                "description": "開卡三個月內消費$4,000獲得60,000積分",
-                                "descriptionEn": "60,000 bonus points after spending $4,000 in first 3 months",
-                                "amount": 60000,
-                                "currency": "POINTS",
-                                "frequency": "ONE_TIME"
-                            }
-                        ]
-                    },
-                    {
-                        "name": "Capital One Venture X",
-                        "nameEn": "Capital One Venture X Rewards Credit Card",
-                        "bank": "Capital One",
-                        "bankEn": "Capital One",
-                        "issuer": "Visa",
-                        "description": "高端旅行信用卡，提供機場貴賓室和旅行回饋",
-                        "descriptionEn": "Premium travel card with lounge access and travel credits",
-                        "benefits": [
-                            {
-                                "category": "旅行回饋",
-                                "categoryEn": "Travel Rewards",
-                                "title": "所有消費2倍里程",
-                                "titleEn": "2x Miles on Everything",
-                                "description": "所有消費獲得2倍里程",
-                                "descriptionEn": "2x miles on every purchase",
-                                "amount": None,
-                                "currency": "USD",
-                                "frequency": "YEARLY"
-                            },
-                            {
-                                "category": "旅行回饋",
-                                "categoryEn": "Travel Credit",
-                                "title": "年度旅行回饋$300",
-                                "titleEn": "$300 Annual Travel Credit",
-                                "description": "每年$300旅行回饋",
-                                "descriptionEn": "$300 annual travel credit",
-                                "amount": 300,
-                                "currency": "USD",
-                                "frequency": "YEARLY"
-                            },
-                            {
-                                "category": "機場貴賓室",
-                                "categoryEn": "Airport Lounge",
-                                "title": "機場貴賓室通行證",
-                                "titleEn": "Airport Lounge Access",
-                                "description": "Priority Pass貴賓室和Capital One機場貴賓室",
-                                "descriptionEn": "Priority Pass and Capital One Lounge access",
-                                "amount": None,
-                                "currency": "USD",
-                                "frequency": "YEARLY"
-                            }
-                        ]
-                    },
-                    {
-                        "name": "Citi Double Cash Card",
-                        "nameEn": "Citi® Double Cash Card",
-                        "bank": "Citibank",
-                        "bankEn": "Citibank",
-                        "issuer": "Mastercard",
-                        "description": "無年費2%現金回饋卡",
-                        "descriptionEn": "No annual fee 2% cash back card",
-                        "benefits": [
-                            {
-                                "category": "現金回饋",
-                                "categoryEn": "Cash Back",
-                                "title": "所有消費2%現金回饋",
-                                "titleEn": "2% Cash Back on Everything",
-                                "description": "購買時1%，付款時再1%，總計2%",
-                                "descriptionEn": "1% when you buy, 1% when you pay, totaling 2%",
-                                "amount": None,
-                                "currency": "USD",
-                                "frequency": "YEARLY"
-                            }
-                        ]
-                    }
-                ]
-            }
-        elif self.region == "canada":
-            return {
-                "cards": [
-                    {
-                        "name": "Scotiabank Gold American Express",
-                        "nameEn": "Scotiabank Gold American Express® Card",
-                        "bank": "Scotiabank",
-                        "bankEn": "Scotiabank",
-                        "issuer": "American Express",
-                        "description": "餐飲和娛樂5倍積分",
-                        "descriptionEn": "5x points on dining and entertainment",
-                        "benefits": [
-                            {
-                                "category": "餐飲回饋",
-                                "categoryEn": "Dining Rewards",
-                                "title": "餐飲娛樂5倍積分",
-                                "titleEn": "5x Points on Dining & Entertainment",
-                                "description": "餐廳和娛樂消費5倍積分",
-                                "descriptionEn": "5x points on dining and entertainment",
-                                "amount": None,
-                                "currency": "CAD",
-                                "frequency": "YEARLY"
-                            }
-                        ]
-                    },
-                    {
-                        "name": "TD Aeroplan Visa Infinite",
-                        "nameEn": "TD® Aeroplan® Visa Infinite* Card",
-                        "bank": "TD Bank",
-                        "bankEn": "TD Bank",
-                        "issuer": "Visa",
-                        "description": "加航Aeroplan積分最佳選擇",
-                        "descriptionEn": "Best for Air Canada Aeroplan points",
-                        "benefits": [
-                            {
-                                "category": "航空回饋",
-                                "categoryEn": "Flight Rewards",
-                                "title": "加航消費2倍積分",
-                                "titleEn": "2x Points on Air Canada",
-                                "description": "加拿大航空消費2倍Aeroplan積分",
-                                "descriptionEn": "2x Aeroplan points on Air Canada purchases",
-                                "amount": None,
-                                "currency": "CAD",
-                                "frequency": "YEARLY"
-                            }
-                        ]
-                    }
-                ]
-            }
-
-        return {"cards": []}
+        """返回示例數據（scripts/data/region_sample_cards.json，實際使用時應該從網頁抓取）"""
+        return {"cards": region_sample_cards(self.region)}
 
+    @metrics.timed('fetch_cards')
     def fetch_cards(self):
         """抓取信用卡資訊"""
         print(f"\n{'='*60}")
         print(f"開始抓取 {self.region.upper()} 地區的信用卡資訊")
         print(f"{'='*60}\n")
 
+        if self.checkpoint is not None:
+            saved_cards = self.checkpoint.load_cards(self.region)
+            if saved_cards:
+                self.cards = to_cards(saved_cards)
+                print(f"♻️  從檢查點恢復 {len(self.cards)} 張信用卡資訊\n")
+                return self.cards
+
         # 根據地區設定搜尋關鍵字
         if self.region == "america":
             query = "best credit cards USA 2025 rewards cashback"
@@ -224,105 +121,120 @@ class CreditCardScraper:
 
         # 執行搜尋
         data = self.search_web(query)
-        self.cards = data.get("cards", [])
+        self.cards = to_cards(data.get("cards", []))
+        if self.checkpoint is not None and self.cards:
+            self.checkpoint.save_cards(self.cards, region=self.region)
 
         print(f"✅ 成功抓取 {len(self.cards)} 張信用卡資訊\n")
         return self.cards
 
     def display_results(self):
         """顯示抓取結果"""
-        if not self.cards:
-            print("❌ 沒有找到任何信用卡資訊")
-            return
-
-        print(f"\n{'='*60}")
-        print(f"抓取結果 - {self.region.upper()}")
-        print(f"{'='*60}\n")
+        display_cards(f"抓取結果 - {self.region.upper()}", self.cards)
 
-        for i, card in enumerate(self.cards, 1):
-            print(f"{i}. {card['nameEn']}")
-            print(f"   銀行: {card['bank']}")
-            print(f"   發卡機構: {card['issuer']}")
-            print(f"   描述: {card['descriptionEn']}")
-            print(f"   福利數量: {len(card.get('benefits', []))}")
-            print()
-
-    def generate_sql(self, output_file: Optional[str] = None) -> str:
-        """生成 SQL 插入語句"""
+    @metrics.timed('generate_sql')
+    def generate_sql(self, output_file: Optional[str] = None,
+                     sync_state: Optional[SyncState] = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE, dialect: str = 'sqlite') -> str:
+        """
+        生成 SQL 插入語句
+        語句逐句串流寫入 output_file，卡片與福利以 batch_size 筆為一句多列 INSERT；
+        未指定 output_file 時才回傳完整的 SQL 字串
+
+        傳入 sync_state 時為增量模式：只輸出與上次指紋不同的卡片/福利的
+        INSERT / UPDATE，以及將已移除資料設為停用的 UPDATE
+        產生 SQL 不代表已套用：新的指紋寫到 SQL 檔旁的待確認狀態檔，
+        套用後以 --confirm-applied 更新正式狀態檔；回傳 SQL 字串時由呼叫端套用後自行 commit
+        """
         if not self.cards:
             print("❌ 沒有資料可以生成 SQL")
             return ""
 
-        sql_statements = []
-        sql_statements.append(f"-- Credit Cards for {self.region.upper()}")
-        sql_statements.append(f"-- Generated at {datetime.now().isoformat()}\n")
-
-        for card in self.cards:
-            # 插入信用卡
-            sql_statements.append(f"-- {card['nameEn']}")
-            sql_statements.append(
-                f"INSERT INTO CreditCard (name, nameEn, bank, bankEn, issuer, region, "
-                f"description, descriptionEn, isActive, createdAt, updatedAt)\n"
-                f"VALUES (\n"
-                f"  '{card['name']}',\n"
-                f"  '{card['nameEn']}',\n"
-                f"  '{card['bank']}',\n"
-                f"  '{card['bankEn']}',\n"
-                f"  '{card['issuer']}',\n"
-                f"  '{self.region}',\n"
-                f"  '{card['description']}',\n"
-                f"  '{card['descriptionEn']}',\n"
-                f"  1,\n"
-                f"  datetime('now'),\n"
-                f"  datetime('now')\n"
-                f");\n"
-            )
+        writer = SeedSqlWriter(self.region, batch_size=batch_size, dialect=dialect)
 
-            # 插入福利
-            for benefit in card.get('benefits', []):
-                amount = benefit['amount'] if benefit['amount'] is not None else 'NULL'
-                sql_statements.append(
-                    f"INSERT INTO Benefit (cardId, category, categoryEn, title, titleEn, "
-                    f"description, descriptionEn, amount, currency, frequency, endMonth, endDay, "
-                    f"reminderDays, isActive, createdAt, updatedAt)\n"
-                    f"VALUES (\n"
-                    f"  (SELECT id FROM CreditCard WHERE nameEn = '{card['nameEn']}'),\n"
-                    f"  '{benefit['category']}',\n"
-                    f"  '{benefit['categoryEn']}',\n"
-                    f"  '{benefit['title']}',\n"
-                    f"  '{benefit['titleEn']}',\n"
-                    f"  '{benefit['description']}',\n"
-                    f"  '{benefit['descriptionEn']}',\n"
-                    f"  {amount},\n"
-                    f"  '{benefit['currency']}',\n"
-                    f"  '{benefit['frequency']}',\n"
-                    f"  12,\n"
-                    f"  31,\n"
-                    f"  30,\n"
-                    f"  1,\n"
-                    f"  datetime('now'),\n"
-                    f"  datetime('now')\n"
-                    f");\n"
-                )
-
-            sql_statements.append("")
-
-        sql_content = "\n".join(sql_statements)
+        if sync_state is None:
+            note = None
+            statements = writer.iter_card_inserts(self.cards)
+        else:
+            diff = sync_state.diff(self.cards)
+            print(f"🔁 增量同步: {diff.summary()}")
+            if not diff.has_changes:
+                print("✅ 資料未變更，不需要生成 SQL")
+                if output_file:
+                    # 上次產生但未套用的 SQL 已不需要，避免之後誤確認
+                    self._discard_pending(output_file)
+                return ""
+            note = f"Incremental sync: {diff.summary()}"
+            statements = self._incremental_sql(writer, diff)
+
+        header = header_lines(self.region, datetime.now().isoformat(), note)
 
         # 寫入檔案
         if output_file:
             with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(sql_content)
+                f.write(header)
+                count = writer.write(f, statements)
             print(f"✅ SQL 已生成並儲存至: {output_file}")
+            sql_content = ""
+        else:
+            buffer = io.StringIO()
+            buffer.write(header)
+            count = writer.write(buffer, statements)
+            sql_content = buffer.getvalue()
+
+        metrics.incr('sql_statements_written', count)
+        if sync_state is not None and output_file:
+            pending_path = pending_state_path(output_file)
+            sync_state.stage(self.cards, pending_path)
+            print(f"📝 套用 SQL 後執行 --confirm-applied {output_file} 更新同步狀態")
 
         return sql_content
 
+    @staticmethod
+    def _discard_pending(output_file: str):
+        pending_path = pending_state_path(output_file)
+        if os.path.exists(pending_path):
+            os.remove(pending_path)
+
+    def _incremental_sql(self, writer: SeedSqlWriter, diff: SyncDiff) -> Iterator[str]:
+        """依照比對結果產生增量 SQL"""
+        new_cards = {id(card) for card in diff.inserted_cards}
+
+        # 新卡片連同其福利一起批次輸出
+        yield from writer.iter_card_inserts(diff.inserted_cards)
+
+        for card in diff.modified_cards:
+            yield writer.card_update(card)
+
+        yield from writer.iter_benefit_inserts(
+            (card['nameEn'], benefit)
+            for card, benefit in diff.inserted_benefits
+            if id(card) not in new_cards
+        )
+
+        for card, benefit in diff.modified_benefits:
+            if id(card) not in new_cards:
+                yield writer.benefit_update(card['nameEn'], benefit)
+
+        yield from writer.iter_deactivations(diff.removed_cards, diff.removed_benefits)
+
+    @metrics.timed('export_json')
     def export_json(self, output_file: str):
-        """匯出為 JSON 格式"""
+        """
+        匯出為 JSON 格式
+        副檔名為 .ndjson / .jsonl 時改為每行一張卡片的 NDJSON（可串流匯入），
+        加上 .gz 時以 gzip 壓縮
+        """
         if not self.cards:
             print("❌ 沒有資料可以匯出")
             return
 
+        if is_ndjson_path(output_file):
+            count = write_ndjson(output_file, self.cards, region=self.region)
+            metrics.incr('cards_exported', count)
+            print(f"✅ NDJSON 已匯出至: {output_file} ({count} 張卡片)")
+            return
+
         data = {
             "region": self.region,
             "generated_at": datetime.now().isoformat(),
@@ -330,12 +242,114 @@ class CreditCardScraper:
             "cards": self.cards
         }
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open_text(output_file, 'w') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=json_default)
+        metrics.incr('cards_exported', len(self.cards))
 
         print(f"✅ JSON 已匯出至: {output_file}")
 
 
+def fetch_regions(regions: List[str], max_workers: int = 4, search_url: Optional[str] = None,
+                  cache: Optional[ResponseCache] = None,
+                  checkpoint: Optional[CheckpointStore] = None) -> Dict[str, CreditCardScraper]:
+    """
+    在同一個程序中並行抓取多個地區
+    使用有上限的執行緒池，總耗時接近最慢的地區而非所有地區相加
+    """
+    scrapers = {
+        region: CreditCardScraper(region=region, search_url=search_url, cache=cache,
+                                  checkpoint=checkpoint)
+        for region in regions
+    }
+    workers = max(1, min(max_workers, len(regions)))
+
+    print(f"🚀 並行抓取 {len(regions)} 個地區 (最大並行數: {workers})")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="region") as executor:
+        futures = {
+            executor.submit(scraper.fetch_cards): region
+            for region, scraper in scrapers.items()
+        }
+        for future in as_completed(futures):
+            region = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                # 單一地區失敗不影響其他地區
+                print(f"❌ {region.upper()} 抓取失敗: {e}")
+                scrapers[region].cards = []
+                scrapers[region].fetch_error = str(e)
+
+    # 依照輸入順序回傳，讓輸出結果穩定
+    return {region: scrapers[region] for region in regions}
+
+
+def parse_regions(value: str) -> List[str]:
+    """解析 --regions 參數 (all 或以逗號分隔的地區清單)"""
+    if value.strip().lower() == "all":
+        return list(SUPPORTED_REGIONS)
+
+    regions = []
+    for region in value.split(","):
+        region = region.strip().lower()
+        if not region:
+            continue
+        if region not in SUPPORTED_REGIONS:
+            raise argparse.ArgumentTypeError(
+                f"不支援的地區: {region} (可用: {', '.join(SUPPORTED_REGIONS)})"
+            )
+        if region not in regions:
+            regions.append(region)
+
+    if not regions:
+        raise argparse.ArgumentTypeError("至少需要指定一個地區")
+    return regions
+
+
+def _region_path(template: str, region: str) -> str:
+    """將輸出路徑中的 {region} 替換為地區名稱"""
+    return template.replace("{region}", region)
+
+
+def write_outputs(scraper: CreditCardScraper, output_sql: Optional[str], output_json: Optional[str],
+                  incremental: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+                  dialect: str = 'sqlite'):
+    """
+    依照參數輸出單一地區的 SQL / JSON 檔案
+    檢查點中已完成輸出的地區會略過，避免 --resume 時以空的增量結果覆寫已輸出的檔案
+    """
+    region = scraper.region
+    checkpoint = scraper.checkpoint
+    if checkpoint is not None and scraper.cards:
+        done = checkpoint.persisted_names(region)
+        if all(card['nameEn'] in done for card in scraper.cards):
+            print(f"♻️  {region.upper()} 已於上次執行輸出，略過")
+            return
+    # 增量模式下每個地區各自保存指紋狀態
+    sync_state = load_state(f"region-{region}") if incremental else None
+    # 未指定時使用預設輸出檔案
+    sql_path = _region_path(output_sql, region) if output_sql else f"seed-{region}-cards.sql"
+
+    scraper.generate_sql(sql_path, sync_state=sync_state, batch_size=batch_size, dialect=dialect)
+
+    if output_json:
+        scraper.export_json(_region_path(output_json, region))
+
+    if checkpoint is not None:
+        checkpoint.mark_persisted((card['nameEn'] for card in scraper.cards), region)
+
+
+def confirm_applied(sql_paths: List[str]):
+    """增量 SQL 確認套用後，將各 SQL 檔的待確認狀態寫入正式狀態檔"""
+    for sql_path in sql_paths:
+        pending_path = pending_state_path(sql_path)
+        if not os.path.exists(pending_path):
+            print(f"⚠️  找不到待確認狀態檔（已確認或非增量輸出）: {pending_path}")
+            continue
+        state_path = promote_pending(pending_path)
+        print(f"✅ 已確認套用 {sql_path}，同步狀態已更新: {state_path}")
+
+
 def main():
     """主程式"""
     parser = argparse.ArgumentParser(
@@ -345,49 +359,178 @@ def main():
         "--region",
         type=str,
         default="america",
-        choices=["america", "canada", "taiwan", "japan", "singapore"],
+        choices=SUPPORTED_REGIONS,
         help="指定要抓取的地區 (預設: america)"
     )
+    parser.add_argument(
+        "--regions",
+        type=parse_regions,
+        help="同時抓取多個地區: all 或以逗號分隔，例如 america,canada (會覆蓋 --region)"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=4,
+        help="多地區模式的最大並行數 (預設: 4)"
+    )
     parser.add_argument(
         "--output-sql",
         type=str,
-        help="SQL 輸出檔案路徑"
+        help="SQL 輸出檔案路徑（多地區模式需包含 {region}）"
     )
     parser.add_argument(
         "--output-json",
         type=str,
-        help="JSON 輸出檔案路徑"
+        help="JSON 輸出檔案路徑（多地區模式需包含 {region}；.ndjson/.jsonl 為 NDJSON，.gz 會壓縮）"
     )
     parser.add_argument(
         "--display-only",
         action="store_true",
         help="只顯示結果，不生成檔案"
     )
+    parser.add_argument(
+        "--sql-batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"每句多列 INSERT 的資料筆數 (預設: {DEFAULT_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--sql-dialect",
+        type=str,
+        default="sqlite",
+        choices=sorted(DIALECTS),
+        help="SQL 語法：sqlite (本機 dev.db) 或 postgres (預設: sqlite)"
+    )
+    parser.add_argument(
+        "--search-url",
+        type=str,
+        help="搜尋 API 網址樣板，{query} 會替換為關鍵字，回應需為 {\"cards\": [...]} 格式"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=2.0,
+        help="每個主機每秒最多請求數 (預設: 2)"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="遇到 429/5xx 或連線錯誤時的最大重試次數 (預設: 3)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="啟用 HTTP 回應快取並指定快取目錄"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=3600,
+        help="快取有效秒數 (預設: 3600)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="增量同步：SQL 只包含與上次執行相比有變更的卡片與福利"
+    )
+    parser.add_argument(
+        "--confirm-applied",
+        type=str,
+        nargs="+",
+        metavar="SQL_FILE",
+        help="增量 SQL 已套用到資料庫後執行：以 SQL 檔旁的待確認狀態更新同步狀態，不進行抓取"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="記錄執行進度（已抓取與已輸出的地區），中斷後可用 --resume 接續"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="從上次中斷的執行接續（隱含 --checkpoint）"
+    )
+    parser.add_argument(
+        "--checkpoint-file",
+        type=str,
+        default=DEFAULT_CHECKPOINT_PATH,
+        help="檢查點資料庫路徑（預設: scripts/.scraper_state/checkpoints.db）"
+    )
+
+    add_cli_arguments(parser)
 
     args = parser.parse_args()
+    run_instrumented(args, 'credit_card_scraper', lambda: _run(args, parser))
+
+
+def _run(args, parser):
+    """依照命令列參數執行抓取與輸出"""
+    if args.max_workers < 1:
+        parser.error("--max-workers 必須大於 0")
+    if args.sql_batch_size < 1:
+        parser.error("--sql-batch-size 必須大於 0")
+    if args.rate_limit <= 0:
+        parser.error("--rate-limit 必須大於 0")
+
+    if args.confirm_applied:
+        confirm_applied(args.confirm_applied)
+        return
+
+    client = configure_default_client(rate_per_host=args.rate_limit, max_retries=args.max_retries)
+    cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl, session=client) if args.cache_dir else None
+
+    checkpoint = None
+    if args.checkpoint or args.resume:
+        checkpoint = CheckpointStore('regions', path=args.checkpoint_file, resume=args.resume)
+        if checkpoint.resumed:
+            print(f"♻️  從上次中斷處繼續（{checkpoint.describe()}）")
+        elif args.resume:
+            print("⚠️  沒有未完成的執行可接續，重新開始")
+
+    if args.regions:
+        # 多地區模式：每個地區各自輸出檔案，路徑需可區分地區
+        for option, value in (("--output-sql", args.output_sql), ("--output-json", args.output_json)):
+            if value and len(args.regions) > 1 and "{region}" not in value:
+                parser.error(f"多地區模式下 {option} 必須包含 {{region}}，例如 seed-{{region}}-cards.sql")
+
+        scrapers = fetch_regions(
+            args.regions, max_workers=args.max_workers, search_url=args.search_url, cache=cache,
+            checkpoint=checkpoint
+        )
+
+        for scraper in scrapers.values():
+            scraper.display_results()
+
+        if not args.display_only:
+            for scraper in scrapers.values():
+                write_outputs(scraper, args.output_sql, args.output_json, args.incremental,
+                              args.sql_batch_size, args.sql_dialect)
+        # 沒有卡片的地區（例如尚無示例資料）仍算完成，只有抓取失敗的地區留待 --resume
+        finish_checkpoint(checkpoint, all(scraper.fetch_error is None for scraper in scrapers.values()))
+        return
 
     # 創建爬蟲實例
-    scraper = CreditCardScraper(region=args.region)
+    scraper = CreditCardScraper(region=args.region, search_url=args.search_url, cache=cache,
+                                checkpoint=checkpoint)
 
     # 抓取資料
-    scraper.fetch_cards()
+    try:
+        scraper.fetch_cards()
+    except Exception as e:
+        if checkpoint is None:
+            raise
+        print(f"❌ {scraper.region.upper()} 抓取失敗: {e}")
+        scraper.fetch_error = str(e)
 
     # 顯示結果
     scraper.display_results()
 
-    if args.display_only:
-        return
-
-    # 生成輸出檔案
-    if args.output_sql:
-        scraper.generate_sql(args.output_sql)
-    else:
-        # 預設輸出檔案
-        default_sql = f"seed-{args.region}-cards.sql"
-        scraper.generate_sql(default_sql)
-
-    if args.output_json:
-        scraper.export_json(args.output_json)
+    if not args.display_only:
+        # 生成輸出檔案
+        write_outputs(scraper, args.output_sql, args.output_json, args.incremental,
+                      args.sql_batch_size, args.sql_dialect)
+    finish_checkpoint(checkpoint, scraper.fetch_error is None)
 
 
 if __name__ == "__main__":
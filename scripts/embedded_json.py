@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+內嵌 JSON 擷取器
+許多發卡機構的網頁以 JavaScript 動態產生內容，但資料本身已經以 JSON 形式
+內嵌在 HTML 中（JSON-LD、Next.js 的 __NEXT_DATA__、window.__INITIAL_STATE__ 等）。
+直接擷取這些 JSON 即可取得動態資料，不需要啟動瀏覽器。
+"""
+
+import json
+import re
+from typing import Dict, Iterator, List, Optional
+
+
+# <script type="application/ld+json"> ... </script>
+JSON_LD_RE = re.compile(
+    r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL
+)
+# <script id="__NEXT_DATA__" type="application/json"> ... </script>
+NEXT_DATA_RE = re.compile(
+    r'<script[^>]+id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL
+)
+# window.__INITIAL_STATE__ = {...};  /  window.__PRELOADED_STATE__ = {...}
+STATE_ASSIGN_RE = re.compile(
+    r'window\.(__[A-Z_]+__|[A-Za-z_]*[Ss]tate)\s*=\s*',
+)
+
+# 可能代表卡片名稱/描述/福利的鍵
+NAME_KEYS = ('name', 'cardName', 'productName', 'title', 'displayName')
+DESCRIPTION_KEYS = ('description', 'shortDescription', 'tagline', 'subtitle', 'summary')
+BENEFIT_LIST_KEYS = ('benefits', 'features', 'offers', 'perks', 'credits', 'rewards')
+BENEFIT_TITLE_KEYS = ('title', 'name', 'headline', 'label')
+BENEFIT_DESCRIPTION_KEYS = ('description', 'body', 'text', 'detail', 'details')
+AMOUNT_KEYS = ('amount', 'value', 'creditAmount', 'price')
+
+# 文字中的頻率關鍵字（依序比對）
+FREQUENCY_PATTERNS = (
+    (re.compile(r'\bmonthly\b|\bper month\b|\beach month\b|\bevery month\b', re.I), 'MONTHLY'),
+    (re.compile(r'\bquarterly\b|\bper quarter\b|\beach quarter\b', re.I), 'QUARTERLY'),
+    (re.compile(r'\bsemi-?annual(ly)?\b|\btwice a year\b', re.I), 'SEMI_ANNUALLY'),
+    (re.compile(r'\bwelcome\b|\bsign-?up\b|\bone-?time\b', re.I), 'ONE_TIME'),
+)
+DOLLAR_RE = re.compile(r'\$\s?([\d,]+(?:\.\d+)?)')
+
+CARD_TYPE_RE = re.compile(r'credit ?card|card$|product', re.I)
+
+
+def iter_embedded_json(html: str) -> Iterator[object]:
+    """依序產生網頁中所有可解析的內嵌 JSON 物件"""
+    for pattern in (NEXT_DATA_RE, JSON_LD_RE):
+        for match in pattern.finditer(html):
+            data = _loads(match.group(1))
+            if data is not None:
+                yield data
+
+    decoder = json.JSONDecoder()
+    for match in STATE_ASSIGN_RE.finditer(html):
+        start = match.end()
+        if start >= len(html) or html[start] not in '{[':
+            continue
+        try:
+            data, _ = decoder.raw_decode(html, start)
+        except ValueError:
+            continue
+        yield data
+
+
+def extract_cards(html, issuer: str = 'American Express', region: Optional[str] = None) -> List[Dict]:
+    """
+    從內嵌 JSON 擷取卡片，轉換為爬蟲共用的卡片/福利 dict 格式
+    找不到任何內嵌資料時回傳空 list，呼叫端可退回 HTML 解析
+    """
+    return list(iter_cards(html, issuer, region))
+
+
+def iter_cards(html, issuer: str = 'American Express', region: Optional[str] = None) -> Iterator[Dict]:
+    """extract_cards 的串流版本：每擷取到一張卡片就產生（供管線模式使用）"""
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+
+    seen = set()
+    for data in iter_embedded_json(html):
+        for node in _iter_card_nodes(data):
+            card = _to_card(node, issuer, region)
+            if card is None or card['nameEn'] in seen:
+                continue
+            seen.add(card['nameEn'])
+            yield card
+
+
+def _loads(text: str):
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _iter_card_nodes(data) -> Iterator[Dict]:
+    """走訪 JSON 樹，找出看起來像信用卡產品的物件"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        if _looks_like_card(node):
+            yield node
+            # 卡片物件內的福利不會是另一張卡片，不再往下走
+            continue
+
+        # JSON-LD 的 @graph / itemListElement 等容器
+        stack.extend(reversed(list(node.values())))
+
+
+def _looks_like_card(node: Dict) -> bool:
+    name = _first_str(node, NAME_KEYS)
+    if not name:
+        return False
+
+    node_type = node.get('@type') or node.get('type') or node.get('__typename') or ''
+    if isinstance(node_type, list):
+        node_type = ' '.join(str(t) for t in node_type)
+    if isinstance(node_type, str) and CARD_TYPE_RE.search(node_type):
+        return True
+
+    # 沒有型別資訊時：名稱像卡片，且帶有福利清單
+    has_benefits = any(isinstance(node.get(key), list) for key in BENEFIT_LIST_KEYS)
+    return has_benefits and 'card' in name.lower()
+
+
+def _to_card(node: Dict, issuer: str, region: Optional[str]) -> Optional[Dict]:
+    name = _clean(_first_str(node, NAME_KEYS))
+    if not name or len(name) < 3:
+        return None
+
+    description = _clean(_first_str(node, DESCRIPTION_KEYS)) or f'{issuer} {name}'
+    card = {
+        'name': name,
+        'nameEn': name,
+        'bank': issuer,
+        'bankEn': issuer,
+        'issuer': issuer,
+        'description': description,
+        'descriptionEn': description,
+        'benefits': [],
+    }
+    if region:
+        card['region'] = region
+
+    image = node.get('image')
+    if isinstance(image, dict):
+        image = image.get('url')
+    if isinstance(image, list):
+        image = image[0] if image and isinstance(image[0], str) else None
+    if isinstance(image, str) and image:
+        card['photo'] = image
+
+    url = node.get('url')
+    if isinstance(url, str) and url:
+        card['url'] = url
+
+    seen_titles = set()
+    for key in BENEFIT_LIST_KEYS:
+        items = node.get(key)
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            benefit = to_benefit(item)
+            if benefit is None or benefit['titleEn'] in seen_titles:
+                continue
+            seen_titles.add(benefit['titleEn'])
+            card['benefits'].append(benefit)
+
+    return card
+
+
+def to_benefit(item) -> Optional[Dict]:
+    """
+    將福利文字或 JSON 物件轉為福利 dict，由文字推斷金額與頻率
+    也用於解析卡片詳細頁的福利清單
+    """
+    if isinstance(item, str):
+        title, description = _clean(item), _clean(item)
+        amount = None
+    elif isinstance(item, dict):
+        title = _clean(_first_str(item, BENEFIT_TITLE_KEYS))
+        description = _clean(_first_str(item, BENEFIT_DESCRIPTION_KEYS)) or title
+        amount = _first_number(item, AMOUNT_KEYS)
+    else:
+        return None
+
+    if not title:
+        return None
+
+    text = f"{title} {description}"
+    if amount is None:
+        match = DOLLAR_RE.search(text)
+        if match:
+            amount = float(match.group(1).replace(',', ''))
+
+    frequency = 'YEARLY'
+    for pattern, value in FREQUENCY_PATTERNS:
+        if pattern.search(text):
+            frequency = value
+            break
+
+    category = 'Credit' if amount is not None else 'Rewards'
+    return {
+        'category': category,
+        'categoryEn': category,
+        'title': title,
+        'titleEn': title,
+        'description': description,
+        'descriptionEn': description,
+        'amount': amount,
+        'currency': 'USD',
+        'frequency': frequency,
+        'startMonth': 1,
+        'startDay': 1,
+        'endMonth': 12,
+        'endDay': 31,
+        'reminderDays': 7 if frequency == 'MONTHLY' else 30,
+    }
+
+
+def _first_str(node: Dict, keys) -> Optional[str]:
+    for key in keys:
+        value = node.get(key)
+        if isinstance(value, str) and value.strip():
+            return value
+    return None
+
+
+def _first_number(node: Dict, keys) -> Optional[float]:
+    for key in keys:
+        value = node.get(key)
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            match = DOLLAR_RE.search(value) or re.fullmatch(r'\s*([\d,]+(?:\.\d+)?)\s*', value)
+            if match:
+                return float(match.group(1).replace(',', ''))
+    return None
+
+
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+
+
+def _clean(text: Optional[str]) -> Optional[str]:
+    """移除 JSON 字串中夾帶的 HTML 標籤與多餘空白"""
+    if text is None:
+        return None
+    return SPACE_RE.sub(' ', TAG_RE.sub(' ', text)).strip()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+HTTP 回應快取
+以 URL 為鍵將回應存在本機 SQLite 檔案中，支援：
+- TTL：在有效期限內直接使用快取，不發出任何請求
+- 條件式 GET：過期後帶 If-None-Match / If-Modified-Since 重新驗證，
+  304 時沿用快取內容（以及由內容解析出的結果），不需重新下載與解析
+- 依總大小做 LRU 淘汰
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from http_client import get_default_client
+from metrics import metrics
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.http_cache')
+DEFAULT_TTL = 3600
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_TIMEOUT = 10
+
+
+class CachedResponse:
+    """快取層回傳的回應"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes,
+                 from_cache: bool = False, not_modified: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        # from_cache: 內容來自本機快取（未下載 body）
+        # not_modified: 內容與上次相同（TTL 內命中或伺服器回 304）
+        self.from_cache = from_cache
+        self.not_modified = not_modified
+
+    @property
+    def text(self) -> str:
+        encoding = 'utf-8'
+        content_type = self.headers.get('Content-Type', '')
+        if 'charset=' in content_type:
+            encoding = content_type.split('charset=')[-1].split(';')[0].strip() or encoding
+        return self.content.decode(encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ResponseCache:
+    """以 URL 為鍵的磁碟回應快取（執行緒安全）"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES, session=None, timeout: float = DEFAULT_TIMEOUT,
+                 clock: Callable[[], float] = time.time):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # session 只需提供 get(url, headers=, timeout=)，預設使用共用的 HttpClient
+        self.session = session or get_default_client()
+        self.timeout = timeout
+        self.clock = clock
+
+        self._lock = threading.Lock()
+
+        import sqlite3
+        self._conn = sqlite3.connect(
+            os.path.join(cache_dir, 'responses.db'), check_same_thread=False
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                derived TEXT
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)"
+        )
+        self._conn.commit()
+
+        # 統計資訊
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        """
+        取得 URL 內容
+        TTL 內直接回傳快取；過期則以條件式 GET 重新驗證
+        """
+        entry = self._lookup(url)
+        now = self.clock()
+
+        if entry is not None and now - entry['fetched_at'] < self.ttl:
+            self.hits += 1
+            metrics.incr('cache_hits')
+            self._touch(url, now)
+            return self._to_response(url, entry, not_modified=True)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry['etag']:
+                request_headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request_headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session.get(url, headers=request_headers, timeout=self.timeout)
+
+        if response.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            metrics.incr('cache_revalidated')
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                    (now, now, url)
+                )
+                self._conn.commit()
+            return self._to_response(url, entry, not_modified=True)
+
+        response.raise_for_status()
+        self.misses += 1
+        metrics.incr('cache_misses')
+
+        # 伺服器可能對未變更的內容仍回 200，內容相同時視同 304
+        unchanged = entry is not None and entry['body'] == response.content
+        self._store(url, response, now, keep_derived=unchanged)
+        return CachedResponse(
+            url, response.status_code, dict(response.headers), response.content,
+            from_cache=False, not_modified=unchanged
+        )
+
+    def load_derived(self, url: str, name: str):
+        """取得由此 URL 內容解析出的結果（內容變更時會自動失效）"""
+        entry = self._lookup(url)
+        if entry is None or not entry['derived']:
+            return None
+        return json.loads(entry['derived']).get(name)
+
+    def store_derived(self, url: str, name: str, data):
+        """保存由此 URL 內容解析出的結果，下次 304 時可直接使用"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT derived FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return
+            derived = json.loads(row[0]) if row[0] else {}
+            derived[name] = data
+            self._conn.execute(
+                "UPDATE responses SET derived = ? WHERE url = ?",
+                (json.dumps(derived, ensure_ascii=False), url)
+            )
+            self._conn.commit()
+
+    def total_size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _lookup(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT status, headers, etag, last_modified, body, fetched_at, derived
+                FROM responses WHERE url = ?
+                """,
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'status': row[0],
+            'headers': json.loads(row[1]),
+            'etag': row[2],
+            'last_modified': row[3],
+            'body': row[4],
+            'fetched_at': row[5],
+            'derived': row[6],
+        }
+
+    def _touch(self, url: str, now: float):
+        with self._lock:
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+
+    def _store(self, url: str, response, now: float, keep_derived: bool = False):
+        body = response.content
+        with self._lock:
+            derived = None
+            if keep_derived:
+                row = self._conn.execute(
+                    "SELECT derived FROM responses WHERE url = ?", (url,)
+                ).fetchone()
+                derived = row[0] if row else None
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (
+                    url, status, headers, etag, last_modified, body, size,
+                    fetched_at, accessed_at, derived
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    url,
+                    response.status_code,
+                    json.dumps(dict(response.headers)),
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    body,
+                    len(body),
+                    now,
+                    now,
+                    derived,
+                )
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """總大小超過上限時，依最後存取時間淘汰最舊的項目（呼叫端需持有鎖）"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+
+    def _to_response(self, url: str, entry: Dict, not_modified: bool) -> CachedResponse:
+        return CachedResponse(
+            url, entry['status'], entry['headers'], entry['body'],
+            from_cache=True, not_modified=not_modified
+        )
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+爬蟲共用的 HTTP 用戶端
+- keep-alive 連線池（requests.Session + HTTPAdapter，第一次發出請求時才載入 requests）
+- 每個主機各自的 token bucket 限速，避免對同一網站請求過快而被封鎖
+- 遇到 429 / 5xx 或連線錯誤時，以帶抖動的指數退避重試
+"""
+
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+from metrics import metrics
+
+if TYPE_CHECKING:
+    import requests
+
+
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+)
+
+# 需要重試的狀態碼
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Token bucket 限速器（執行緒安全）
+    rate: 每秒補充的 token 數，capacity: 可累積的最大 token 數（允許的突發量）
+    """
+
+    def __init__(self, rate: float, capacity: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError("rate 必須大於 0")
+        if capacity < 1:
+            raise ValueError("capacity 必須至少為 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """取得一個 token，不足時等待；回傳等待的秒數"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+
+class HttpClient:
+    """共用 HTTP 用戶端，介面與 requests.Session.get 相容"""
+
+    def __init__(self, rate_per_host: float = 2.0, burst: float = 4, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0, timeout: float = 10,
+                 pool_size: int = 10, user_agent: str = DEFAULT_USER_AGENT,
+                 sleep: Callable[[float], None] = time.sleep):
+        # 限速參數在第一次請求時才用到，建立時就檢查，避免執行到一半才因除以零失敗
+        if rate_per_host <= 0:
+            raise ValueError("rate_per_host 必須大於 0")
+        if burst < 1:
+            raise ValueError("burst 必須至少為 1")
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.sleep = sleep
+        self.pool_size = pool_size
+        self.user_agent = user_agent
+        self._session: Optional['requests.Session'] = None
+        self._session_lock = threading.Lock()
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+        # 統計資訊
+        self.requests_sent = 0
+        self.retries = 0
+
+    @property
+    def session(self) -> 'requests.Session':
+        """
+        keep-alive 連線池，第一次使用時才建立
+        只顯示、重播或匯入等不連網的執行不需要載入 requests
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers['User-Agent'] = self.user_agent
+                    self._session = session
+        return self._session
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None) -> 'requests.Response':
+        """
+        發出 GET 請求
+        429 / 5xx 與連線錯誤會重試；重試用盡後回傳最後一次的回應（或拋出最後的例外）
+        """
+        session = self.session
+        import requests
+
+        bucket = self._bucket_for(url)
+        attempt = 0
+        while True:
+            bucket.acquire()
+            self.requests_sent += 1
+            metrics.incr('http_requests')
+            try:
+                with metrics.stage('http.request'):
+                    response = session.get(url, headers=headers, timeout=timeout or self.timeout)
+                    metrics.incr('http_bytes_downloaded', len(response.content))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"⚠️  連線失敗 ({e.__class__.__name__})，{delay:.1f} 秒後重試: {url}")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                print(f"⚠️  HTTP {response.status_code}，{delay:.1f} 秒後重試: {url}")
+                response.close()
+
+            attempt += 1
+            self.retries += 1
+            metrics.incr('http_retries')
+            self.sleep(delay)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+    def _bucket_for(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc.lower()
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_per_host, self.burst, sleep=self.sleep)
+                self._buckets[host] = bucket
+            return bucket
+
+    def _backoff(self, attempt: int) -> float:
+        """指數退避加上完整抖動（full jitter），避免多個請求同時重試"""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def _retry_after(self, response: 'requests.Response') -> Optional[float]:
+        """讀取 Retry-After（秒數格式），並限制在 backoff_max 以內"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return min(self.backoff_max, max(0.0, float(value)))
+        except ValueError:
+            return None
+
+
+_default_client: Optional[HttpClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> HttpClient:
+    """取得程序內共用的 HttpClient（所有爬蟲共用同一個連線池與限速狀態）"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def configure_default_client(**kwargs) -> HttpClient:
+    """以指定參數重新建立共用的 HttpClient（供命令列參數使用）"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = HttpClient(**kwargs)
+        return _default_client
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+爬蟲執行的計時與指標
+- 每個步驟（抓取、解析、儲存、輸出）的 wall / CPU 時間與呼叫次數
+- 計數器：下載位元組數、HTTP 請求與重試、快取命中、寫入/略過的資料列
+- 輸出 JSON 摘要與 Prometheus textfile（node_exporter textfile collector 格式）
+- --profile：以 cProfile 剖析整次執行（含工作執行緒）
+"""
+
+import argparse
+import cProfile
+import functools
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+
+class Metrics:
+    """程序內的指標收集器（執行緒安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.stages: Dict[str, Dict[str, float]] = {}
+            self.counters: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        量測一個步驟的 wall 與 CPU 時間
+        CPU 時間為整個程序的 process_time，步驟內若有其他執行緒也會一併計入
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            with self._lock:
+                entry = self.stages.setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+                entry['calls'] += 1
+                entry['wall_seconds'] += wall
+                entry['cpu_seconds'] += cpu
+
+    def timed(self, name: str) -> Callable:
+        """裝飾器版本的 stage()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                'duration_seconds': time.time() - self.started_at,
+                'stages': {name: dict(entry) for name, entry in self.stages.items()},
+                'counters': dict(self.counters),
+            }
+
+    def write_json(self, path: str):
+        _atomic_write(path, json.dumps(self.summary(), ensure_ascii=False, indent=2) + '\n')
+
+    def to_prometheus(self, job: str) -> str:
+        summary = self.summary()
+        label = f'job="{_escape_label(job)}"'
+        # 步驟時間、呼叫次數與 incr() 計數器都是累計值，以 counter 型別與 _total 結尾輸出
+        lines = [
+            '# HELP creditcard_scraper_stage_wall_seconds_total Wall-clock time spent per stage.',
+            '# TYPE creditcard_scraper_stage_wall_seconds_total counter',
+        ]
+        for name, entry in sorted(summary['stages'].items()):
+            lines.append(
+                f'creditcard_scraper_stage_wall_seconds_total{{{label},stage="{_escape_label(name)}"}} '
+                f"{entry['wall_seconds']:.6f}"
+            )
+        lines += [
+            '# HELP creditcard_scraper_stage_cpu_seconds_total CPU time spent per stage.',
+            '# TYPE creditcard_scraper_stage_cpu_seconds_total counter',
+        ]
+        for name, entry in sorted(summary['stages'].items()):
+            lines.append(
+                f'creditcard_scraper_stage_cpu_seconds_total{{{label},stage="{_escape_label(name)}"}} '
+                f"{entry['cpu_seconds']:.6f}"
+            )
+        lines += [
+            '# HELP creditcard_scraper_stage_calls_total Number of times each stage ran.',
+            '# TYPE creditcard_scraper_stage_calls_total counter',
+        ]
+        for name, entry in sorted(summary['stages'].items()):
+            lines.append(
+                f'creditcard_scraper_stage_calls_total{{{label},stage="{_escape_label(name)}"}} {entry["calls"]}'
+            )
+        for name, value in sorted(summary['counters'].items()):
+            metric = f"creditcard_scraper_{_counter_name(name)}"
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric}{{{label}}} {value}')
+        lines += [
+            '# TYPE creditcard_scraper_run_duration_seconds gauge',
+            f"creditcard_scraper_run_duration_seconds{{{label}}} {summary['duration_seconds']:.6f}",
+            '# TYPE creditcard_scraper_last_run_timestamp_seconds gauge',
+            f"creditcard_scraper_last_run_timestamp_seconds{{{label}}} {time.time():.0f}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str, job: str):
+        _atomic_write(path, self.to_prometheus(job))
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n📊 執行摘要 ({summary['duration_seconds']:.2f} 秒)")
+        for name, entry in sorted(summary['stages'].items(), key=lambda item: -item[1]['wall_seconds']):
+            print(f"   {name:<28} wall {entry['wall_seconds']:>8.3f}s  "
+                  f"cpu {entry['cpu_seconds']:>8.3f}s  x{entry['calls']}")
+        for name, value in sorted(summary['counters'].items()):
+            print(f"   {name:<28} {value:g}")
+
+
+# 程序內共用的指標收集器
+metrics = Metrics()
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+def _counter_name(name: str) -> str:
+    metric = _metric_name(name)
+    return metric if metric.endswith('_total') else f"{metric}_total"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _atomic_write(path: str, content: str):
+    """textfile collector 可能隨時讀取，先寫暫存檔再 rename"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def add_cli_arguments(parser: argparse.ArgumentParser):
+    """加入 --metrics-json / --metrics-prom / --profile 參數"""
+    parser.add_argument(
+        "--metrics-json",
+        type=str,
+        help="將各步驟的計時與計數器輸出為 JSON 摘要"
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        type=str,
+        help="輸出 Prometheus textfile（供 node_exporter textfile collector 讀取）"
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="scraper.prof",
+        help="以 cProfile 剖析整次執行（含工作執行緒，不含 --parse-workers 的解析程序）並輸出 pstats 檔 "
+             "(預設: scraper.prof)"
+    )
+
+
+class ThreadProfiler:
+    """
+    cProfile 只記錄呼叫 enable() 的執行緒；Python 3.12 之前以 threading.setprofile
+    讓之後啟動的每個執行緒各自建立一個 Profile，結束時與主執行緒的結果合併
+    （3.12 起 cProfile 以 sys.monitoring 實作，已涵蓋所有執行緒）
+    """
+
+    def __init__(self):
+        self.main = cProfile.Profile()
+        self.threads: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._per_thread = sys.version_info < (3, 12)
+
+    def _start_thread(self, frame, event, arg):
+        # 新執行緒的第一個事件：改由這個執行緒自己的 Profile 接手
+        profiler = cProfile.Profile()
+        with self._lock:
+            self.threads.append(profiler)
+        profiler.enable()
+
+    def enable(self):
+        if self._per_thread:
+            threading.setprofile(self._start_thread)
+        self.main.enable()
+
+    def disable(self):
+        self.main.disable()
+        if self._per_thread:
+            threading.setprofile(None)
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self.main)
+        with self._lock:
+            threads = list(self.threads)
+        if threads:
+            stats.add(*threads)
+        return stats
+
+
+def run_instrumented(args: argparse.Namespace, job: str, func: Callable[[], None],
+                     profile_limit: int = 25):
+    """依照命令列參數執行 func，並在結束時輸出指標與剖析結果"""
+    profiler: Optional[ThreadProfiler] = ThreadProfiler() if args.profile else None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        with metrics.stage('total'):
+            func()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            stats = profiler.stats()
+            stats.dump_stats(args.profile)
+            print(f"\n🔬 cProfile 結果已儲存至: {args.profile}（前 {profile_limit} 項，依累計時間排序）")
+            stats.sort_stats('cumulative').print_stats(profile_limit)
+
+        if args.metrics_json or args.metrics_prom or args.profile:
+            metrics.print_summary()
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+            print(f"✅ 指標 JSON 已輸出至: {args.metrics_json}")
+        if args.metrics_prom:
+            metrics.write_prometheus(args.metrics_prom, job)
+            print(f"✅ Prometheus 指標已輸出至: {args.metrics_prom}")
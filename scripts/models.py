@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+卡片與福利的精簡資料模型
+以 __slots__ 取代每筆記錄一個 dict：欄位名稱只存在類別上，不會每筆重複一份；
+幣別、頻率、銀行等低基數字串會 intern，同一個值在記憶體中只保留一份。
+
+記錄同時提供 dict 相容的讀寫介面（card['nameEn']、card.get('photo')、'region' in card），
+現有的 SQL 產生、資料庫寫入與增量比對程式不需修改；
+與 dict / JSON 之間的轉換只在邊界進行（from_dict / to_dict / json_default）。
+"""
+
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class _Missing:
+    """欄位未提供（與值為 None 不同，to_dict 時不輸出，保留原本的 dict 形狀）"""
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<missing>'
+
+    def __reduce__(self):
+        # pickle 後仍為同一個 MISSING 物件（跨程序傳遞記錄時以 is 比較）
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+class _Record:
+    """__slots__ 記錄的共用基底：dict 相容介面與 dict 互轉"""
+
+    __slots__ = ('_extra',)
+
+    # 子類別定義：欄位順序（即 to_dict 的鍵順序）與需要 intern 的低基數欄位
+    FIELDS: Tuple[str, ...] = ()
+    INTERNED: frozenset = frozenset()
+    _FIELD_SET: frozenset = frozenset()
+
+    def __init__(self, **fields):
+        self._extra = None
+        for name in self.FIELDS:
+            self._set(name, fields.pop(name, MISSING))
+        if fields:
+            self._extra = fields
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> '_Record':
+        """由 dict（例如 JSON 載入的資料）建立記錄；不在 FIELDS 內的鍵保留在 _extra"""
+        if isinstance(data, cls):
+            return data
+        record = cls.__new__(cls)
+        record._extra = None
+        get = data.get
+        interned = cls.INTERNED
+        intern = sys.intern
+        for name in cls.FIELDS:
+            value = get(name, MISSING)
+            if name in interned and type(value) is str:
+                value = intern(value)
+            setattr(record, name, value)
+        extra = {key: value for key, value in data.items() if key not in cls._FIELD_SET}
+        if extra:
+            record._extra = extra
+        return record
+
+    def to_dict(self) -> Dict:
+        """轉回與原始資料相同形狀的 dict（未提供的欄位不輸出）"""
+        result = {}
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not MISSING:
+                result[name] = value
+        if self._extra:
+            result.update(self._extra)
+        return result
+
+    def _set(self, name: str, value):
+        if name in self.INTERNED and type(value) is str:
+            value = sys.intern(value)
+        setattr(self, name, value)
+
+    # dict 相容介面
+    def __getitem__(self, key: str):
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            if value is MISSING:
+                raise KeyError(key)
+            return value
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key in self._FIELD_SET:
+            self._set(key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key) -> bool:
+        if key in self._FIELD_SET:
+            return getattr(self, key) is not MISSING
+        return bool(self._extra) and key in self._extra
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        keys = [name for name in self.FIELDS if getattr(self, name) is not MISSING]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def items(self) -> List[Tuple[str, object]]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, _Record):
+            return type(self) is type(other) and self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # 以欄位值 tuple 序列化，比 dict 精簡（程序池回傳解析結果時使用）
+        values = tuple(getattr(self, name) for name in self.FIELDS)
+        return _restore, (type(self), values, self._extra)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Benefit(_Record):
+    """卡片福利"""
+
+    FIELDS = (
+        'category', 'categoryEn', 'title', 'titleEn', 'description', 'descriptionEn',
+        'amount', 'currency', 'frequency', 'cycleType',
+        'startMonth', 'startDay', 'endMonth', 'endDay', 'reminderDays',
+    )
+    INTERNED = frozenset(('category', 'categoryEn', 'currency', 'frequency', 'cycleType'))
+    _FIELD_SET = frozenset(FIELDS)
+    __slots__ = FIELDS
+
+
+class Card(_Record):
+    """信用卡（benefits 為 Benefit 清單）"""
+
+    FIELDS = (
+        'name', 'nameEn', 'bank', 'bankEn', 'issuer', 'region', 'type',
+        'description', 'descriptionEn', 'photo', 'url', 'fee', 'benefits',
+    )
+    INTERNED = frozenset(('bank', 'bankEn', 'issuer', 'region', 'type'))
+    _FIELD_SET = frozenset(FIELDS)
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Card':
+        card = super().from_dict(data)
+        if card is not data and isinstance(card.benefits, list):
+            card.benefits = [Benefit.from_dict(benefit) for benefit in card.benefits]
+        return card
+
+    def _set(self, name: str, value):
+        if name == 'benefits' and isinstance(value, list):
+            value = [Benefit.from_dict(benefit) for benefit in value]
+        super()._set(name, value)
+
+    def to_dict(self) -> Dict:
+        result = super().to_dict()
+        if 'benefits' in result:
+            result['benefits'] = [
+                benefit.to_dict() if isinstance(benefit, _Record) else benefit
+                for benefit in result['benefits']
+            ]
+        return result
+
+
+def _restore(cls, values: tuple, extra: Optional[Dict]) -> _Record:
+    """__reduce__ 的還原函式；反序列化後的字串重新 intern"""
+    record = cls.__new__(cls)
+    record._extra = extra
+    interned = cls.INTERNED
+    for name, value in zip(cls.FIELDS, values):
+        if name in interned and type(value) is str:
+            value = sys.intern(value)
+        setattr(record, name, value)
+    return record
+
+
+def to_cards(records: Iterable[Dict]) -> List[Card]:
+    """將 dict 清單轉為 Card 清單（已是 Card 的項目原樣保留）"""
+    return [Card.from_dict(record) for record in records]
+
+
+def to_dicts(records: Iterable[Dict]) -> List[Dict]:
+    """將記錄清單轉回 dict（寫入 JSON 快取等需要原生 dict 的地方）"""
+    return [record.to_dict() if isinstance(record, _Record) else record for record in records]
+
+
+def merge_benefits(card: Dict, benefits: List[Dict]) -> int:
+    """將福利合併進卡片（依 titleEn 去重），回傳新增的數量"""
+    merged = list(card.get('benefits') or [])
+    seen_titles = {benefit['titleEn'] for benefit in merged}
+    added = 0
+    for benefit in benefits:
+        if benefit['titleEn'] in seen_titles:
+            continue
+        seen_titles.add(benefit['titleEn'])
+        merged.append(benefit)
+        added += 1
+    if added:
+        card['benefits'] = merged
+    return added
+
+
+def json_default(obj):
+    """json.dump 的 default：讓 Card / Benefit 可直接序列化"""
+    if isinstance(obj, _Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+多程序網頁解析
+BeautifulSoup 解析是 CPU 密集工作且會持有 GIL，執行緒無法分散到多個核心。
+ParseExecutor 將原始 HTML 送到程序池解析，回傳精簡的卡片記錄：
+- 結果依輸入順序產生（與逐頁解析相同）
+- 每頁的錯誤互相隔離：單頁解析失敗只會在該頁的結果中標記，不影響其他頁
+- 同時送出的頁面數有上限，記憶體不會隨頁數成長
+"""
+
+import os
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+
+class ParseResult:
+    """單頁的解析結果；ok 為 False 時 error 為錯誤說明，value 為 None"""
+
+    __slots__ = ('index', 'key', 'ok', 'value', 'error')
+
+    def __init__(self, index: int, key, ok: bool, value=None, error: Optional[str] = None):
+        self.index = index
+        self.key = key
+        self.ok = ok
+        self.value = value
+        self.error = error
+
+
+def _run_isolated(func: Callable, args: tuple) -> Tuple[bool, object, Optional[str]]:
+    """在工作程序中執行解析，例外轉為錯誤說明回傳"""
+    try:
+        return True, func(*args), None
+    except Exception as e:
+        detail = traceback.format_exc(limit=3)
+        return False, None, f"{type(e).__name__}: {e}\n{detail}"
+
+
+class ParseExecutor:
+    """
+    以程序池平行解析網頁
+    parse_func 必須是模組層級的函式（可被 pickle），回傳值也需可被 pickle；
+    workers=1 時直接在目前程序中解析，不建立程序池
+    """
+
+    def __init__(self, parse_func: Callable, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.parse_func = parse_func
+        self.workers = workers or os.cpu_count() or 1
+        if self.workers < 1:
+            raise ValueError("workers 必須大於 0")
+        # 同時送出的頁面數，超過時等待最早的結果
+        self.max_pending = max_pending or self.workers * 4
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'ParseExecutor':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def map(self, pages: Iterable[Tuple]) -> Iterator[ParseResult]:
+        """
+        pages 的每一項為 (key, *args)，以 parse_func(*args) 解析
+        依輸入順序產生 ParseResult，key 原樣帶回（例如網址）
+        """
+        if self.workers == 1:
+            for index, (key, *args) in enumerate(pages):
+                ok, value, error = _run_isolated(self.parse_func, tuple(args))
+                yield ParseResult(index, key, ok, value, error)
+            return
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        pending = deque()
+        for index, (key, *args) in enumerate(pages):
+            pending.append((index, key, self._pool.submit(_run_isolated, self.parse_func, tuple(args))))
+            if len(pending) >= self.max_pending:
+                yield self._result(*pending.popleft())
+        while pending:
+            yield self._result(*pending.popleft())
+
+    @staticmethod
+    def _result(index: int, key, future) -> ParseResult:
+        try:
+            ok, value, error = future.result()
+        except Exception as e:
+            # 工作程序異常結束或結果無法傳回
+            ok, value, error = False, None, f"{type(e).__name__}: {e}"
+        return ParseResult(index, key, ok, value, error)
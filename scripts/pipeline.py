@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+抓取 → 解析 → 寫入 管線
+三個階段各自在不同執行緒執行，之間以有界佇列相連：
+- 抓取（I/O）與解析（CPU）、資料庫寫入可同時進行
+- 佇列滿時上游會等待，記憶體用量上限取決於佇列大小而非目錄大小
+- 卡片一解析出來就進入寫入佇列，每滿 batch_size 張（或閒置 flush_interval 秒）寫入一次
+"""
+
+import queue
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from metrics import metrics
+
+
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_PIPELINE_BATCH_SIZE = 50
+
+# 佇列結束標記
+_DONE = object()
+
+
+class Pipeline:
+    """
+    三段式管線
+    fetch(source) -> 原始內容；parse(source, content) -> 可迭代的卡片；
+    persist(cards) -> 是否寫入成功
+    單一來源的抓取或解析失敗只會記錄並略過，不會中止整條管線
+    """
+
+    def __init__(self, fetch: Callable[[str], bytes],
+                 parse: Callable[[str, bytes], Iterable[Dict]],
+                 persist: Callable[[List[Dict]], bool],
+                 fetch_workers: int = 2,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 batch_size: int = DEFAULT_PIPELINE_BATCH_SIZE,
+                 flush_interval: float = 1.0):
+        if fetch_workers < 1 or queue_size < 1 or batch_size < 1:
+            raise ValueError("fetch_workers、queue_size 與 batch_size 必須大於 0")
+        self.fetch = fetch
+        self.parse = parse
+        self.persist = persist
+        self.fetch_workers = fetch_workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+
+    def run(self, sources: Iterable[str]) -> Dict[str, int]:
+        """執行管線直到所有來源處理完畢，回傳各階段的統計"""
+        self._stop.clear()
+        self.stats = {
+            'sources': 0, 'fetch_errors': 0, 'parse_errors': 0,
+            'cards': 0, 'batches': 0, 'failed_batches': 0,
+        }
+        source_iter = iter(sources)
+        # 原始網頁較大，頁面佇列只保留少量項目
+        page_queue: queue.Queue = queue.Queue(maxsize=max(1, self.fetch_workers))
+        card_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        fetchers = [
+            threading.Thread(target=self._fetch_loop, args=(source_iter, page_queue),
+                             name=f"pipeline-fetch-{i}", daemon=True)
+            for i in range(self.fetch_workers)
+        ]
+        parser = threading.Thread(target=self._parse_loop, args=(page_queue, card_queue),
+                                  name="pipeline-parse", daemon=True)
+        for thread in fetchers:
+            thread.start()
+        parser.start()
+
+        # 所有抓取執行緒結束後通知解析階段
+        def close_pages():
+            for thread in fetchers:
+                thread.join()
+            self._put(page_queue, _DONE)
+
+        closer = threading.Thread(target=close_pages, name="pipeline-close", daemon=True)
+        closer.start()
+
+        try:
+            self._persist_loop(card_queue)
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            closer.join()
+            parser.join()
+
+        return dict(self.stats)
+
+    def _incr(self, key: str, value: int = 1):
+        with self._lock:
+            self.stats[key] += value
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """放入佇列；佇列滿時等待，管線中止時放棄並回傳 False"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _next_source(self, source_iter) -> Optional[str]:
+        with self._lock:
+            return next(source_iter, None)
+
+    def _fetch_loop(self, source_iter, page_queue: queue.Queue):
+        while not self._stop.is_set():
+            source = self._next_source(source_iter)
+            if source is None:
+                return
+            self._incr('sources')
+            try:
+                with metrics.stage('pipeline.fetch'):
+                    content = self.fetch(source)
+            except Exception as e:
+                print(f"❌ 抓取失敗 {source}: {e}")
+                self._incr('fetch_errors')
+                continue
+            if not self._put(page_queue, (source, content)):
+                return
+
+    def _parse_loop(self, page_queue: queue.Queue, card_queue: queue.Queue):
+        try:
+            while not self._stop.is_set():
+                try:
+                    item = page_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    return
+                source, content = item
+                try:
+                    with metrics.stage('pipeline.parse'):
+                        for card in self.parse(source, content):
+                            if not self._put(card_queue, card):
+                                return
+                except Exception as e:
+                    print(f"❌ 解析失敗 {source}: {e}")
+                    self._incr('parse_errors')
+        finally:
+            self._put(card_queue, _DONE)
+
+    def _persist_loop(self, card_queue: queue.Queue):
+        batch: List[Dict] = []
+        while True:
+            try:
+                item = card_queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # 上游暫時沒有新卡片：先寫入已累積的部分，讓資料盡早進入資料庫
+                self._flush(batch)
+                batch = []
+                continue
+            if item is _DONE:
+                self._flush(batch)
+                return
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+
+    def _flush(self, batch: List[Dict]):
+        if not batch:
+            return
+        with metrics.stage('pipeline.persist'):
+            ok = self.persist(batch)
+        self._incr('batches')
+        self._incr('cards', len(batch))
+        if not ok:
+            self._incr('failed_batches')
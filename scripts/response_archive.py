@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+原始回應的錄製/重播封存檔
+錄製模式將每個抓取到的回應（網址、狀態碼、標頭、zlib 壓縮的內容）存入本機 SQLite，
+重播模式由封存檔提供回應，不發出任何網路請求：
+調整解析選擇器或做效能測試時，可以重複使用同一批網頁，結果穩定且快速。
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional
+
+from http_cache import CachedResponse
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class ArchivedResponse(CachedResponse):
+    """由封存檔重播的回應"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes,
+                 kind: str, fetched_at: float):
+        super().__init__(url, status_code, headers, content, from_cache=True)
+        self.kind = kind
+        self.fetched_at = fetched_at
+
+
+class ResponseArchive:
+    """
+    以網址為鍵的回應封存檔（同一網址保留最後一次錄製的回應）
+    kind 標示網頁用途（例如 listing 列表頁、detail 卡片詳細頁），重播時依此選擇解析方式
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+
+        import sqlite3
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def record(self, url: str, response, kind: str = 'page'):
+        """錄製一個回應（requests.Response 或 CachedResponse）"""
+        content = response.content
+        headers = json.dumps(dict(response.headers or {}), ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, kind, status, headers, body, size, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, kind, response.status_code, headers, zlib.compress(content, 6),
+                 len(content), time.time())
+            )
+            self._conn.commit()
+
+    def get(self, url: str) -> Optional[ArchivedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, kind, status, headers, body, fetched_at FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+        return self._to_response(row) if row is not None else None
+
+    def iter_responses(self, kind: Optional[str] = None) -> Iterator[ArchivedResponse]:
+        """依網址順序逐筆讀出封存的回應（結果可重現，一次只解壓一個內容）"""
+        query = "SELECT url FROM responses"
+        params = ()
+        if kind is not None:
+            query += " WHERE kind = ?"
+            params = (kind,)
+        with self._lock:
+            urls = [url for (url,) in self._conn.execute(query + " ORDER BY url", params)]
+        for url in urls:
+            response = self.get(url)
+            if response is not None:
+                yield response
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, COUNT(*) FROM responses GROUP BY kind"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        self._conn.close()
+
+    @staticmethod
+    def _to_response(row) -> ArchivedResponse:
+        url, kind, status, headers, body, fetched_at = row
+        return ArchivedResponse(url, status, json.loads(headers), zlib.decompress(body), kind, fetched_at)
+
+
+class ReplayMissError(LookupError):
+    """重播模式下封存檔中沒有此網址"""
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+示例/備用卡片目錄
+網路抓取失敗或未設定搜尋 API 時使用的資料放在 scripts/data/*.json，
+第一次使用時才讀取並解析，之後只依快取的資料建立新的 Card 記錄
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import List
+
+from models import Card, to_cards
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+@lru_cache(maxsize=None)
+def _load(filename: str):
+    """讀取並解析資料檔（每個檔案在程序中只解析一次，呼叫端不可修改回傳值）"""
+    with open(os.path.join(DATA_DIR, filename), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def amex_sample_cards() -> List[Card]:
+    """American Express 示例卡片（每次回傳新的 Card 清單，可自由修改）"""
+    return to_cards(_load('amex_sample_cards.json'))
+
+
+def region_sample_cards(region: str) -> List[Card]:
+    """地區示例卡片；沒有示例資料的地區回傳空清單"""
+    return to_cards(_load('region_sample_cards.json').get(region, []))
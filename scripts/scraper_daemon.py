@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+常駐排程模式（scrapers.py --daemon）
+每個外掛有自己的抓取間隔，並加上隨機抖動，避免所有來源同時打到同一批主機。
+程序常駐後，HTTP 連線池、回應快取、資料庫連線、卡片名稱比對索引與增量同步狀態
+都在週期之間保留，每個週期只抓取到期的來源。
+加上 --incremental 時，第一個週期之後只寫入與上一個週期不同的資料。
+本機另提供 /healthz（JSON 狀態）與 /metrics（Prometheus 格式）端點。
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+from card_identity import DEFAULT_MATCH_THRESHOLD
+from card_store import CardStore
+from metrics import metrics
+from models import Card
+from scraper_plugins import ScraperContext, ScraperPlugin, export_catalog, merge_catalog, run_plugins
+from sync_state import SyncState, default_state_path
+
+
+# 預設抓取間隔（秒）與抖動比例（間隔 ±10%）
+DEFAULT_INTERVAL = 6 * 3600
+DEFAULT_JITTER = 0.1
+
+# 健康檢查端點
+DEFAULT_HEALTH_HOST = '127.0.0.1'
+DEFAULT_HEALTH_PORT = 8790
+
+# 連續失敗幾次後 /healthz 回報 503
+UNHEALTHY_FAILURES = 3
+
+
+def parse_intervals(value: str, names: List[str]) -> Dict[str, float]:
+    """
+    解析 --plugin-interval：以逗號分隔的 名稱=秒數，名稱可用 region:* 等前綴
+    例如 "amex=3600,region:*=86400"；回傳 外掛名稱 -> 間隔
+    """
+    intervals: Dict[str, float] = {}
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        pattern, sep, seconds = item.partition('=')
+        pattern = pattern.strip().lower()
+        try:
+            interval = float(seconds)
+        except ValueError:
+            interval = 0
+        if not sep or interval <= 0:
+            raise ValueError(f"間隔格式錯誤: {item}（應為 名稱=秒數）")
+        if pattern.endswith('*'):
+            matched = [name for name in names if name.startswith(pattern[:-1])]
+        else:
+            matched = [name for name in names if name == pattern]
+        if not matched:
+            raise ValueError(f"--plugin-interval 指定的外掛未被執行: {pattern}")
+        for name in matched:
+            intervals[name] = interval
+    return intervals
+
+
+class PluginSchedule:
+    """單一外掛的排程與最近一次執行結果"""
+
+    def __init__(self, plugin: ScraperPlugin, interval: float):
+        self.plugin = plugin
+        self.interval = interval
+        self.next_run = 0.0
+        self.last_run: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.runs = 0
+        self.failures = 0
+        # 連續失敗次數，成功一次即歸零
+        self.consecutive_failures = 0
+        self.cards = 0
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            'interval_seconds': self.interval,
+            'next_run_in_seconds': round(max(0.0, self.next_run - now), 1),
+            'last_run': datetime.fromtimestamp(self.last_run).isoformat() if self.last_run else None,
+            'runs': self.runs,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'last_error': self.last_error,
+            'cards': self.cards,
+        }
+
+
+class ScraperDaemon:
+    """
+    常駐執行外掛並寫入資料庫
+    各外掛最近一次成功的結果保留在記憶體中，每個週期只重新抓取到期的外掛，
+    再與其他外掛的既有結果合併成完整目錄，以增量同步寫入變更的部分
+    """
+
+    def __init__(self, plugins: List[ScraperPlugin], context: ScraperContext,
+                 store: Optional[CardStore] = None, interval: float = DEFAULT_INTERVAL,
+                 jitter: float = DEFAULT_JITTER, intervals: Optional[Dict[str, float]] = None,
+                 max_workers: int = 4, match_threshold: float = DEFAULT_MATCH_THRESHOLD,
+                 output_json: Optional[str] = None, incremental: bool = False,
+                 state_scope: Optional[str] = None, clock: Callable[[], float] = time.monotonic,
+                 rng: Optional[random.Random] = None):
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter 必須介於 0 與 1 之間")
+        self.plugins = plugins
+        self.context = context
+        self.store = store
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self.match_threshold = match_threshold
+        self.output_json = output_json
+        self.clock = clock
+        self.rng = rng or random.Random()
+        intervals = intervals or {}
+        self.schedules = {
+            plugin.name: PluginSchedule(plugin, intervals.get(plugin.name, interval))
+            for plugin in plugins
+        }
+        # 外掛名稱 -> 最近一次成功抓取的卡片
+        self.results: Dict[str, List[Card]] = {}
+        # 增量同步需另外啟用（--incremental）。狀態依外掛組合與資料庫路徑區分，
+        # 且啟動時一律從空狀態開始：第一個週期完整寫入，之後的週期才與上一個週期比對，
+        # 資料庫重建或改用其他資料庫時不會因舊狀態檔而略過寫入
+        self.sync_state = None
+        if store is not None and incremental:
+            db_key = hashlib.sha1(os.path.abspath(store.db_path).encode('utf-8')).hexdigest()[:12]
+            scope = state_scope or 'daemon-' + '+'.join(sorted(self.schedules)) + '-' + db_key
+            self.sync_state = SyncState(default_state_path(scope), load=False)
+        self.cycles = 0
+        self.last_save_ok: Optional[bool] = None
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def _delay(self, interval: float) -> float:
+        return interval * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def due(self) -> List[ScraperPlugin]:
+        now = self.clock()
+        return [s.plugin for s in self.schedules.values() if s.next_run <= now]
+
+    def seconds_until_next(self) -> float:
+        now = self.clock()
+        return max(0.0, min(s.next_run for s in self.schedules.values()) - now)
+
+    def run_cycle(self, plugins: Optional[List[ScraperPlugin]] = None) -> bool:
+        """執行一個週期（預設為所有到期的外掛）；回傳是否成功寫入（或沒有需要寫入的資料）"""
+        plugins = self.due() if plugins is None else plugins
+        if not plugins:
+            return True
+
+        started = time.time()
+        print(f"\n⏰ [{datetime.now():%Y-%m-%d %H:%M:%S}] 週期 {self.cycles + 1}: "
+              f"{', '.join(plugin.name for plugin in plugins)}")
+        with metrics.stage('daemon.cycle'):
+            results, errors = run_plugins(plugins, self.context, max_workers=self.max_workers)
+
+            now = self.clock()
+            with self._lock:
+                for plugin in plugins:
+                    schedule = self.schedules[plugin.name]
+                    schedule.runs += 1
+                    schedule.last_run = started
+                    schedule.next_run = now + self._delay(schedule.interval)
+                    if plugin.name in results:
+                        self.results[plugin.name] = results[plugin.name]
+                        schedule.cards = len(results[plugin.name])
+                        schedule.last_error = None
+                        schedule.consecutive_failures = 0
+                    else:
+                        schedule.failures += 1
+                        schedule.consecutive_failures += 1
+                        schedule.last_error = errors.get(plugin.name)
+
+            # 依外掛順序合併，結果與單次執行相同
+            ordered = {name: self.results[name] for name in self.schedules if name in self.results}
+            cards = merge_catalog(ordered, threshold=self.match_threshold)
+            if self.output_json and cards:
+                export_catalog(self.output_json, cards, list(ordered))
+
+            saved = True
+            if self.store is not None and cards:
+                sync_state = self.sync_state
+                if len(ordered) < len(self.schedules):
+                    # 尚未成功抓取過的來源不在目錄中，增量比對會誤判為已移除
+                    print("⚠️  部分資料來源尚無結果，本次改為完整寫入（不停用任何卡片）")
+                    sync_state = None
+                saved = self.store.save(cards, sync_state=sync_state)
+
+        with self._lock:
+            self.cycles += 1
+            self.last_save_ok = saved
+        metrics.incr('daemon_cycles')
+        if errors:
+            metrics.incr('daemon_plugin_failures', len(errors))
+        print(f"💤 下一次執行: {self.seconds_until_next():.0f} 秒後")
+        return saved
+
+    def run_forever(self, stop: threading.Event):
+        """持續執行直到 stop 被設定；週期之間以 stop.wait 休眠，收到停止訊號時立即結束"""
+        print(f"🛰️  常駐模式啟動: {len(self.schedules)} 個資料來源"
+              f"（抖動 ±{self.jitter:.0%}）")
+        for name, schedule in self.schedules.items():
+            print(f"   {name:<20} 每 {schedule.interval:g} 秒")
+        while not stop.is_set():
+            try:
+                self.run_cycle()
+            except Exception as e:
+                # 單一週期的錯誤不讓常駐程序結束，下一個週期重試
+                print(f"❌ 週期執行失敗: {e}")
+                metrics.incr('daemon_cycle_errors')
+            stop.wait(self.seconds_until_next())
+        print("👋 常駐模式結束")
+
+    def status(self) -> Dict:
+        """/healthz 回傳的狀態"""
+        now = self.clock()
+        with self._lock:
+            plugins = {name: schedule.to_dict(now) for name, schedule in self.schedules.items()}
+            failing = [name for name, schedule in self.schedules.items()
+                       if schedule.consecutive_failures >= UNHEALTHY_FAILURES]
+            healthy = self.last_save_ok is not False and not failing
+            return {
+                'status': 'ok' if healthy else 'degraded',
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'cycles': self.cycles,
+                'last_save_ok': self.last_save_ok,
+                'catalog_sources': len(self.results),
+                'failing_plugins': failing,
+                'plugins': plugins,
+            }
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    scraper_daemon: ScraperDaemon = None
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/healthz':
+            status = self.scraper_daemon.status()
+            body = json.dumps(status, ensure_ascii=False, indent=2).encode('utf-8')
+            self._send(200 if status['status'] == 'ok' else 503, 'application/json; charset=utf-8', body)
+        elif path == '/metrics':
+            body = metrics.to_prometheus('scrapers').encode('utf-8')
+            self._send(200, 'text/plain; version=0.0.4; charset=utf-8', body)
+        else:
+            self._send(404, 'text/plain; charset=utf-8', b'not found\n')
+
+    def _send(self, code: int, content_type: str, body: bytes):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 不在常駐程序的輸出中記錄每個健康檢查請求
+        pass
+
+
+def start_health_server(daemon: ScraperDaemon, host: str = DEFAULT_HEALTH_HOST,
+                        port: int = DEFAULT_HEALTH_PORT) -> ThreadingHTTPServer:
+    """在背景執行緒啟動 /healthz 與 /metrics 端點，回傳 server（結束時呼叫 shutdown）"""
+    handler = type('HealthHandler', (_HealthHandler,), {'scraper_daemon': daemon})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='health', daemon=True)
+    thread.start()
+    print(f"🩺 健康檢查: http://{host}:{server.server_address[1]}/healthz ，指標: /metrics")
+    return server
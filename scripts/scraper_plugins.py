@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+資料來源外掛與執行器
+每個發卡機構／地區是一個外掛（ScraperPlugin），註冊在同一個登錄表中；
+run_plugins() 在同一個程序中並行執行選定的外掛，merge_catalog() 以卡片名稱比對索引合併結果。
+命令列（scrapers.py）與常駐模式（scraper_daemon.py）共用這個模組，
+scrapers.py 以 __main__ 執行時也只有一份登錄表。
+"""
+
+import argparse
+import copy
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from amex_scraper import AmexScraper
+from card_identity import DEFAULT_MATCH_THRESHOLD, CardIdentityIndex
+from catalog_io import is_ndjson_path, open_text, write_ndjson
+from credit_card_scraper import SUPPORTED_REGIONS, CreditCardScraper
+from crawl_frontier import DEFAULT_CRAWL_WORKERS, DEFAULT_MAX_DEPTH
+from http_cache import ResponseCache
+from http_client import HttpClient, get_default_client
+from metrics import metrics
+from models import Card, json_default, merge_benefits, to_cards
+
+
+class ScraperContext:
+    """外掛共用的資源與設定（連線池、回應快取、搜尋 API 等）"""
+
+    def __init__(self, client: Optional[HttpClient] = None, cache: Optional[ResponseCache] = None,
+                 search_url: Optional[str] = None, crawl_details: bool = False,
+                 crawl_workers: int = DEFAULT_CRAWL_WORKERS, max_depth: int = DEFAULT_MAX_DEPTH,
+                 sample_fallback: bool = True):
+        self.client = client or get_default_client()
+        self.cache = cache
+        self.search_url = search_url
+        self.crawl_details = crawl_details
+        self.crawl_workers = crawl_workers
+        self.max_depth = max_depth
+        # 來源無法取得時是否改用示例資料；常駐模式關閉，失敗的來源計入失敗次數並反映在 /healthz
+        self.sample_fallback = sample_fallback
+
+
+class ScraperPlugin:
+    """
+    資料來源外掛的共同介面
+    fetch() 回傳該來源的卡片；每張卡片都帶有 region，合併後仍可區分地區
+    """
+
+    name = ''
+    region = 'america'
+    description = ''
+
+    def fetch(self, context: ScraperContext) -> List[Card]:
+        raise NotImplementedError
+
+    def _with_region(self, cards: List[Card]) -> List[Card]:
+        for card in cards:
+            if 'region' not in card:
+                card['region'] = self.region
+        return cards
+
+
+class AmexPlugin(ScraperPlugin):
+    """American Express 官網（可選擇並行抓取卡片詳細頁）"""
+
+    name = 'amex'
+    description = 'American Express 官網卡片列表'
+
+    def fetch(self, context: ScraperContext) -> List[Card]:
+        scraper = AmexScraper(cache=context.cache, client=context.client,
+                              sample_fallback=context.sample_fallback)
+        scraper.fetch_amex_cards()
+        if context.crawl_details:
+            scraper.crawl_details(max_workers=context.crawl_workers, max_depth=context.max_depth)
+        return self._with_region(scraper.cards)
+
+
+class RegionPlugin(ScraperPlugin):
+    """單一地區的信用卡搜尋結果（CreditCardScraper）"""
+
+    def __init__(self, region: str):
+        self.name = f'region:{region}'
+        self.region = region
+        self.description = f'{region.upper()} 地區的熱門信用卡'
+
+    def fetch(self, context: ScraperContext) -> List[Card]:
+        scraper = CreditCardScraper(region=self.region, search_url=context.search_url,
+                                    cache=context.cache, client=context.client,
+                                    sample_fallback=context.sample_fallback)
+        return self._with_region(scraper.fetch_cards())
+
+
+class IssuerPlugin(ScraperPlugin):
+    """
+    單一發卡銀行的替代實作：以銀行名稱搜尋，只保留該銀行發行的卡片
+    沒有自己的網址與解析器，結果只是地區搜尋結果（未設定搜尋 API 時為地區示例資料）的子集，
+    與 region:<地區> 重複，因此預設不註冊；需要時自行 register()，
+    正式的發卡機構來源應像 AmexPlugin 一樣從官網抓取與解析
+    """
+
+    def __init__(self, name: str, bank: str, keywords: Tuple[str, ...], region: str = 'america'):
+        self.name = name
+        self.bank = bank
+        self.keywords = tuple(keyword.lower() for keyword in keywords)
+        self.region = region
+        self.description = f'{bank} 信用卡'
+
+    def fetch(self, context: ScraperContext) -> List[Card]:
+        scraper = CreditCardScraper(region=self.region, search_url=context.search_url,
+                                    cache=context.cache, client=context.client,
+                                    sample_fallback=context.sample_fallback)
+        data = scraper.search_web(f"best {self.bank} credit cards 2025")
+        cards = [card for card in to_cards(data.get('cards', [])) if self._matches(card)]
+        print(f"✅ {self.bank}: {len(cards)} 張信用卡")
+        return self._with_region(cards)
+
+    def _matches(self, card: Card) -> bool:
+        bank = f"{card.get('bank') or ''} {card.get('bankEn') or ''}".lower()
+        return any(keyword in bank for keyword in self.keywords)
+
+
+# 外掛登錄表（名稱 -> 外掛），--plugins all 依註冊順序執行
+_REGISTRY: Dict[str, ScraperPlugin] = {}
+
+
+def register(plugin: ScraperPlugin) -> ScraperPlugin:
+    if plugin.name in _REGISTRY:
+        raise ValueError(f"外掛名稱重複: {plugin.name}")
+    _REGISTRY[plugin.name] = plugin
+    return plugin
+
+
+def available_plugins() -> List[ScraperPlugin]:
+    return list(_REGISTRY.values())
+
+
+def get_plugin(name: str) -> ScraperPlugin:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"未註冊的外掛: {name}") from None
+
+
+register(AmexPlugin())
+for _region in SUPPORTED_REGIONS:
+    register(RegionPlugin(_region))
+
+
+def parse_plugins(value: str) -> List[str]:
+    """解析 --plugins 參數：all、以逗號分隔的外掛名稱，或以 region:* 選取所有地區"""
+    names: List[str] = []
+    for item in value.split(','):
+        item = item.strip().lower()
+        if not item:
+            continue
+        if item == 'all':
+            matched = list(_REGISTRY)
+        elif item.endswith('*'):
+            matched = [name for name in _REGISTRY if name.startswith(item[:-1])]
+        elif item in _REGISTRY:
+            matched = [item]
+        else:
+            matched = []
+        if not matched:
+            raise argparse.ArgumentTypeError(
+                f"不支援的外掛: {item} (可用: {', '.join(_REGISTRY)})"
+            )
+        names.extend(name for name in matched if name not in names)
+
+    if not names:
+        raise argparse.ArgumentTypeError("至少需要指定一個外掛")
+    return names
+
+
+def run_plugins(plugins: List[ScraperPlugin], context: ScraperContext,
+                max_workers: int = 4) -> Tuple[Dict[str, List[Card]], Dict[str, str]]:
+    """
+    在同一個程序中並行執行外掛
+    回傳 (外掛名稱 -> 卡片, 外掛名稱 -> 錯誤訊息)；單一外掛失敗不影響其他外掛
+    """
+    workers = max(1, min(max_workers, len(plugins)))
+    print(f"🚀 並行執行 {len(plugins)} 個資料來源 (最大並行數: {workers})")
+
+    results: Dict[str, List[Card]] = {}
+    errors: Dict[str, str] = {}
+
+    def _fetch(plugin: ScraperPlugin) -> List[Card]:
+        with metrics.stage(f"plugin.{plugin.name}"):
+            return plugin.fetch(context)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="plugin") as executor:
+        futures = {executor.submit(_fetch, plugin): plugin.name for plugin in plugins}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+                metrics.incr('plugin_cards', len(results[name]))
+            except Exception as e:
+                print(f"❌ {name} 執行失敗: {e}")
+                errors[name] = str(e)
+                metrics.incr('plugin_errors')
+
+    # 依照輸入順序回傳，讓合併結果穩定
+    ordered = {plugin.name: results[plugin.name] for plugin in plugins if plugin.name in results}
+    return ordered, errors
+
+
+def merge_catalog(results: Dict[str, List[Card]],
+                  threshold: float = DEFAULT_MATCH_THRESHOLD) -> List[Card]:
+    """
+    合併各來源的卡片：同一張卡片（名稱經模糊比對相符）只保留第一個來源的欄位，
+    其他來源的福利依 titleEn 去重後合併進來
+    傳入的卡片不會被修改（常駐模式會在週期之間重複合併同一批結果）
+    """
+    index = CardIdentityIndex(threshold)
+    merged: List[Card] = []
+    copied = set()
+    duplicates = 0
+    for cards in results.values():
+        for card in cards:
+            position = index.resolve(card['nameEn'])
+            if position is None:
+                index.add(card['nameEn'], len(merged))
+                merged.append(card)
+            else:
+                duplicates += 1
+                if position not in copied:
+                    # merge_benefits 會替換 benefits 清單，淺層複製即可
+                    merged[position] = copy.copy(merged[position])
+                    copied.add(position)
+                merge_benefits(merged[position], card.get('benefits') or [])
+    if duplicates:
+        print(f"🔗 合併 {duplicates} 張重複的卡片")
+    return merged
+
+
+def export_catalog(path: str, cards: List[Card], sources: List[str]):
+    """匯出合併後的目錄（.ndjson / .jsonl 為 NDJSON，.gz 會壓縮）"""
+    if is_ndjson_path(path):
+        count = write_ndjson(path, cards)
+        print(f"✅ NDJSON 已匯出至: {path} ({count} 張卡片)")
+        return
+
+    data = {
+        "sources": sources,
+        "generated_at": datetime.now().isoformat(),
+        "total_cards": len(cards),
+        "cards": cards
+    }
+    with open_text(path, 'w') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=json_default)
+    print(f"✅ JSON 已匯出至: {path}")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+資料來源統一執行器（命令列）
+每個發卡機構／地區是一個外掛（定義與登錄表在 scraper_plugins.py），
+在同一個程序中並行執行選定的外掛，以卡片名稱比對索引合併結果，
+再經由共用的 CardStore 一次寫入資料庫。新增發卡機構只需註冊一個外掛，
+不必在排程中再加一支依序執行的腳本。
+
+用法:
+    python scrapers.py --list
+    python scrapers.py --plugins all --display-only
+    python scrapers.py --plugins amex,region:canada --max-workers 4
+    python scrapers.py --daemon --interval 21600 --plugin-interval amex=3600
+"""
+
+import argparse
+import signal
+import sys
+import threading
+from datetime import date
+from typing import List
+
+from card_identity import DEFAULT_MATCH_THRESHOLD
+from card_store import DEFAULT_BUSY_TIMEOUT, CardStore, display_cards
+from http_cache import DEFAULT_CACHE_DIR, ResponseCache
+from http_client import configure_default_client
+from metrics import add_cli_arguments, run_instrumented
+from scraper_daemon import (
+    DEFAULT_HEALTH_HOST, DEFAULT_HEALTH_PORT, DEFAULT_INTERVAL, DEFAULT_JITTER,
+    ScraperDaemon, parse_intervals, start_health_server,
+)
+from scraper_plugins import (
+    ScraperContext, ScraperPlugin, available_plugins, export_catalog, get_plugin,
+    merge_catalog, parse_plugins, run_plugins,
+)
+from sync_state import load_state
+
+
+def main():
+    """主程式"""
+    parser = argparse.ArgumentParser(
+        description="信用卡資料來源統一執行器 - 並行執行多個發卡機構/地區外掛並寫入資料庫"
+    )
+    parser.add_argument(
+        "--plugins",
+        type=parse_plugins,
+        default="all",
+        help="要執行的外掛: all、以逗號分隔的名稱，或 region:* (預設: all)"
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="列出所有已註冊的外掛"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=4,
+        help="同時執行的外掛數 (預設: 4)"
+    )
+    parser.add_argument(
+        "--db-path",
+        type=str,
+        help="資料庫路徑（預設使用專案資料庫）"
+    )
+    parser.add_argument(
+        "--display-only",
+        action="store_true",
+        help="只顯示結果，不儲存到資料庫"
+    )
+    parser.add_argument(
+        "--fast-write",
+        action="store_true",
+        help="快速寫入：WAL、synchronous=NORMAL、較大的頁面快取，並建立缺少的查詢索引"
+    )
+    parser.add_argument(
+        "--busy-timeout",
+        type=float,
+        default=DEFAULT_BUSY_TIMEOUT,
+        help=f"資料庫被其他連線（例如後端）鎖定時的等待秒數 (預設: {DEFAULT_BUSY_TIMEOUT:g})"
+    )
+    parser.add_argument(
+        "--rejects-file",
+        type=str,
+        help="未通過檢查或寫入失敗的資料寫到這個 NDJSON 檔 (預設: scripts/.scraper_state/rejects.ndjson)"
+    )
+    parser.add_argument(
+        "--output-json",
+        type=str,
+        help="另外匯出合併後的目錄（.ndjson/.jsonl 為 NDJSON，.gz 會壓縮）"
+    )
+    parser.add_argument(
+        "--calendar-output",
+        type=str,
+        help="另外匯出福利週期行事曆（今年各週期的起訖與提醒日期，.csv 或 .ndjson/.jsonl）"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="增量同步：只寫入與上次執行（相同外掛組合）相比有變更的卡片與福利"
+    )
+    parser.add_argument(
+        "--match-threshold",
+        type=float,
+        default=DEFAULT_MATCH_THRESHOLD,
+        help=f"卡片名稱模糊比對的相似度門檻，0~1 (預設: {DEFAULT_MATCH_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--search-url",
+        type=str,
+        help="搜尋 API 網址樣板，{query} 會替換為關鍵字，回應需為 {\"cards\": [...]} 格式"
+    )
+    parser.add_argument(
+        "--crawl-details",
+        action="store_true",
+        help="amex 外掛同時並行抓取卡片詳細頁"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=2.0,
+        help="每個主機每秒最多請求數 (預設: 2)"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="遇到 429/5xx 或連線錯誤時的最大重試次數 (預設: 3)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="啟用 HTTP 回應快取並指定快取目錄"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=3600,
+        help="快取有效秒數 (預設: 3600)"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="常駐模式：依排程重複執行外掛，週期之間保留連線與快取（搭配 --incremental 時，第一個週期後只寫入變更）"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"常駐模式各外掛的抓取間隔秒數 (預設: {DEFAULT_INTERVAL})"
+    )
+    parser.add_argument(
+        "--plugin-interval",
+        type=str,
+        help="個別外掛的間隔，例如 amex=3600,region:*=86400"
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=DEFAULT_JITTER,
+        help=f"抓取間隔的隨機抖動比例 (預設: {DEFAULT_JITTER}，即 ±10%%)"
+    )
+    parser.add_argument(
+        "--health-port",
+        type=int,
+        default=DEFAULT_HEALTH_PORT,
+        help=f"常駐模式 /healthz 與 /metrics 的本機連接埠，0 表示不啟用 (預設: {DEFAULT_HEALTH_PORT})"
+    )
+    parser.add_argument(
+        "--health-host",
+        type=str,
+        default=DEFAULT_HEALTH_HOST,
+        help=f"健康檢查端點綁定的位址 (預設: {DEFAULT_HEALTH_HOST})"
+    )
+    add_cli_arguments(parser)
+
+    args = parser.parse_args()
+    if args.list:
+        for plugin in available_plugins():
+            print(f"{plugin.name:<20}{plugin.description}")
+        return
+    run_instrumented(args, 'scrapers', lambda: _run(args, parser))
+
+
+def _run(args, parser):
+    """依照命令列參數執行外掛、合併並寫入"""
+    if args.max_workers < 1:
+        parser.error("--max-workers 必須大於 0")
+    if not 0 < args.match_threshold <= 1:
+        parser.error("--match-threshold 必須介於 0 與 1 之間")
+    if args.busy_timeout < 0:
+        parser.error("--busy-timeout 不能為負數")
+    if args.rate_limit <= 0:
+        parser.error("--rate-limit 必須大於 0")
+
+    if args.daemon:
+        if args.interval <= 0:
+            parser.error("--interval 必須大於 0")
+        if not 0 <= args.jitter < 1:
+            parser.error("--jitter 必須介於 0 與 1 之間")
+        if args.health_port < 0:
+            parser.error("--health-port 不能為負數")
+
+    client = configure_default_client(rate_per_host=args.rate_limit, max_retries=args.max_retries)
+    cache_dir = args.cache_dir
+    if args.daemon and not cache_dir:
+        # 常駐模式預設啟用回應快取，過期後以條件式 GET 重新驗證，未變更的頁面不必重新下載
+        cache_dir = DEFAULT_CACHE_DIR
+    cache = ResponseCache(cache_dir, ttl=args.cache_ttl, session=client) if cache_dir else None
+    context = ScraperContext(client=client, cache=cache, search_url=args.search_url,
+                             crawl_details=args.crawl_details, sample_fallback=not args.daemon)
+
+    plugins = [get_plugin(name) for name in args.plugins]
+    if args.daemon:
+        _run_daemon(args, parser, plugins, context)
+        return
+    results, errors = run_plugins(plugins, context, max_workers=args.max_workers)
+    cards = merge_catalog(results, threshold=args.match_threshold)
+
+    display_cards(f"合併結果 - {', '.join(args.plugins)}", cards)
+
+    if args.output_json and cards:
+        export_catalog(args.output_json, cards, list(results))
+
+    if args.calendar_output and cards:
+        # 需要 NumPy，只在指定時才匯入
+        from benefit_calendar import calendar_from_cards, write_calendar
+
+        count = write_calendar(args.calendar_output, calendar_from_cards(cards, [date.today().year]))
+        print(f"✅ 福利週期行事曆已匯出至: {args.calendar_output} ({count} 個週期)")
+
+    saved = True
+    if not args.display_only:
+        sync_state = None
+        if args.incremental:
+            if errors:
+                # 失敗來源的卡片不在這次結果中，增量比對會誤判為已移除
+                print("⚠️  有資料來源失敗，本次改為完整寫入（不停用任何卡片）")
+            else:
+                sync_state = load_state('scrapers-' + '+'.join(sorted(args.plugins)))
+        store = CardStore(args.db_path, match_threshold=args.match_threshold,
+                          fast_write=args.fast_write, busy_timeout=args.busy_timeout,
+                          rejects_path=args.rejects_file)
+        saved = store.save(cards, sync_state=sync_state)
+    else:
+        print("⚠️  僅顯示模式，未儲存到資料庫")
+
+    if errors:
+        print(f"⚠️  失敗的資料來源: {', '.join(errors)}")
+    if errors or not saved:
+        sys.exit(1)
+
+
+def _run_daemon(args, parser, plugins: List[ScraperPlugin], context: ScraperContext):
+    """常駐模式：收到 SIGTERM 或 Ctrl+C 時結束目前的等待並關閉連線"""
+    try:
+        intervals = parse_intervals(args.plugin_interval or '', args.plugins)
+    except ValueError as e:
+        parser.error(str(e))
+
+    store = None
+    if not args.display_only:
+        store = CardStore(args.db_path, match_threshold=args.match_threshold,
+                          fast_write=args.fast_write, busy_timeout=args.busy_timeout,
+                          rejects_path=args.rejects_file, keep_open=True)
+    daemon = ScraperDaemon(plugins, context, store=store, interval=args.interval,
+                           jitter=args.jitter, intervals=intervals, max_workers=args.max_workers,
+                           match_threshold=args.match_threshold, output_json=args.output_json,
+                           incremental=args.incremental)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    server = start_health_server(daemon, args.health_host, args.health_port) if args.health_port else None
+    try:
+        daemon.run_forever(stop)
+    except KeyboardInterrupt:
+        print("\n⚠️  收到中斷訊號")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if store is not None:
+            store.close()
+        if context.cache is not None:
+            context.cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+串流 SQL 寫入器
+逐句產生 seed SQL 並直接寫入檔案，不在記憶體中累積整份內容；
+卡片與福利以多列 VALUES 批次輸出，福利的 cardId 每批只查詢一次。
+卡片以正規化名稱（去除商標符號與空白、ASCII 不分大小寫）比對資料庫中的既有卡片，
+已存在的卡片與福利不會重複新增
+"""
+
+import string
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from card_identity import SQL_STRIP_CHARS, sql_name_key
+
+
+DEFAULT_BATCH_SIZE = 100
+
+# 寫入 CreditCard / Benefit 的欄位
+CARD_INSERT_COLUMNS = (
+    'name', 'nameEn', 'bank', 'bankEn', 'issuer', 'region', 'description', 'descriptionEn',
+)
+BENEFIT_INSERT_COLUMNS = (
+    'category', 'categoryEn', 'title', 'titleEn', 'description', 'descriptionEn',
+    'amount', 'currency', 'frequency',
+)
+
+
+def sql_literal(value) -> str:
+    """將 Python 值轉為 SQL 字面值（字串中的單引號會跳脫）"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class SqlDialect:
+    """不同資料庫在識別字、布林值與時間函式上的差異"""
+
+    def __init__(self, name: str, quote_identifiers: bool, now: str, true: str, false: str,
+                 amount_cast: str = '', ascii_lower: str = 'LOWER({})'):
+        self.name = name
+        self.quote_identifiers = quote_identifiers
+        self.now = now
+        self.true = true
+        self.false = false
+        # Postgres 無法從全為 NULL 的 VALUES 欄位推斷數值型別
+        self.amount_cast = amount_cast
+        # 只轉換 ASCII 大小寫的運算式，與 sql_name_key 一致
+        self.ascii_lower = ascii_lower
+
+    def ident(self, name: str) -> str:
+        return f'"{name}"' if self.quote_identifiers else name
+
+    def name_key(self, column: str) -> str:
+        """
+        與 card_identity.sql_name_key 相同的正規化名稱運算式
+        非 ASCII 字母（例如 É）兩邊都保留原樣，比對鍵才會一致
+        """
+        expr = column
+        for char in SQL_STRIP_CHARS:
+            expr = f"REPLACE({expr}, {sql_literal(char)}, '')"
+        return self.ascii_lower.format(expr)
+
+
+DIALECTS = {
+    # 本機開發用的 SQLite（apps/backend/prisma/dev.db），內建 LOWER() 只轉換 ASCII
+    'sqlite': SqlDialect('sqlite', False, "datetime('now')", '1', '0'),
+    # Prisma 在 Postgres 上建立的表格名稱區分大小寫，需要加引號；
+    # Postgres 的 LOWER() 依 locale 也會轉換非 ASCII 字母，改用 TRANSLATE 只轉換 A-Z
+    'postgres': SqlDialect(
+        'postgres', True, 'NOW()', 'TRUE', 'FALSE', '::double precision',
+        ascii_lower=f"TRANSLATE({{}}, '{string.ascii_uppercase}', '{string.ascii_lowercase}')",
+    ),
+}
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class SeedSqlWriter:
+    """產生 seed SQL 語句（皆為 generator，可直接串流寫入檔案）"""
+
+    def __init__(self, region: str, batch_size: int = DEFAULT_BATCH_SIZE, dialect: str = 'sqlite'):
+        if batch_size < 1:
+            raise ValueError("batch_size 必須大於 0")
+        self.region = region
+        self.batch_size = batch_size
+        self.dialect = DIALECTS[dialect]
+
+    def write(self, fh: TextIO, statements: Iterable[str]) -> int:
+        """將語句逐句寫入檔案，回傳寫入的語句數"""
+        count = 0
+        for statement in statements:
+            fh.write(statement)
+            count += 1
+        return count
+
+    def iter_card_inserts(self, cards: Iterable[Dict]) -> Iterator[str]:
+        """
+        每批卡片輸出一句多列 INSERT，接著輸出該批卡片的福利
+        正規化名稱相同的卡片只新增第一張，其餘卡片的福利歸入同一張卡片
+        """
+        seen = set()
+        duplicates: List[Dict] = []
+
+        def _unique() -> Iterator[Dict]:
+            for card in cards:
+                key = sql_name_key(card['nameEn'])
+                if key in seen:
+                    duplicates.append(card)
+                    continue
+                seen.add(key)
+                yield card
+
+        for chunk in _chunks(_unique(), self.batch_size):
+            yield self._card_insert(chunk)
+            benefits = [
+                (card['nameEn'], benefit)
+                for card in chunk
+                for benefit in card.get('benefits', [])
+            ]
+            yield from self.iter_benefit_inserts(benefits)
+        yield from self.iter_benefit_inserts(
+            (card['nameEn'], benefit) for card in duplicates for benefit in card.get('benefits', [])
+        )
+
+    def iter_benefit_inserts(self, benefits: Iterable[Tuple[str, Dict]]) -> Iterator[str]:
+        """benefits 為 (卡片 nameEn, 福利) 的序列"""
+        for chunk in _chunks(benefits, self.batch_size):
+            yield self._benefit_insert(chunk)
+
+    def card_update(self, card: Dict) -> str:
+        d = self.dialect
+        assignments = ',\n'.join(
+            f"  {d.ident(col)} = {self._card_value(card, col)}"
+            for col in CARD_INSERT_COLUMNS if col != 'nameEn'
+        )
+        return (
+            f"UPDATE {d.ident('CreditCard')} SET\n{assignments},\n"
+            f"  {d.ident('isActive')} = {d.true},\n"
+            f"  {d.ident('updatedAt')} = {d.now}\n"
+            f"WHERE {self._name_match(card['nameEn'])};\n\n"
+        )
+
+    def benefit_update(self, name_en: str, benefit: Dict) -> str:
+        d = self.dialect
+        assignments = ',\n'.join(
+            f"  {d.ident(col)} = {sql_literal(benefit[col])}"
+            for col in BENEFIT_INSERT_COLUMNS if col != 'titleEn'
+        )
+        return (
+            f"UPDATE {d.ident('Benefit')} SET\n{assignments},\n"
+            f"  {d.ident('isActive')} = {d.true},\n"
+            f"  {d.ident('updatedAt')} = {d.now}\n"
+            f"WHERE {d.ident('titleEn')} = {sql_literal(benefit['titleEn'])} "
+            f"AND {d.ident('cardId')} IN (SELECT {d.ident('id')} FROM {d.ident('CreditCard')} "
+            f"WHERE {self._name_match(name_en)});\n\n"
+        )
+
+    def iter_deactivations(self, removed_cards: Iterable[str],
+                           removed_benefits: Iterable[Tuple[str, str]]) -> Iterator[str]:
+        """將已移除的卡片與福利設為停用（批次 IN 清單）"""
+        d = self.dialect
+        name_key = d.name_key(d.ident('nameEn'))
+        for chunk in _chunks(removed_cards, self.batch_size):
+            keys = ', '.join(sql_literal(sql_name_key(name_en)) for name_en in chunk)
+            yield (
+                f"UPDATE {d.ident('CreditCard')} SET {d.ident('isActive')} = {d.false}, "
+                f"{d.ident('updatedAt')} = {d.now}\n"
+                f"WHERE {name_key} IN ({keys});\n\n"
+            )
+        for name_en, title_en in removed_benefits:
+            yield (
+                f"UPDATE {d.ident('Benefit')} SET {d.ident('isActive')} = {d.false}, "
+                f"{d.ident('updatedAt')} = {d.now}\n"
+                f"WHERE {d.ident('titleEn')} = {sql_literal(title_en)} "
+                f"AND {d.ident('cardId')} IN (SELECT {d.ident('id')} FROM {d.ident('CreditCard')} "
+                f"WHERE {self._name_match(name_en)});\n\n"
+            )
+
+    def _name_match(self, name_en: str) -> str:
+        """以正規化名稱比對 CreditCard.nameEn 的條件"""
+        d = self.dialect
+        return f"{d.name_key(d.ident('nameEn'))} = {sql_literal(sql_name_key(name_en))}"
+
+    def _card_value(self, card: Dict, col: str) -> str:
+        if col == 'region':
+            return sql_literal(card.get('region', self.region))
+        return sql_literal(card[col])
+
+    def _card_insert(self, cards: List[Dict]) -> str:
+        """
+        卡片以 VALUES 子查詢批次輸出，第一欄為正規化名稱；
+        資料庫中已有相同正規化名稱的卡片不會重複新增
+        """
+        d = self.dialect
+        columns = ', '.join(d.ident(col) for col in CARD_INSERT_COLUMNS)
+        rows = ',\n'.join(
+            '  (' + ', '.join(
+                [sql_literal(sql_name_key(card['nameEn']))]
+                + [self._card_value(card, col) for col in CARD_INSERT_COLUMNS]
+            ) + ')'
+            for card in cards
+        )
+        selected = ', '.join(f"v.column{i}" for i in range(2, len(CARD_INSERT_COLUMNS) + 2))
+        header = ''.join(f"-- {card['nameEn']}\n" for card in cards)
+        return (
+            f"{header}INSERT INTO {d.ident('CreditCard')} ({columns}, "
+            f"{d.ident('isActive')}, {d.ident('createdAt')}, {d.ident('updatedAt')})\n"
+            f"SELECT {selected}, {d.true}, {d.now}, {d.now}\n"
+            f"FROM (VALUES\n{rows}\n) AS v\n"
+            f"WHERE NOT EXISTS (SELECT 1 FROM {d.ident('CreditCard')} AS c "
+            f"WHERE {d.name_key('c.' + d.ident('nameEn'))} = v.column1);\n\n"
+        )
+
+    def _benefit_insert(self, benefits: List[Tuple[str, Dict]]) -> str:
+        """
+        福利以 VALUES 子查詢批次輸出，cardId 以「每個正規化名稱取最新 id」的
+        分組查詢一次解析，而不是每列各自執行子查詢；該卡片已有相同 titleEn 的福利時不重複新增
+        """
+        d = self.dialect
+        columns = ', '.join(d.ident(col) for col in BENEFIT_INSERT_COLUMNS)
+        rows = ',\n'.join(
+            '  (' + ', '.join(
+                [sql_literal(sql_name_key(name_en))]
+                + [sql_literal(benefit[col]) for col in BENEFIT_INSERT_COLUMNS]
+            ) + ')'
+            for name_en, benefit in benefits
+        )
+        # VALUES 的欄位名稱在 SQLite 與 Postgres 都是 column1, column2, ...
+        selected = []
+        for i, col in enumerate(BENEFIT_INSERT_COLUMNS, start=2):
+            cast = d.amount_cast if col == 'amount' else ''
+            selected.append(f"v.column{i}{cast}")
+        title_column = f"v.column{BENEFIT_INSERT_COLUMNS.index('titleEn') + 2}"
+        name_key = d.name_key(d.ident('nameEn'))
+        keys = ', '.join(sorted({sql_literal(sql_name_key(name_en)) for name_en, _ in benefits}))
+        return (
+            f"INSERT INTO {d.ident('Benefit')} ({d.ident('cardId')}, {columns}, "
+            f"{d.ident('endMonth')}, {d.ident('endDay')}, {d.ident('reminderDays')}, "
+            f"{d.ident('isActive')}, {d.ident('createdAt')}, {d.ident('updatedAt')})\n"
+            f"SELECT c.id, {', '.join(selected)}, 12, 31, 30, {d.true}, {d.now}, {d.now}\n"
+            f"FROM (VALUES\n{rows}\n) AS v\n"
+            f"JOIN (SELECT {name_key} AS name_key, MAX({d.ident('id')}) AS id "
+            f"FROM {d.ident('CreditCard')} WHERE {name_key} IN ({keys}) "
+            f"GROUP BY name_key) AS c ON c.name_key = v.column1\n"
+            f"WHERE NOT EXISTS (SELECT 1 FROM {d.ident('Benefit')} AS b "
+            f"WHERE b.{d.ident('cardId')} = c.id AND b.{d.ident('titleEn')} = {title_column});\n\n"
+        )
+
+
+def header_lines(region: str, generated_at: str, note: Optional[str] = None) -> str:
+    lines = f"-- Credit Cards for {region.upper()}\n-- Generated at {generated_at}\n"
+    if note:
+        lines += f"-- {note}\n"
+    return lines + "\n"
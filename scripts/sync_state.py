@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+增量同步狀態
+為每張卡片與每個福利計算內容指紋，並與上一次執行的指紋比對，
+只回報新增、修改或移除的資料，讓重複執行時幾乎不需要寫入資料庫
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+STATE_VERSION = 1
+
+# 預設狀態檔目錄（每個資料來源一個檔案）
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.scraper_state')
+
+# 尚未確認套用的狀態檔放在 SQL 檔旁，檔名為 SQL 檔名加上此後綴
+PENDING_SUFFIX = '.state.json'
+
+
+def fingerprint(record: Dict, exclude: Tuple[str, ...] = ('benefits',)) -> str:
+    """
+    計算記錄的穩定內容指紋
+    以排序後的 JSON 序列化，鍵的順序不影響結果
+    """
+    payload = {k: v for k, v in record.items() if k not in exclude}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def default_state_path(scope: str) -> str:
+    """依資料來源名稱取得預設狀態檔路徑，例如 amex、region-america"""
+    safe_scope = ''.join(c if c.isalnum() or c in '-_' else '-' for c in scope)
+    return os.path.join(DEFAULT_STATE_DIR, f"{safe_scope}.json")
+
+
+def pending_state_path(sql_path: str) -> str:
+    """SQL 檔對應的待確認狀態檔路徑，例如 seed-america-cards.sql.state.json"""
+    return f"{sql_path}{PENDING_SUFFIX}"
+
+
+class SyncDiff:
+    """一次比對的結果"""
+
+    def __init__(self):
+        # 卡片層級：新增/內容修改/未變更/已移除
+        self.inserted_cards: List[Dict] = []
+        self.modified_cards: List[Dict] = []
+        self.unchanged_cards: List[Dict] = []
+        self.removed_cards: List[str] = []
+
+        # 福利層級：(卡片, 福利) 或 (nameEn, titleEn)
+        self.inserted_benefits: List[Tuple[Dict, Dict]] = []
+        self.modified_benefits: List[Tuple[Dict, Dict]] = []
+        self.removed_benefits: List[Tuple[str, str]] = []
+
+        # 以模糊比對對應到既有卡片時，資料庫中的 nameEn 與來源的寫法不同：nameEn -> 資料庫名稱
+        self.db_names: Dict[str, str] = {}
+
+    def db_name(self, name_en: str) -> str:
+        """卡片在資料庫中的 nameEn（停用已移除的資料時以此比對）"""
+        return self.db_names.get(name_en, name_en)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(
+            self.inserted_cards or self.modified_cards or self.removed_cards
+            or self.inserted_benefits or self.modified_benefits or self.removed_benefits
+        )
+
+    def changed_cards(self) -> List[Dict]:
+        """
+        需要寫入的卡片，福利只保留新增或修改的項目
+        卡片本身未變更、但有福利異動的卡片也會包含在內
+        """
+        changed_benefits: Dict[str, List[Dict]] = {}
+        for card, benefit in self.inserted_benefits + self.modified_benefits:
+            changed_benefits.setdefault(card['nameEn'], []).append(benefit)
+
+        card_changes = {id(card) for card in self.inserted_cards + self.modified_cards}
+        result = []
+        for card in self.inserted_cards + self.modified_cards + self.unchanged_cards:
+            name_en = card['nameEn']
+            if id(card) not in card_changes and name_en not in changed_benefits:
+                continue
+            subset = dict(card)
+            subset['benefits'] = changed_benefits.get(name_en, [])
+            result.append(subset)
+        return result
+
+    def summary(self) -> str:
+        return (
+            f"卡片 +{len(self.inserted_cards)} ~{len(self.modified_cards)} "
+            f"-{len(self.removed_cards)} (未變更 {len(self.unchanged_cards)})，"
+            f"福利 +{len(self.inserted_benefits)} ~{len(self.modified_benefits)} "
+            f"-{len(self.removed_benefits)}"
+        )
+
+
+class SyncState:
+    """
+    上一次執行的指紋狀態（本機 JSON 狀態檔）
+    格式: {"cards": {nameEn: {"fingerprint": ..., "benefits": {titleEn: ...}, "dbName": ...}}}
+    dbName 只在資料庫中的名稱與 nameEn 不同時記錄
+    """
+
+    def __init__(self, path: str, load: bool = True):
+        """load=False 時不讀取既有狀態檔，從空狀態開始（第一次儲存時覆寫）"""
+        self.path = path
+        self.cards: Dict[str, Dict] = {}
+        if load:
+            self.load()
+
+    def load(self):
+        """讀取狀態檔，不存在或版本不符時視為第一次執行"""
+        if not os.path.exists(self.path):
+            self.cards = {}
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if data.get('version') != STATE_VERSION:
+            print(f"⚠️  狀態檔版本不符，將進行完整同步: {self.path}")
+            self.cards = {}
+            return
+
+        self.cards = data.get('cards', {})
+
+    def save(self):
+        """以暫存檔 + rename 寫入，避免中斷時留下損壞的狀態檔"""
+        self._write(self.path)
+
+    def _write(self, path: str, **extra):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        data = {
+            'version': STATE_VERSION,
+            'updated_at': datetime.now().isoformat(),
+            'cards': self.cards,
+            **extra,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def diff(self, cards: List[Dict]) -> SyncDiff:
+        """將本次資料與上一次的指紋比對"""
+        result = SyncDiff()
+        seen_cards = set()
+
+        for card in cards:
+            name_en = card['nameEn']
+            seen_cards.add(name_en)
+            previous = self.cards.get(name_en)
+
+            if previous is None:
+                result.inserted_cards.append(card)
+                for benefit in card.get('benefits', []):
+                    result.inserted_benefits.append((card, benefit))
+                continue
+
+            if previous['fingerprint'] != fingerprint(card):
+                result.modified_cards.append(card)
+            else:
+                result.unchanged_cards.append(card)
+
+            previous_benefits = previous.get('benefits', {})
+            seen_benefits = set()
+            for benefit in card.get('benefits', []):
+                title_en = benefit['titleEn']
+                seen_benefits.add(title_en)
+                previous_fp = previous_benefits.get(title_en)
+                if previous_fp is None:
+                    result.inserted_benefits.append((card, benefit))
+                elif previous_fp != fingerprint(benefit):
+                    result.modified_benefits.append((card, benefit))
+
+            for title_en in previous_benefits:
+                if title_en not in seen_benefits:
+                    result.removed_benefits.append((name_en, title_en))
+
+        for name_en, previous in self.cards.items():
+            if name_en not in seen_cards:
+                result.removed_cards.append(name_en)
+            if previous.get('dbName'):
+                result.db_names[name_en] = previous['dbName']
+
+        return result
+
+    def commit(self, cards: List[Dict], db_names: Optional[Dict[str, str]] = None):
+        """
+        資料成功寫入後，以本次的資料更新指紋並儲存
+        db_names 為本次寫入時 nameEn -> 資料庫名稱的對應；未寫入的卡片沿用上次記錄的名稱
+        """
+        self._update(cards, db_names)
+        self.save()
+
+    def stage(self, cards: List[Dict], pending_path: str):
+        """
+        輸出增量 SQL 檔時使用：新的指紋先寫到 SQL 檔旁的待確認狀態檔，正式狀態檔不變
+        SQL 確認套用後再以 promote_pending 取代正式狀態檔；
+        未套用就重新產生時，仍以上次確認的狀態比對，新的 SQL 會包含尚未套用的異動
+        """
+        self._update(cards)
+        self._write(pending_path, target=os.path.abspath(self.path))
+
+    def _update(self, cards: List[Dict], db_names: Optional[Dict[str, str]] = None):
+        db_names = db_names or {}
+        previous = self.cards
+        self.cards = {}
+        for card in cards:
+            name_en = card['nameEn']
+            entry = {
+                'fingerprint': fingerprint(card),
+                'benefits': {
+                    benefit['titleEn']: fingerprint(benefit)
+                    for benefit in card.get('benefits', [])
+                },
+            }
+            db_name = db_names.get(name_en) or previous.get(name_en, {}).get('dbName')
+            if db_name and db_name != name_en:
+                entry['dbName'] = db_name
+            self.cards[name_en] = entry
+
+
+def load_state(scope: str, path: Optional[str] = None) -> SyncState:
+    """載入指定資料來源的同步狀態"""
+    return SyncState(path or default_state_path(scope))
+
+
+def promote_pending(pending_path: str) -> str:
+    """
+    SQL 檔確認套用後，以其待確認狀態檔取代正式狀態檔並刪除待確認檔
+    回傳更新的正式狀態檔路徑
+    """
+    with open(pending_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != STATE_VERSION:
+        raise ValueError(f"待確認狀態檔版本不符: {pending_path}")
+
+    state = SyncState(data['target'])
+    state.cards = data.get('cards', {})
+    state.save()
+    os.remove(pending_path)
+    return state.path
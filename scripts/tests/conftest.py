@@ -0,0 +1,15 @@
+"""
+測試共用設定
+scripts 下的模組以同層匯入（例如 from http_cache import ResponseCache），
+測試時把 scripts 與 scripts/benchmarks 加入匯入路徑
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(TESTS_DIR)
+
+for path in (SCRIPTS_DIR, os.path.join(SCRIPTS_DIR, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,74 @@
+"""CardIdentityIndex：寫法不同的名稱對應到同一張卡片，型號與數字不同的卡片不會誤判"""
+
+import pytest
+
+from card_identity import CardIdentityIndex, identity_key
+
+
+@pytest.fixture
+def index():
+    index = CardIdentityIndex(threshold=0.85)
+    for name in ('Capital One Venture Rewards Credit Card', 'Capital One Venture X Rewards Credit Card',
+                 'Citi Double Cash Card', 'Chase Sapphire Preferred Card',
+                 'Delta SkyMiles Gold Card 2', 'The Platinum Card from American Express'):
+        index.add(name)
+    return index
+
+
+@pytest.mark.parametrize('name, expected', [
+    # 商標符號、大小寫、字詞順序與通用字不影響身分鍵
+    ('Citi® Double Cash® Card', 'Citi Double Cash Card'),
+    ('CHASE SAPPHIRE PREFERRED(R) CARD', 'Chase Sapphire Preferred Card'),
+    ('American Express Platinum Card', 'The Platinum Card from American Express'),
+])
+def test_exact_identity_key_match(index, name, expected):
+    assert index.match(name) == (expected, 1.0)
+
+
+def test_fuzzy_match_above_threshold(index):
+    found = index.match('Chase Sapphire Preferrred Card')
+    assert found is not None
+    value, score = found
+    assert value == 'Chase Sapphire Preferred Card'
+    assert 0.85 <= score < 1.0
+
+
+@pytest.mark.parametrize('name, expected', [
+    # 一、兩個字元的型號與數字必須完全相同
+    ('Capital One Venture X Rewards', 'Capital One Venture X Rewards Credit Card'),
+    ('Capital One Venture Rewards', 'Capital One Venture Rewards Credit Card'),
+    ('Capital One Venture X Rewardss Card', 'Capital One Venture X Rewards Credit Card'),
+    ('Capital One Venture Rewardss Card', 'Capital One Venture Rewards Credit Card'),
+])
+def test_guard_tokens_separate_models(index, name, expected):
+    assert index.resolve(name) == expected
+
+
+@pytest.mark.parametrize('name', [
+    'Delta SkyMiles Gold Card 3',
+    'Delta SkyMiles Gold Card',
+    'Citi Double Cash Card X',
+])
+def test_guard_tokens_block_fuzzy_match(index, name):
+    assert index.match(name) is None
+
+
+def test_first_name_per_identity_key_wins():
+    index = CardIdentityIndex()
+    index.add('Citi Double Cash Card', 1)
+    index.add('Citi® Double Cash', 2)
+
+    assert len(index) == 1
+    assert index.resolve('citi double cash') == 1
+    assert identity_key('Citi® Double Cash') == identity_key('Citi Double Cash Card')
+
+
+def test_unrelated_name_has_no_match(index):
+    assert index.match('Wells Fargo Active Cash') is None
+    assert index.match('®™') is None
+
+
+@pytest.mark.parametrize('threshold', [0, -0.5, 1.5])
+def test_threshold_must_be_between_zero_and_one(threshold):
+    with pytest.raises(ValueError):
+        CardIdentityIndex(threshold)
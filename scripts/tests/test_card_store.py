@@ -0,0 +1,179 @@
+"""CardStore：新增/更新/未變更的筆數、單張卡片寫入失敗的隔離、拒絕檔內容與增量同步的停用"""
+
+import copy
+import json
+import sqlite3
+
+import pytest
+
+import synthetic
+from card_store import CardStore
+from sync_state import SyncState
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'cards.db')
+    synthetic.create_schema(path)
+    return path
+
+
+@pytest.fixture
+def rejects_path(tmp_path):
+    return str(tmp_path / 'rejects.ndjson')
+
+
+def read_rejects(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def table_count(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_save_counts_inserted_updated_and_unchanged(db_path, rejects_path):
+    store = CardStore(db_path, rejects_path=rejects_path)
+    cards = synthetic.make_cards(5, 3)
+
+    assert store.save(cards)
+    stats = store.last_save_stats
+    assert (stats['cards_inserted'], stats['cards_updated'], stats['cards_unchanged']) == (5, 0, 0)
+    assert (stats['benefits_inserted'], stats['benefits_updated'], stats['benefits_unchanged']) == (15, 0, 0)
+
+    assert store.save(cards)
+    stats = store.last_save_stats
+    assert (stats['cards_inserted'], stats['cards_updated'], stats['cards_unchanged']) == (0, 0, 5)
+    assert (stats['benefits_inserted'], stats['benefits_updated'], stats['benefits_unchanged']) == (0, 0, 15)
+
+    changed = copy.deepcopy(cards)
+    changed[0]['description'] = 'updated description'
+    changed[1]['benefits'][0]['amount'] = 999
+    changed[2]['benefits'].append(dict(changed[2]['benefits'][0], titleEn='New Benefit', title='新福利'))
+    assert store.save(changed)
+    stats = store.last_save_stats
+    assert (stats['cards_inserted'], stats['cards_updated'], stats['cards_unchanged']) == (0, 1, 4)
+    assert (stats['benefits_inserted'], stats['benefits_updated'], stats['benefits_unchanged']) == (1, 1, 14)
+
+    assert table_count(db_path, "SELECT COUNT(*) FROM CreditCard") == 5
+    assert table_count(db_path, "SELECT COUNT(*) FROM Benefit") == 16
+    assert store.last_rejects == []
+
+
+def test_write_failure_rolls_back_only_the_failing_card(db_path, rejects_path):
+    cards = synthetic.make_cards(4, 2)
+    bad_name = cards[2]['nameEn']
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"""
+        CREATE TRIGGER reject_bad_card BEFORE INSERT ON CreditCard
+        WHEN NEW.nameEn = '{bad_name}'
+        BEGIN SELECT RAISE(ABORT, 'bad card'); END
+    """)
+    conn.commit()
+    conn.close()
+
+    store = CardStore(db_path, rejects_path=rejects_path)
+    assert store.save(cards)
+
+    stats = store.last_save_stats
+    assert stats['cards_inserted'] == 3
+    assert stats['benefits_inserted'] == 6
+    assert stats['cards_rejected'] == 1
+    # 失敗卡片的福利隨 SAVEPOINT 一併回復，其他卡片照常寫入
+    assert table_count(db_path, "SELECT COUNT(*) FROM CreditCard") == 3
+    assert table_count(db_path, f"SELECT COUNT(*) FROM CreditCard WHERE nameEn = '{bad_name}'") == 0
+    assert table_count(db_path, "SELECT COUNT(*) FROM Benefit") == 6
+
+    rejects = read_rejects(rejects_path)
+    assert len(rejects) == 1
+    assert rejects[0]['kind'] == 'card'
+    assert rejects[0]['stage'] == 'write'
+    assert rejects[0]['card'] == bad_name
+    assert 'bad card' in rejects[0]['reason']
+    assert rejects[0]['record']['nameEn'] == bad_name
+    assert rejects[0]['rejected_at']
+
+
+def test_invalid_records_are_written_to_rejects_file(db_path, rejects_path):
+    cards = synthetic.make_cards(3, 2)
+    cards[0]['bank'] = ''
+    cards[1]['benefits'][1]['endMonth'] = 13
+
+    store = CardStore(db_path, rejects_path=rejects_path)
+    assert store.save(cards)
+
+    stats = store.last_save_stats
+    assert stats['cards_inserted'] == 2
+    assert stats['benefits_inserted'] == 3
+    assert (stats['cards_rejected'], stats['benefits_rejected']) == (1, 1)
+
+    rejects = read_rejects(rejects_path)
+    assert [(r['kind'], r['stage'], r['card']) for r in rejects] == [
+        ('card', 'validate', cards[0]['nameEn']),
+        ('benefit', 'validate', cards[1]['nameEn']),
+    ]
+    assert 'bank' in rejects[0]['reason']
+    assert 'endMonth' in rejects[1]['reason']
+    assert rejects[1]['record']['titleEn'] == cards[1]['benefits'][1]['titleEn']
+    assert all(r['rejected_at'] for r in rejects)
+
+    # 拒絕檔以附加方式寫入，下次執行的拒絕資料接在後面
+    assert store.save(cards)
+    assert len(read_rejects(rejects_path)) == 4
+
+
+def test_incremental_save_deactivates_fuzzy_matched_card_by_database_name(db_path, rejects_path,
+                                                                          tmp_path):
+    stored, other = synthetic.make_cards(2, 2)
+    stored['nameEn'] = 'Citi Double Cash Card'
+    store = CardStore(db_path, rejects_path=rejects_path)
+    assert store.save([stored, other])
+
+    # 來源的寫法不同，模糊比對到資料庫中的卡片
+    state = SyncState(str(tmp_path / 'state.json'))
+    renamed = dict(copy.deepcopy(stored), nameEn='Citi® Double Cash Card')
+    assert store.save([renamed, other], sync_state=state)
+    assert table_count(db_path, "SELECT COUNT(*) FROM CreditCard") == 2
+    assert state.cards['Citi® Double Cash Card']['dbName'] == 'Citi Double Cash Card'
+
+    # 只移除一個福利
+    trimmed = dict(renamed, benefits=renamed['benefits'][:1])
+    assert store.save([trimmed, other], sync_state=state)
+    assert store.last_save_stats['benefits_deactivated'] == 1
+
+    # 卡片消失：以資料庫中的名稱停用，統計為實際停用的筆數
+    assert store.save([other], sync_state=state)
+    assert store.last_save_stats['cards_deactivated'] == 1
+    assert table_count(
+        db_path, "SELECT isActive FROM CreditCard WHERE nameEn = 'Citi Double Cash Card'"
+    ) == 0
+    assert table_count(
+        db_path,
+        "SELECT COUNT(*) FROM Benefit b JOIN CreditCard c ON c.id = b.cardId "
+        "WHERE c.nameEn = 'Citi Double Cash Card' AND b.isActive = 1"
+    ) == 1
+
+
+def test_warm_store_preloads_only_the_current_batch(db_path, rejects_path):
+    cards = synthetic.make_cards(30, 2)
+    store = CardStore(db_path, rejects_path=rejects_path)
+    assert store.save(cards[:20])
+
+    statements = []
+    with store.warm():
+        assert store.save(cards[20:25])
+        store._conn.set_trace_callback(statements.append)
+        assert store.save(cards[25:] + cards[:2])
+        stats = store.last_save_stats
+    assert store._conn is None
+
+    assert (stats['cards_inserted'], stats['cards_unchanged']) == (5, 2)
+    # 第二批不再讀取整個資料表，只以 IN 清單查詢本批的卡片與福利
+    reads = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+    assert reads
+    assert not [sql for sql in reads if 'IN (' not in sql and 'MAX(id)' not in sql and 'id >' not in sql]
+    assert table_count(db_path, "SELECT COUNT(*) FROM CreditCard") == 30
@@ -0,0 +1,51 @@
+"""CrawlFrontier：單一網頁抓取或擷取連結失敗時記錄並繼續爬取"""
+
+from crawl_frontier import CrawlFrontier
+from metrics import metrics
+
+
+PAGES = {
+    'http://example.com/a': ['http://example.com/a/1', 'http://example.com/a/2'],
+    'http://example.com/b': ['http://example.com/b/1'],
+    'http://example.com/c': [],
+}
+
+
+def fetch(url):
+    if url == 'http://example.com/a/2':
+        raise ConnectionError('connection reset')
+    return url.encode()
+
+
+def extract_links(url, content, tag):
+    if url == 'http://example.com/b':
+        raise ValueError('broken markup')
+    return PAGES.get(url, [])
+
+
+def test_failures_are_recorded_and_crawl_continues():
+    metrics.reset()
+    frontier = CrawlFrontier(fetch, extract_links, max_workers=2, max_depth=1)
+    seeds = [(url, url[-1]) for url in PAGES]
+
+    results = {url: (depth, tag) for url, depth, tag, _ in frontier.crawl(seeds)}
+
+    # b 擷取連結失敗仍回傳頁面內容，只是不再排入它的連結；a/2 抓取失敗
+    assert results == {
+        'http://example.com/a': (0, 'a'),
+        'http://example.com/b': (0, 'b'),
+        'http://example.com/c': (0, 'c'),
+        'http://example.com/a/1': (1, 'a'),
+    }
+    assert frontier.stats['errors'] == 1
+    assert frontier.stats['extract_errors'] == 1
+    assert sorted((url, stage) for url, stage, _ in frontier.failures) == [
+        ('http://example.com/a/2', 'fetch'),
+        ('http://example.com/b', 'extract'),
+    ]
+
+    frontier.record_failure('http://example.com/c', 'parse', ValueError('no benefits'))
+    assert frontier.stats['parse_errors'] == 1
+    assert frontier.failures[-1] == ('http://example.com/c', 'parse', 'no benefits')
+    assert (metrics.counters['crawl_fetch_errors'], metrics.counters['crawl_extract_errors'],
+            metrics.counters['crawl_parse_errors']) == (1, 1, 1)
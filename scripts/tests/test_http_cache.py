@@ -0,0 +1,176 @@
+"""ResponseCache：TTL 命中、ETag 304 重新驗證、解析結果沿用與 LRU 淘汰"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_cache import ResponseCache
+from http_client import HttpClient
+
+
+class FakeSite:
+    """本機 HTTP 伺服器：路徑 -> (內容, ETag)，記錄每個請求的條件式標頭與回應狀態"""
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body, etag = site.pages[self.path]
+                if_none_match = self.headers.get('If-None-Match')
+                status = 304 if etag and if_none_match == etag else 200
+                site.requests.append((self.path, if_none_match, status))
+                self.send_response(status)
+                if etag:
+                    self.send_header('ETag', etag)
+                if status == 304:
+                    self.end_headers()
+                    return
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path: str) -> str:
+        return f'http://127.0.0.1:{self.server.server_address[1]}{path}'
+
+    def statuses(self, path: str):
+        return [status for request_path, _, status in self.requests if request_path == path]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def site():
+    site = FakeSite()
+    yield site
+    site.close()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def make_cache(tmp_path, clock):
+    caches = []
+
+    def make(**kwargs):
+        client = HttpClient(rate_per_host=1000, burst=1000, max_retries=0)
+        cache = ResponseCache(str(tmp_path / 'cache'), session=client, clock=clock, **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_ttl_hit_skips_request(site, clock, make_cache):
+    site.pages['/cards'] = (b'<html>v1</html>', '"v1"')
+    cache = make_cache(ttl=60)
+
+    first = cache.get(site.url('/cards'))
+    clock.now += 30
+    second = cache.get(site.url('/cards'))
+
+    assert not first.from_cache and not first.not_modified
+    assert second.from_cache and second.not_modified
+    assert second.content == b'<html>v1</html>'
+    assert site.statuses('/cards') == [200]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_entry_revalidates_with_etag(site, clock, make_cache):
+    site.pages['/cards'] = (b'<html>v1</html>', '"v1"')
+    cache = make_cache(ttl=60)
+
+    cache.get(site.url('/cards'))
+    clock.now += 61
+    response = cache.get(site.url('/cards'))
+
+    assert site.requests[-1] == ('/cards', '"v1"', 304)
+    assert response.from_cache and response.not_modified
+    assert response.content == b'<html>v1</html>'
+    assert cache.revalidated == 1
+
+    # 304 會重設有效期限，期限內不再發出請求
+    clock.now += 30
+    cache.get(site.url('/cards'))
+    assert site.statuses('/cards') == [200, 304]
+
+
+def test_derived_result_reused_until_content_changes(site, clock, make_cache):
+    site.pages['/cards'] = (b'<html>v1</html>', '"v1"')
+    cache = make_cache(ttl=60)
+    url = site.url('/cards')
+
+    cache.get(url)
+    cache.store_derived(url, 'cards:v1', [{'name': 'Gold Card'}])
+    clock.now += 61
+    assert cache.get(url).not_modified
+    assert cache.load_derived(url, 'cards:v1') == [{'name': 'Gold Card'}]
+    assert cache.load_derived(url, 'cards:v2') is None
+
+    site.pages['/cards'] = (b'<html>v2</html>', '"v2"')
+    clock.now += 61
+    response = cache.get(url)
+    assert site.requests[-1] == ('/cards', '"v1"', 200)
+    assert not response.not_modified
+    assert cache.load_derived(url, 'cards:v1') is None
+
+
+def test_unchanged_body_without_etag_keeps_derived_result(site, clock, make_cache):
+    site.pages['/plain'] = (b'<html>same</html>', None)
+    cache = make_cache(ttl=60)
+    url = site.url('/plain')
+
+    cache.get(url)
+    cache.store_derived(url, 'cards:v1', ['Gold Card'])
+    clock.now += 61
+    response = cache.get(url)
+
+    assert site.statuses('/plain') == [200, 200]
+    assert response.not_modified and not response.from_cache
+    assert cache.load_derived(url, 'cards:v1') == ['Gold Card']
+
+
+def test_lru_eviction_drops_least_recently_accessed(site, clock, make_cache):
+    for name in ('a', 'b', 'c'):
+        site.pages[f'/{name}'] = (name.encode() * 100, None)
+    cache = make_cache(ttl=3600, max_bytes=250)
+
+    cache.get(site.url('/a'))
+    clock.now += 1
+    cache.get(site.url('/b'))
+    clock.now += 1
+    cache.get(site.url('/a'))  # TTL 內命中，更新 a 的存取時間
+    clock.now += 1
+    cache.get(site.url('/c'))
+
+    assert cache.total_size() == 200
+    cache.get(site.url('/a'))
+    cache.get(site.url('/b'))
+    assert site.statuses('/a') == [200]
+    assert site.statuses('/b') == [200, 200]
@@ -0,0 +1,39 @@
+"""HttpClient / TokenBucket：限速參數檢查與等待時間"""
+
+import pytest
+
+from http_client import HttpClient, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.mark.parametrize('rate', [0, -1])
+def test_non_positive_rate_is_rejected(rate):
+    with pytest.raises(ValueError):
+        HttpClient(rate_per_host=rate)
+    with pytest.raises(ValueError):
+        TokenBucket(rate, 4)
+
+
+def test_burst_below_one_is_rejected():
+    with pytest.raises(ValueError):
+        HttpClient(burst=0.5)
+
+
+def test_bucket_waits_after_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(2.0, 2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(0.5)
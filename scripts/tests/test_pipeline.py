@@ -0,0 +1,93 @@
+"""Pipeline：分批寫入、單一來源失敗的隔離，以及寫入端例外時管線停止並將例外傳回呼叫端"""
+
+import threading
+import time
+
+import pytest
+
+from pipeline import Pipeline
+
+
+def pipeline_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith('pipeline-')]
+
+
+def fetch(source):
+    if source == 'bad-fetch':
+        raise ConnectionError('connection reset')
+    return source.encode()
+
+
+def parse(source, content):
+    if source == 'bad-parse':
+        raise ValueError('broken markup')
+    for i in range(3):
+        yield {'nameEn': f'{source} card {i}'}
+
+
+def test_cards_are_persisted_in_batches_and_failures_are_skipped():
+    batches = []
+    pipeline = Pipeline(fetch, parse, lambda batch: batches.append(list(batch)) or True,
+                        fetch_workers=3, queue_size=4, batch_size=4)
+    sources = [f'page-{i}' for i in range(10)] + ['bad-fetch', 'bad-parse']
+
+    stats = pipeline.run(sources)
+
+    assert stats['sources'] == 12
+    assert (stats['fetch_errors'], stats['parse_errors']) == (1, 1)
+    assert stats['cards'] == 30
+    assert all(len(batch) <= 4 for batch in batches)
+    assert sorted(card['nameEn'] for batch in batches for card in batch) == sorted(
+        f'page-{i} card {j}' for i in range(10) for j in range(3)
+    )
+    assert not pipeline_threads()
+
+
+def test_failed_batches_are_counted():
+    pipeline = Pipeline(fetch, parse, lambda batch: False, batch_size=3)
+    stats = pipeline.run(['a', 'b'])
+
+    assert (stats['batches'], stats['failed_batches'], stats['cards']) == (2, 2, 6)
+
+
+def test_persist_error_stops_upstream_and_propagates():
+    fetched = []
+
+    def slow_fetch(source):
+        fetched.append(source)
+        time.sleep(0.01)
+        return source.encode()
+
+    def persist(batch):
+        raise RuntimeError('database is locked')
+
+    # 佇列很小：上游會卡在佇列已滿，必須由停止訊號結束
+    pipeline = Pipeline(slow_fetch, parse, persist, fetch_workers=2, queue_size=1, batch_size=1)
+    with pytest.raises(RuntimeError, match='database is locked'):
+        pipeline.run(f'page-{i}' for i in range(1000))
+
+    assert len(fetched) < 1000
+    assert not pipeline_threads()
+
+
+def test_flush_when_upstream_is_idle():
+    persisted = []
+    second_page = threading.Event()
+
+    def waiting_fetch(source):
+        if source == 'late':
+            # 第一頁的卡片不滿一批，閒置 flush_interval 後就應先寫入
+            assert second_page.wait(5)
+        return source.encode()
+
+    def persist(batch):
+        persisted.append([card['nameEn'] for card in batch])
+        second_page.set()
+        return True
+
+    pipeline = Pipeline(waiting_fetch, parse, persist, fetch_workers=1, batch_size=10,
+                        flush_interval=0.05)
+    stats = pipeline.run(['early', 'late'])
+
+    assert persisted[0] == [f'early card {i}' for i in range(3)]
+    assert stats['cards'] == 6
@@ -0,0 +1,123 @@
+"""SeedSqlWriter：產生的 SQL 可重複套用而不新增重複資料，非 ASCII 名稱的比對鍵與 Python 端一致"""
+
+import copy
+import io
+import sqlite3
+
+import pytest
+
+import synthetic
+from card_identity import sql_name_key
+from credit_card_scraper import CreditCardScraper
+from sql_writer import DIALECTS, SeedSqlWriter
+from sync_state import SyncState
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'cards.db')
+    synthetic.create_schema(path)
+    return path
+
+
+def apply_sql(db_path, writer, statements):
+    buffer = io.StringIO()
+    writer.write(buffer, statements)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(buffer.getvalue())
+    finally:
+        conn.close()
+
+
+def query(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def snapshot(db_path):
+    """卡片與福利的內容（不含時間欄位），用來比較重複套用前後是否相同"""
+    cards = query(db_path, "SELECT id, nameEn, description, isActive FROM CreditCard ORDER BY id")
+    benefits = query(db_path, "SELECT cardId, titleEn, amount, isActive FROM Benefit ORDER BY id")
+    return cards, benefits
+
+
+def test_seed_sql_can_be_applied_twice(db_path):
+    cards = synthetic.make_cards(7, 3)
+    # 正規化名稱相同的卡片只新增一次，福利歸入同一張卡片
+    duplicate = copy.deepcopy(cards[0])
+    duplicate['nameEn'] = cards[0]['nameEn'].upper() + '®'
+    duplicate['benefits'][0]['titleEn'] = 'Extra Benefit'
+    cards.append(duplicate)
+    writer = SeedSqlWriter('america', batch_size=3)
+
+    apply_sql(db_path, writer, writer.iter_card_inserts(cards))
+    first = snapshot(db_path)
+    assert len(first[0]) == 7
+    assert len(first[1]) == 22
+
+    apply_sql(db_path, writer, writer.iter_card_inserts(cards))
+    assert snapshot(db_path) == first
+
+
+def test_incremental_sql_can_be_applied_twice(db_path, tmp_path):
+    cards = synthetic.make_cards(5, 2)
+    state = SyncState(str(tmp_path / 'state.json'))
+    writer = SeedSqlWriter('america', batch_size=2)
+    apply_sql(db_path, writer, writer.iter_card_inserts(cards))
+    state.commit(cards)
+
+    changed = copy.deepcopy(cards[:4])
+    changed[0]['description'] = 'updated description'
+    changed[1]['benefits'][0]['amount'] = 999
+    changed[2]['benefits'].append(dict(changed[2]['benefits'][0], titleEn='New Benefit'))
+    changed[3]['benefits'].pop()
+    new_card = synthetic.make_cards(6, 1)[5]
+    changed.append(new_card)
+
+    scraper = CreditCardScraper(region='america')
+    diff = state.diff(changed)
+    statements = list(scraper._incremental_sql(writer, diff))
+
+    apply_sql(db_path, writer, statements)
+    first = snapshot(db_path)
+    apply_sql(db_path, writer, statements)
+    assert snapshot(db_path) == first
+
+    cards_by_name = {name: (description, active) for _, name, description, active in first[0]}
+    assert cards_by_name[cards[0]['nameEn']] == ('updated description', 1)
+    assert cards_by_name[cards[4]['nameEn']][1] == 0
+    assert cards_by_name[new_card['nameEn']][1] == 1
+    assert len(first[0]) == 6
+    benefits = {(card_id, title): (amount, active) for card_id, title, amount, active in first[1]}
+    assert len(benefits) == len(first[1]) == 12
+    assert sum(1 for _, active in benefits.values() if not active) == 1
+    assert sum(1 for amount, _ in benefits.values() if amount == 999) == 1
+
+
+def test_non_ascii_name_key_matches_python_key(db_path):
+    card = synthetic.make_cards(1, 2)[0]
+    card['nameEn'] = 'Société Générale Élite® Card'
+    writer = SeedSqlWriter('europe')
+    apply_sql(db_path, writer, writer.iter_card_inserts([card]))
+
+    # 只有 ASCII 字母轉小寫，É 保留原樣
+    assert sql_name_key('SOCIÉTÉ Générale Élite Card') == 'sociÉtÉgénéraleÉlitecard'
+    sqlite_key = DIALECTS['sqlite'].name_key('nameEn')
+    assert query(db_path, f"SELECT {sqlite_key} FROM CreditCard") == [(sql_name_key(card['nameEn']),)]
+
+    # 來源只改變 ASCII 字母的大小寫與商標符號，仍比對到同一張卡片
+    renamed = dict(card, nameEn='SOCIéTé GéNéRALE Élite Card')
+    apply_sql(db_path, writer, writer.iter_card_inserts([renamed]))
+    assert query(db_path, "SELECT COUNT(*) FROM CreditCard") == [(1,)]
+    assert query(db_path, "SELECT COUNT(*) FROM Benefit") == [(2,)]
+
+
+def test_postgres_name_key_only_lowercases_ascii():
+    expr = DIALECTS['postgres'].name_key('"nameEn"')
+    assert 'LOWER(' not in expr
+    assert expr.startswith('TRANSLATE(')
+    assert expr.endswith("'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')")
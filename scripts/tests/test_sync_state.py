@@ -0,0 +1,114 @@
+"""SyncState：指紋比對的分類、commit 後的狀態檔內容、資料庫名稱的保留與待確認狀態檔"""
+
+import copy
+import json
+
+import pytest
+
+import synthetic
+from sync_state import SyncState, pending_state_path, promote_pending
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / 'state' / 'region-test.json')
+
+
+@pytest.fixture
+def cards():
+    return synthetic.make_cards(4, 3)
+
+
+def names(cards):
+    return [card['nameEn'] for card in cards]
+
+
+def test_first_run_inserts_everything(state_path, cards):
+    diff = SyncState(state_path).diff(cards)
+
+    assert names(diff.inserted_cards) == names(cards)
+    assert len(diff.inserted_benefits) == 12
+    assert not (diff.modified_cards or diff.unchanged_cards or diff.removed_cards)
+    assert diff.has_changes
+    assert diff.changed_cards() == [dict(card) for card in cards]
+
+
+def test_diff_classifies_changes_against_committed_state(state_path, cards):
+    state = SyncState(state_path)
+    state.commit(cards)
+
+    changed = copy.deepcopy(cards)
+    changed[0]['description'] = 'updated description'
+    changed[1]['benefits'][0]['amount'] = 999
+    removed_title = changed[2]['benefits'].pop()['titleEn']
+    new_card = synthetic.make_cards(1, 1, seed=7)[0]
+    new_card['nameEn'] = 'Brand New Card'
+    changed = changed[:3] + [new_card]
+
+    diff = SyncState(state_path).diff(changed)
+    assert names(diff.inserted_cards) == ['Brand New Card']
+    assert names(diff.modified_cards) == [cards[0]['nameEn']]
+    assert names(diff.unchanged_cards) == names(cards[1:3])
+    assert diff.removed_cards == [cards[3]['nameEn']]
+    assert [(card['nameEn'], benefit['titleEn']) for card, benefit in diff.modified_benefits] == [
+        (cards[1]['nameEn'], cards[1]['benefits'][0]['titleEn'])
+    ]
+    assert diff.removed_benefits == [(cards[2]['nameEn'], removed_title)]
+
+    # 卡片本身未變更但福利有異動的卡片也要寫入，且只帶有異動的福利
+    subsets = {card['nameEn']: card['benefits'] for card in diff.changed_cards()}
+    assert set(subsets) == {cards[0]['nameEn'], cards[1]['nameEn'], 'Brand New Card'}
+    assert subsets[cards[0]['nameEn']] == []
+    assert subsets[cards[1]['nameEn']] == [changed[1]['benefits'][0]]
+
+
+def test_unchanged_data_has_no_changes(state_path, cards):
+    SyncState(state_path).commit(cards)
+    diff = SyncState(state_path).diff(copy.deepcopy(cards))
+
+    assert not diff.has_changes
+    assert diff.changed_cards() == []
+    assert len(diff.unchanged_cards) == 4
+
+
+def test_commit_keeps_database_names(state_path, cards):
+    state = SyncState(state_path)
+    state.commit(cards, {cards[0]['nameEn']: 'Stored Name', cards[1]['nameEn']: cards[1]['nameEn']})
+
+    with open(state_path, encoding='utf-8') as f:
+        saved = json.load(f)['cards']
+    assert saved[cards[0]['nameEn']]['dbName'] == 'Stored Name'
+    # 與 nameEn 相同的名稱不記錄
+    assert 'dbName' not in saved[cards[1]['nameEn']]
+
+    # 下次只寫入部分卡片時，未寫入的卡片沿用上次記錄的名稱
+    reloaded = SyncState(state_path)
+    reloaded.commit(cards, {})
+    assert reloaded.cards[cards[0]['nameEn']]['dbName'] == 'Stored Name'
+
+    diff = SyncState(state_path).diff(cards[1:])
+    assert diff.removed_cards == [cards[0]['nameEn']]
+    assert diff.db_name(cards[0]['nameEn']) == 'Stored Name'
+    assert diff.db_name(cards[1]['nameEn']) == cards[1]['nameEn']
+
+
+def test_load_false_starts_empty(state_path, cards):
+    SyncState(state_path).commit(cards)
+
+    state = SyncState(state_path, load=False)
+    assert state.cards == {}
+    assert len(state.diff(cards).inserted_cards) == 4
+
+
+def test_staged_state_applies_only_after_promotion(state_path, cards, tmp_path):
+    SyncState(state_path).commit(cards[:2])
+    sql_path = str(tmp_path / 'seed.sql')
+
+    SyncState(state_path).stage(cards, pending_state_path(sql_path))
+    # 尚未確認套用：正式狀態不變，再次比對仍包含尚未套用的異動
+    assert names(SyncState(state_path).diff(cards).inserted_cards) == names(cards[2:])
+
+    assert promote_pending(pending_state_path(sql_path)) == state_path
+    assert not SyncState(state_path).diff(cards).has_changes
+    with pytest.raises(FileNotFoundError):
+        promote_pending(pending_state_path(sql_path))